@@ -33,3 +33,15 @@ def api_client():
     """DRF API test client."""
     from rest_framework.test import APIClient
     return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache():
+    """Use an isolated in-memory cache instead of Redis."""
+    from django.core.cache import cache
+    from django.test import override_settings
+
+    locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    with override_settings(CACHES=locmem):
+        cache.clear()
+        yield
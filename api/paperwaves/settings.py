@@ -63,6 +63,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "corsheaders",
     "rest_framework",
     "django_celery_beat",
@@ -207,6 +208,10 @@ STATICFILES_DIRS = [
 # Media files (user-uploaded content like book covers)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# Largest cover image download accepted (stations/covers.py)
+COVER_MAX_BYTES = int(os.environ.get("COVER_MAX_BYTES", 5 * 1024 * 1024))
+# Widths (px) of the responsive cover variants served in srcsets
+COVER_VARIANT_WIDTHS = [160, 320, 640]
 
 # Debug toolbar - IP addresses that can see the debug toolbar
 # Configure via DEBUG_IP_ADDRESS environment variable (comma-separated)
@@ -223,6 +228,81 @@ CELERY_BROKER_TRANSPORT_OPTIONS = {"visibility_timeout": 3600}
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379")
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 CELERY_TIMEZONE = "Europe/London"
+# Cover downloads get their own queue, consumed by a dedicated worker
+# (celery-covers in docker-compose) whose pool size bounds their concurrency.
+# Fanned-out verification does too (celery-verify): its tasks wait on the
+# Google Books limiter, and would otherwise hold default-queue workers
+# that extraction and scraping need.
+CELERY_TASK_ROUTES = {
+    "stations.tasks.fetch_cover_task": {"queue": "covers"},
+    "stations.tasks.verify_book_task": {"queue": "verification"},
+}
+
+# CACHE
+# Redis-backed response cache for the public read API (see stations/cache.py).
+# Entries are invalidated by a generation key on writes; the timeout only
+# bounds how long orphaned entries occupy memory.
+REDIS_CACHE_URL = os.environ.get("REDIS_CACHE_URL", "redis://redis:6379/1")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_CACHE_URL,
+        "KEY_PREFIX": "paperwaves",
+    }
+}
+API_CACHE_TIMEOUT = int(os.environ.get("API_CACHE_TIMEOUT", 60 * 60 * 24))
+
+# External API base URLs. FAKE_SERVICES_URL points them all at the local
+# stand-in servers (manage.py run_fake_services) for load testing.
+FAKE_SERVICES_URL = os.environ.get("FAKE_SERVICES_URL", "").rstrip("/")
+ANTHROPIC_BASE_URL = os.environ.get(
+    "ANTHROPIC_BASE_URL", f"{FAKE_SERVICES_URL}/anthropic" if FAKE_SERVICES_URL else ""
+)
+GOOGLE_BOOKS_API_BASE = os.environ.get(
+    "GOOGLE_BOOKS_API_BASE",
+    f"{FAKE_SERVICES_URL}/books/v1" if FAKE_SERVICES_URL else "https://www.googleapis.com/books/v1",
+)
+OPEN_LIBRARY_API_BASE = os.environ.get(
+    "OPEN_LIBRARY_API_BASE",
+    f"{FAKE_SERVICES_URL}/openlibrary" if FAKE_SERVICES_URL else "https://openlibrary.org",
+)
+WNYC_API_BASE = os.environ.get(
+    "WNYC_API_BASE",
+    f"{FAKE_SERVICES_URL}/wnyc/api/v3/story/" if FAKE_SERVICES_URL else "https://api.wnyc.org/api/v3/story/",
+)
+
+# Outbound HTTP (stations/http_client.py): keep-alive connections per host,
+# timeouts in seconds, and retries (jittered exponential backoff) for
+# connection errors and 5xx responses
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 10))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 30))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", 2))
+HTTP_RETRY_BACKOFF = float(os.environ.get("HTTP_RETRY_BACKOFF", 0.5))
+
+# Google Books rate limit, shared by every Celery worker through Redis
+# (stations/ratelimit.py). Raise the rate to match the project's API quota.
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL", REDIS_CACHE_URL)
+GOOGLE_BOOKS_RATE_PER_SECOND = float(os.environ.get("GOOGLE_BOOKS_RATE_PER_SECOND", 1))
+GOOGLE_BOOKS_RATE_BURST = int(os.environ.get("GOOGLE_BOOKS_RATE_BURST", 1))
+# How long Google Books lookups are reused (stations.models.BookLookup), in seconds
+GOOGLE_BOOKS_CACHE_TTL_FOUND = int(os.environ.get("GOOGLE_BOOKS_CACHE_TTL_FOUND", 60 * 60 * 24 * 30))
+GOOGLE_BOOKS_CACHE_TTL_NOT_FOUND = int(os.environ.get("GOOGLE_BOOKS_CACHE_TTL_NOT_FOUND", 60 * 60 * 24 * 7))
+GOOGLE_BOOKS_CACHE_TTL_ERROR = int(os.environ.get("GOOGLE_BOOKS_CACHE_TTL_ERROR", 60 * 15))
+# Book metadata providers (stations/providers.py), primary first. Lookups
+# fall through to the next one while a provider is cooling down or failing.
+METADATA_PROVIDERS = os.environ.get("METADATA_PROVIDERS", "google_books,open_library").split(",")
+# Seconds a provider is skipped after a failed (non-429) lookup
+METADATA_PROVIDER_ERROR_COOLDOWN = int(os.environ.get("METADATA_PROVIDER_ERROR_COOLDOWN", 60))
+# Also ask the next provider when a search takes longer than this (0 = never)
+METADATA_HEDGE_AFTER_SECONDS = float(os.environ.get("METADATA_HEDGE_AFTER_SECONDS", 0))
+OPEN_LIBRARY_RATE_PER_SECOND = float(os.environ.get("OPEN_LIBRARY_RATE_PER_SECOND", 1))
+OPEN_LIBRARY_RATE_BURST = int(os.environ.get("OPEN_LIBRARY_RATE_BURST", 3))
+# Pending books handed to each hourly verification run
+VERIFY_BATCH_SIZE = int(os.environ.get("VERIFY_BATCH_SIZE", 500))
+# How long a fanned-out book counts as queued; later runs skip it meanwhile.
+# verify_book_task clears the mark, so this only matters for lost messages.
+VERIFY_QUEUED_TTL = int(os.environ.get("VERIFY_QUEUED_TTL", 6 * 3600))
 
 # Optional: Flower dashboard URL for admin "Open Flower" link (e.g. https://flower.example.com)
 FLOWER_URL = os.environ.get("FLOWER_URL", "")
@@ -248,10 +328,15 @@ if not PAUSE_SCRAPING:
             "schedule": crontab(hour="0,12", minute=0),  # Midnight and noon
             "kwargs": {"max_episodes_per_brand": 25},
         },
+        "poll-extraction-batches-every-5-minutes": {
+            "task": "stations.tasks.poll_extraction_batches",
+            "schedule": crontab(minute="*/5"),
+        },
         "verify-pending-books-hourly": {
             "task": "stations.tasks.verify_pending_books",
             "schedule": crontab(minute=15),  # Every hour at :15
-            "kwargs": {"batch_size": 20},
+            # One task per book across all workers, paced by the shared limiter
+            "kwargs": {"batch_size": VERIFY_BATCH_SIZE, "fan_out": True},
         },
     }
 
@@ -259,6 +344,30 @@ if not PAUSE_SCRAPING:
 # Set to 'ai' to use Claude AI, 'keyword' for legacy keyword matching, 'both' for both
 BOOK_EXTRACTION_MODE = os.environ.get("BOOK_EXTRACTION_MODE", "keyword")
 
+# Message Batches extraction (stations/extraction_batches.py), 0 = off.
+# When on, new episodes wait for the 30-minute sweep instead of being
+# extracted on creation; a sweep that finds at least this many waiting
+# submits them (up to EXTRACTION_BATCH_MAX_EPISODES) as one batch at
+# batch price, as does backfill_brand_task(extract=True).
+EXTRACTION_BATCH_MIN_EPISODES = int(os.environ.get("EXTRACTION_BATCH_MIN_EPISODES", 0))
+EXTRACTION_BATCH_MAX_EPISODES = int(os.environ.get("EXTRACTION_BATCH_MAX_EPISODES", 1000))
+
+# Episodes packed into one extraction prompt by the sweep (1 = one call
+# per episode). Episodes the reply misses fall back to single calls.
+EXTRACTION_EPISODES_PER_PROMPT = int(os.environ.get("EXTRACTION_EPISODES_PER_PROMPT", 1))
+
+# Cheap tiers run before the Sonnet extractor (stations/extraction_cascade.py),
+# in order; empty = off. "keyword" rejects text with no book signal words,
+# "screen" asks a small model how likely a book is discussed and rejects
+# below EXTRACTION_SCREEN_THRESHOLD. EXTRACTION_CASCADE_AUDIT_RATE sends that
+# fraction of rejections on to Sonnet anyway so cascade_report can measure
+# what the tiers miss.
+EXTRACTION_CASCADE_TIERS = [
+    tier.strip() for tier in os.environ.get("EXTRACTION_CASCADE_TIERS", "").split(",") if tier.strip()
+]
+EXTRACTION_SCREEN_THRESHOLD = float(os.environ.get("EXTRACTION_SCREEN_THRESHOLD", 0.2))
+EXTRACTION_CASCADE_AUDIT_RATE = float(os.environ.get("EXTRACTION_CASCADE_AUDIT_RATE", 0))
+
 # Bookshop.org Affiliate
 BOOKSHOP_AFFILIATE_ID = os.environ.get("BOOKSHOP_AFFILIATE_ID", "16640")
 
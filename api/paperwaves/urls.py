@@ -31,6 +31,7 @@ urlpatterns = [
     path("", include("stations.urls")),
     path("api/topics/", views.topics_list, name="topics_list"),
     path("api/topics/<slug:slug>/", views.topic_detail, name="topic_detail"),
+    path("api/search/", views.search, name="search"),
     path("api/health/", views.health_check, name="health_check"),
     path("api/", include(router.urls)),
 ]
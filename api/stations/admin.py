@@ -9,7 +9,10 @@ from django.contrib import messages
 from django.utils.safestring import mark_safe
 from django.conf import settings as django_settings
 
-from .models import Station, Brand, Episode, Book, Phrase, Topic
+from .models import (
+    Station, Brand, BrandStats, Episode, Book, BookLookup, ExtractionBatch, ExtractionMemo, Phrase, Topic,
+    TopicStats,
+)
 
 
 class BookInline(admin.TabularInline):
@@ -62,7 +65,7 @@ class EpisodeAdmin(admin.ModelAdmin):
     )
     date_hierarchy = "aired_at"
     inlines = [BookInline]
-    actions = ["reprocess_episodes_action"]
+    actions = ["reprocess_episodes_action", "reprocess_episodes_fresh_action"]
 
     fieldsets = (
         (
@@ -77,6 +80,23 @@ class EpisodeAdmin(admin.ModelAdmin):
         ),
     )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and "aired_at" in form.changed_data:
+            Book.refresh_latest_aired(obj.books.values_list("pk", flat=True))
+
+    def delete_model(self, request, obj):
+        book_ids = list(obj.books.values_list("pk", flat=True))
+        super().delete_model(request, obj)
+        Book.refresh_latest_aired(book_ids)
+
+    def delete_queryset(self, request, queryset):
+        book_ids = list(
+            Book.objects.filter(episodes__in=queryset).values_list("pk", flat=True).distinct()
+        )
+        super().delete_queryset(request, queryset)
+        Book.refresh_latest_aired(book_ids)
+
     def book_count(self, obj):
         """Display count of books"""
         count = obj.books.count()
@@ -90,6 +110,7 @@ class EpisodeAdmin(admin.ModelAdmin):
             Episode.STAGE_SCRAPED: "#999",
             Episode.STAGE_EXTRACTION_QUEUED: "#0d6efd",
             Episode.STAGE_EXTRACTING: "#0d6efd",
+            Episode.STAGE_EXTRACTION_BATCHED: "#0d6efd",
             Episode.STAGE_EXTRACTION_NO_BOOKS: "#aaa",
             Episode.STAGE_EXTRACTION_FAILED: "#dc3545",
             Episode.STAGE_VERIFICATION_QUEUED: "#d4a017",
@@ -134,6 +155,7 @@ class EpisodeAdmin(admin.ModelAdmin):
             Episode.STAGE_SCRAPED: ("scraped", "current", ""),
             Episode.STAGE_EXTRACTION_QUEUED: ("extracted", "current", "Queued"),
             Episode.STAGE_EXTRACTING: ("extracted", "current", "Extracting\u2026"),
+            Episode.STAGE_EXTRACTION_BATCHED: ("extracted", "current", "In batch"),
             Episode.STAGE_EXTRACTION_NO_BOOKS: ("extracted", "terminal", "No books"),
             Episode.STAGE_EXTRACTION_FAILED: ("extracted", "failed", "Failed"),
             Episode.STAGE_VERIFICATION_QUEUED: ("verified", "current", "Queued"),
@@ -342,7 +364,7 @@ class EpisodeAdmin(admin.ModelAdmin):
         )
 
     @admin.action(description="Reprocess (AI) selected episodes")
-    def reprocess_episodes_action(self, request, queryset):
+    def reprocess_episodes_action(self, request, queryset, refresh=False):
         from .tasks import ai_extract_books_task
 
         from django.utils import timezone as tz
@@ -351,7 +373,7 @@ class EpisodeAdmin(admin.ModelAdmin):
             episode.last_error = None
             episode.status_changed_at = tz.now()
             episode.save(update_fields=["stage", "last_error", "status_changed_at"])
-            ai_extract_books_task.delay(episode.id)
+            ai_extract_books_task.delay(episode.id, refresh=refresh)
         count = queryset.count()
         msg = f"Queued extraction for {count} episode(s)."
         flower_url = getattr(django_settings, "FLOWER_URL", "") or ""
@@ -359,6 +381,10 @@ class EpisodeAdmin(admin.ModelAdmin):
             msg = format_html('{} <a href="{}" target="_blank">Open Flower</a>', msg, flower_url)
         self.message_user(request, msg)
 
+    @admin.action(description="Reprocess (AI, ignoring memoized results) selected episodes")
+    def reprocess_episodes_fresh_action(self, request, queryset):
+        self.reprocess_episodes_action(request, queryset, refresh=True)
+
     def mark_episode_complete(self, request, episode_id):
         """Mark an episode as complete from the episode detail page.
         If no books are linked, set stage to EXTRACTION_NO_BOOKS instead."""
@@ -393,10 +419,10 @@ class BookAdmin(admin.ModelAdmin):
     list_display = ("title", "author", "topic_list", "episode_brand", "gb_status", "cover_preview_small", "cover_error_short")
     list_filter = ("topics", "episodes__brand", "verification_status")
     filter_horizontal = ("topics",)
-    search_fields = ("title", "author", "description")
+    search_fields = ("title", "author", "description", "isbn")
     readonly_fields = ("slug", "cover_preview_large", "refetch_cover_button", "verify_book_button", "verification_status", "verification_checked_at", "cover_fetch_error", "episode_list")
     fieldsets = (
-        ("Book Information", {"fields": ("title", "author", "topics", "slug", "description", "verification_status", "verification_checked_at", "verify_book_button")}),
+        ("Book Information", {"fields": ("title", "author", "topics", "slug", "description", "verification_status", "verification_checked_at", "verify_book_button", "isbn", "google_volume_id")}),
         (
             "Cover Image",
             {
@@ -452,6 +478,19 @@ class BookAdmin(admin.ModelAdmin):
 
     gb_status.short_description = "Google Books"
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if "cover_image" in form.changed_data:
+            from .covers import adopt_stored_cover
+
+            if obj.cover_image:
+                # Uploaded cover → content-addressed name + variants
+                adopt_stored_cover(obj)
+            else:
+                obj.cover_sha256 = ""
+                obj.cover_variants = []
+                obj.save(update_fields=["cover_sha256", "cover_variants"])
+
     def cover_error_short(self, obj):
         if obj.cover_fetch_error:
             truncated = obj.cover_fetch_error[:60]
@@ -544,19 +583,25 @@ class BookAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.manually_verify_book),
                 name="stations_book_manually_verify",
             ),
+            path(
+                "cover-batch/<str:group_id>/",
+                self.admin_site.admin_view(self.cover_batch_status),
+                name="stations_book_cover_batch",
+            ),
         ]
         return custom_urls + urls
 
     def refetch_cover(self, request, book_id):
         """Refetch cover for a single book via Google Books."""
-        from .utils import verify_book_exists, GoogleBooksRateLimited
+        from .providers import ProviderUnavailable
+        from .utils import lookup_book
         from .ai_utils import download_and_save_cover
 
         book = Book.objects.get(pk=book_id)
         try:
-            book_info = verify_book_exists(book.title, book.author)
-        except GoogleBooksRateLimited:
-            messages.error(request, "Google Books rate limit hit. Try again in a few minutes.")
+            book_info = lookup_book(book)
+        except ProviderUnavailable:
+            messages.error(request, "Metadata providers are rate limited. Try again in a few minutes.")
             return redirect(reverse("admin:stations_book_change", args=[book_id]))
 
         cover_url = book_info.get("cover_url") or ""
@@ -576,15 +621,16 @@ class BookAdmin(admin.ModelAdmin):
 
     def verify_book(self, request, book_id):
         """Verify a single book via Google Books."""
-        from .utils import verify_book_exists, generate_bookshop_affiliate_url, GoogleBooksRateLimited
-        from .ai_utils import download_and_save_cover
+        from .providers import ProviderUnavailable
+        from .utils import lookup_book, generate_bookshop_affiliate_url
+        from .tasks import fetch_cover_task
         from django.utils import timezone as tz
 
         book = Book.objects.get(pk=book_id)
         try:
-            book_info = verify_book_exists(book.title, book.author)
-        except GoogleBooksRateLimited:
-            messages.error(request, "Google Books rate limit hit. Try again in a few minutes.")
+            book_info = lookup_book(book)
+        except ProviderUnavailable:
+            messages.error(request, "Metadata providers are rate limited. Try again in a few minutes.")
             return redirect(reverse("admin:stations_book_change", args=[book_id]))
 
         book.verification_checked_at = tz.now()
@@ -594,9 +640,12 @@ class BookAdmin(admin.ModelAdmin):
             # Always re-fetch cover and purchase link on explicit verify
             cover_url = book_info.get("cover_url") or ""
             if cover_url:
-                download_and_save_cover(book, cover_url, allow_fallback=True)
+                fetch_cover_task.delay(book.pk, cover_url, allow_fallback=True)
             book.purchase_link = generate_bookshop_affiliate_url(book.title, book.author)
-            book.save(update_fields=["verification_status", "verification_checked_at", "purchase_link"])
+            book.save(update_fields=[
+                "verification_status", "verification_checked_at", "purchase_link",
+                *book.set_google_identifiers(book_info),
+            ])
             messages.success(request, f"'{book.title}' verified on Google Books.")
         else:
             book.verification_status = Book.VERIFICATION_NOT_FOUND
@@ -625,68 +674,119 @@ class BookAdmin(admin.ModelAdmin):
 
     @admin.action(description="Refetch covers from Google Books")
     def refetch_covers(self, request, queryset):
-        """Refetch cover images from Google Books for selected books."""
-        from .utils import verify_book_exists
-        from .ai_utils import download_and_save_cover
+        """Queue cover downloads for selected books that have no cover."""
+        from .tasks import queue_cover_fetches
+
+        book_ids = list(
+            queryset.filter(db_models.Q(cover_image="") | db_models.Q(cover_image__isnull=True))
+            .values_list("pk", flat=True)
+        )
+        if not book_ids:
+            self.message_user(request, "All selected books already have covers.", messages.WARNING)
+            return
+        result = queue_cover_fetches(book_ids, overwrite=False)
+        progress_url = reverse("admin:stations_book_cover_batch", args=[result.id])
+        self.message_user(request, format_html(
+            'Queued {} cover download(s). <a href="{}">Check progress</a>',
+            len(book_ids), progress_url,
+        ))
 
-        downloaded = 0
-        failed = 0
+    def cover_batch_status(self, request, group_id):
+        """Progress of a queued cover refetch, as JSON."""
+        from celery.result import GroupResult
+        from django.http import JsonResponse
+        from .tasks import cover_batch_progress
 
-        for book in queryset:
-            if book.cover_image:
-                continue  # Skip if already has cover
+        result = GroupResult.restore(group_id)
+        if result is None:
+            return JsonResponse({"error": "Unknown or expired batch"}, status=404)
+        return JsonResponse(cover_batch_progress(result))
 
-            book_info = verify_book_exists(book.title, book.author)
-            cover_url = book_info.get("cover_url") or ""
 
-            if not cover_url:
-                book.cover_fetch_error = "No cover available on Google Books"
-                book.save(update_fields=["cover_fetch_error"])
-                failed += 1
-                continue
+@admin.register(BookLookup)
+class BookLookupAdmin(admin.ModelAdmin):
+    """Cached Google Books lookups. Delete a row to force a fresh API call."""
 
-            if download_and_save_cover(book, cover_url, allow_fallback=True):
-                downloaded += 1
-            else:
-                failed += 1
+    list_display = ("title", "author", "result", "fetched_at", "expires_at")
+    list_filter = ("result",)
+    search_fields = ("title", "author")
+    readonly_fields = ("key", "title", "author", "result", "data", "fetched_at", "expires_at")
 
-        self.message_user(
-            request, f"Downloaded {downloaded} cover(s). {failed} failed or skipped."
-        )
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ExtractionMemo)
+class ExtractionMemoAdmin(admin.ModelAdmin):
+    """Memoized extraction results. Delete a row to force a fresh API call."""
+
+    list_display = ("text_preview", "prompt_version", "model", "hits", "created", "last_used_at")
+    list_filter = ("prompt_version", "model")
+    search_fields = ("text",)
+    readonly_fields = (
+        "key", "prompt_version", "model", "text", "result", "hits", "created", "last_used_at",
+    )
+
+    @admin.display(description="Text")
+    def text_preview(self, obj):
+        return obj.text[:80]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ExtractionBatch)
+class ExtractionBatchAdmin(admin.ModelAdmin):
+    """Message Batches of episode extractions; applied by poll_extraction_batches."""
+
+    list_display = ("batch_id", "status", "episode_count", "request_counts", "created", "ended_at")
+    list_filter = ("status",)
+    readonly_fields = (
+        "batch_id", "status", "episode_count", "request_counts", "last_error", "created", "ended_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
 
 
 @admin.register(Brand)
 class BrandAdmin(admin.ModelAdmin):
     list_display = ("name", "station", "episode_stats", "backfill_link")
+    list_select_related = ("station", "stats")
     readonly_fields = ("episode_stats_detail",)
 
+    def _stats(self, obj):
+        try:
+            return obj.stats
+        except BrandStats.DoesNotExist:
+            return None
+
+    @staticmethod
+    def _aired_range(stats):
+        oldest_str = stats.first_aired_at.strftime("%-d %b %Y") if stats.first_aired_at else "?"
+        newest_str = stats.last_aired_at.strftime("%-d %b %Y") if stats.last_aired_at else "?"
+        return oldest_str, newest_str
+
     def episode_stats(self, obj):
-        count = Episode.objects.filter(brand=obj).count()
-        if count == 0:
+        stats = self._stats(obj)
+        if not stats or stats.episode_count == 0:
             return "0 episodes"
-        oldest = Episode.objects.filter(brand=obj).order_by("aired_at").first()
-        newest = Episode.objects.filter(brand=obj).order_by("-aired_at").first()
-        oldest_str = oldest.aired_at.strftime("%-d %b %Y") if oldest and oldest.aired_at else "?"
-        newest_str = newest.aired_at.strftime("%-d %b %Y") if newest and newest.aired_at else "?"
-        return f"{count} episodes ({oldest_str} – {newest_str})"
+        oldest_str, newest_str = self._aired_range(stats)
+        return f"{stats.episode_count} episodes ({oldest_str} – {newest_str})"
 
     episode_stats.short_description = "Episodes"
 
     def episode_stats_detail(self, obj):
         if not obj.pk:
             return "-"
-        count = Episode.objects.filter(brand=obj).count()
-        if count == 0:
+        stats = self._stats(obj)
+        if not stats or stats.episode_count == 0:
             return format_html("<em>No episodes yet</em>")
-        oldest = Episode.objects.filter(brand=obj).order_by("aired_at").first()
-        newest = Episode.objects.filter(brand=obj).order_by("-aired_at").first()
-        oldest_str = oldest.aired_at.strftime("%-d %b %Y") if oldest and oldest.aired_at else "?"
-        newest_str = newest.aired_at.strftime("%-d %b %Y") if newest and newest.aired_at else "?"
-        book_count = Book.objects.filter(episodes__brand=obj).distinct().count()
+        oldest_str, newest_str = self._aired_range(stats)
         return format_html(
             "<strong>{}</strong> episodes ({} – {})<br>"
-            "<strong>{}</strong> books extracted",
-            count, oldest_str, newest_str, book_count,
+            "<strong>{}</strong> verified books",
+            stats.episode_count, oldest_str, newest_str, stats.book_count,
         )
 
     episode_stats_detail.short_description = "Episode coverage"
@@ -760,11 +860,15 @@ class BrandAdmin(admin.ModelAdmin):
 @admin.register(Topic)
 class TopicAdmin(admin.ModelAdmin):
     list_display = ("name", "slug", "book_count")
+    list_select_related = ("stats",)
 
     def book_count(self, obj):
-        return obj.book_set.count()
+        try:
+            return obj.stats.book_count
+        except TopicStats.DoesNotExist:
+            return 0
 
-    book_count.short_description = "Books"
+    book_count.short_description = "Verified books"
 
     def changelist_view(self, request, extra_context=None):
         from collections import Counter
@@ -848,7 +952,7 @@ def system_health_run_verification(request):
         return redirect("admin:stations_system_health")
 
     from .tasks import verify_pending_books
-    verify_pending_books.delay()
+    verify_pending_books.delay(batch_size=django_settings.VERIFY_BATCH_SIZE, fan_out=True)
     messages.success(request, "Verification task queued.")
     return redirect("admin:stations_system_health")
 
@@ -929,8 +1033,7 @@ def extraction_evaluation_view(request):
 
     books = (
         Book.objects.prefetch_related("episodes", "episodes__brand")
-        .annotate(latest_aired=db_models.Max("episodes__aired_at"))
-        .order_by("-latest_aired", "-id")[:200]
+        .order_by(db_models.F("latest_aired_at").desc(nulls_last=True), "-id")[:200]
     )
 
     rows = []
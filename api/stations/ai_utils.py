@@ -6,15 +6,13 @@ from episode titles and descriptions, replacing simple keyword matching.
 """
 
 import os
+import hashlib
 import logging
 import json
-import tempfile
-import urllib.error
-import urllib.request
+import time
 from typing import Dict, List, Optional
 from datetime import datetime
 from anthropic import Anthropic, APIError, APITimeoutError, RateLimitError
-from django.core.files import File
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +66,73 @@ def _parse_date(date_text: str) -> Optional[datetime]:
     return None
 
 
+EXTRACTION_MODEL = "claude-sonnet-4-6"  # Reliable instruction-following
+
+# Static extraction instructions, sent as the system block; the episode
+# text stays in the user message, so single, multi-episode and batch
+# requests share an identical system prompt. Not prompt-cached: at ~700
+# tokens it is under Sonnet's 1024-token minimum cacheable prefix.
+EXTRACTION_INSTRUCTIONS = """Extract books that are the subject of a radio episode. We want books that are discussed, reviewed, or whose author is interviewed. We do NOT want books mentioned only as the source of an adaptation (film, TV, theatre, musical). The episode text is in the user message.
+
+When to extract:
+- The text names a book title AND its author.
+- OR the text uses book-type words ("book", "novel", "memoir", "autobiography", "short story collection") with enough context to identify the work.
+- Author interviews count — if an author is a guest and their book is named, extract it.
+
+When NOT to extract:
+- Author name alone without a specific book being identified.
+- Titles that could be film or TV without clear book signals. Genres like "thriller" or "comedy" often mean screen, not print.
+- The segment is about an adaptation, play, or musical — not the source book. E.g. "musical based on The Unlikely Pilgrimage of Harold Fry" = about the musical, not the book.
+- Exception: if the source book is clearly identified (title + author + book content described) even within adaptation framing, extract it. E.g. "The new movie Fairyland is adapted from the memoir by Alysia Abbott. She wrote about growing up as the child of a gay single father..." = the book and author are the subject, include with high confidence.
+
+Every extracted book MUST have a real author name. If the text doesn't name the author, skip the book. Never use "Unknown" or "N/A" as author.
+
+INCLUDE: "Mark Haddon's autobiography Leaving Home"; "Eric Schlosser's book Fast Food Nation... talks to the author"; "George Saunders' new book, Vigil"; prize announcements with author + book; "short story collection by Joy Williams".
+
+EXCLUDE: "Anne Brontë biographer" (no book named); "thriller Lurker" (TV show); "BBC adaptation of Lord of the Flies" (adaptation context); "her new play My Brother's a Genius" (play, not book); "RSC's new production of Cyrano de Bergerac" (theatre).
+
+Return JSON only:
+{
+    "has_book": true/false,
+    "confidence": 0.95,
+    "books": [
+        {
+            "title": "Book Title",
+            "author": "Author Name",
+            "description": "A brief, engaging description of what the book is about",
+            "topics": ["fiction"]
+        }
+    ],
+    "reasoning": "Brief explanation of your decision"
+}
+
+Topics: assign from this list: fiction, classics, prize-winners, debut, history, biography, cookbooks, politics, science, arts. A book can have multiple (e.g. ["fiction", "debut"]). "science" = natural sciences, medicine, physics, biology, climate — not technology or economics. You may suggest up to 2 additional slugs if needed (lowercase with hyphens, e.g. true-crime, philosophy, memoir, nature, music).
+
+Confidence: 0.9+ = book clearly identified, 0.7-0.9 = probable but some ambiguity, <0.7 = uncertain. Return ONLY valid JSON."""
+
+
+# Per-call instructions for multi-episode prompts. They go in the user
+# message so the system block stays identical to single calls.
+MULTI_EPISODE_INSTRUCTIONS = """Apply the instructions above to each episode below separately. Return a JSON array with one object per episode, each in the format above plus an "id" field holding the episode's id. Return ONLY a valid JSON array."""
+
+# Part of the ExtractionMemo key: editing either set of instructions retires
+# old memos. Results from single and multi-episode calls share one version
+# because a memo from either serves both kinds of lookup.
+EXTRACTION_PROMPT_VERSION = hashlib.sha256(
+    (EXTRACTION_INSTRUCTIONS + MULTI_EPISODE_INSTRUCTIONS).encode()
+).hexdigest()[:12]
+
+
+def _log_usage(usage) -> None:
+    """Log token usage of an extraction call."""
+    if usage is None:
+        return
+    logger.info(
+        f"AI extraction tokens: input={usage.input_tokens}, "
+        f"output={usage.output_tokens}"
+    )
+
+
 class BookExtractor:
     """Extracts book information from text using Claude AI."""
 
@@ -85,7 +150,98 @@ class BookExtractor:
             )
             self.client = None
         else:
-            self.client = Anthropic(api_key=self.api_key)
+            from django.conf import settings
+
+            self.client = Anthropic(
+                api_key=self.api_key, base_url=settings.ANTHROPIC_BASE_URL or None
+            )
+
+    def request_params(self, text: str) -> Dict:
+        """Messages API parameters for extracting books from text (also used for batches)."""
+        return {
+            "model": EXTRACTION_MODEL,
+            "max_tokens": 1024,
+            "system": [
+                {
+                    "type": "text",
+                    "text": EXTRACTION_INSTRUCTIONS,
+                }
+            ],
+            "messages": [{"role": "user", "content": f'Episode text: "{text}"'}],
+        }
+
+    def multi_request_params(self, texts: Dict[int, str]) -> Dict:
+        """Messages API parameters for extracting books from several episodes ({id: text}) at once."""
+        params = self.request_params("")
+        episodes = "\n".join(
+            f'<episode id="{episode_id}">{text}</episode>' for episode_id, text in texts.items()
+        )
+        params["max_tokens"] = min(1024 * len(texts), 8192)
+        params["messages"] = [
+            {"role": "user", "content": f"{MULTI_EPISODE_INSTRUCTIONS}\n\n{episodes}"}
+        ]
+        return params
+
+    @staticmethod
+    def _validate(result) -> Dict:
+        if not isinstance(result, dict):
+            raise ValueError("Response is not a dict")
+        if "has_book" not in result:
+            raise ValueError("Response missing 'has_book' field")
+
+        # Ensure required fields
+        result.setdefault("books", [])
+        result.setdefault("reasoning", "No reasoning provided")
+        return result
+
+    @staticmethod
+    def _strip_fences(response_text: str) -> str:
+        response_text = response_text.strip()
+        if response_text.startswith("```"):
+            response_text = response_text.split("\n", 1)[1]
+            response_text = response_text.rsplit("```", 1)[0].strip()
+        return response_text
+
+    @staticmethod
+    def parse_response(response_text: str) -> Dict:
+        """
+        Parse Claude's reply into the extraction result dict.
+
+        Raises json.JSONDecodeError or ValueError if it isn't a valid result.
+        """
+        return BookExtractor._validate(json.loads(BookExtractor._strip_fences(response_text)))
+
+    @staticmethod
+    def parse_multi_response(response_text: str) -> Dict[int, Dict]:
+        """
+        Parse a multi-episode reply into {episode id: result}.
+
+        Salvages the complete items of a truncated array; items that are
+        malformed or lack an id are left out.
+        """
+        text = BookExtractor._strip_fences(response_text)
+        if not text.startswith("["):
+            raise ValueError("Response is not a JSON array")
+
+        decoder = json.JSONDecoder()
+        results = {}
+        pos = 1
+        while True:
+            while pos < len(text) and text[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(text) or text[pos] == "]":
+                break
+            try:
+                item, pos = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                logger.warning(f"Multi-episode response truncated after {len(results)} items")
+                break
+            try:
+                result = BookExtractor._validate(item)
+                results[int(result.pop("id"))] = result
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping malformed multi-episode item: {e}")
+        return results
 
     def extract_books(self, text: str, max_retries: int = 2) -> Dict:
         """
@@ -100,6 +256,8 @@ class BookExtractor:
                 - has_book: bool
                 - books: List[Dict] with title, author (optional), confidence
                 - reasoning: str explaining the decision
+                - failed: True if there was no usable reply (API or parse
+                  error); such results are never memoized
         """
         if not self.client:
             logger.error("Claude client not initialized. Skipping AI extraction.")
@@ -107,76 +265,18 @@ class BookExtractor:
                 "has_book": False,
                 "books": [],
                 "reasoning": "API key not configured",
+                "failed": True,
             }
 
-        prompt = f"""Extract books that are the subject of a radio episode. We want books that are discussed, reviewed, or whose author is interviewed. We do NOT want books mentioned only as the source of an adaptation (film, TV, theatre, musical).
-
-Episode text: "{text}"
-
-When to extract:
-- The text names a book title AND its author.
-- OR the text uses book-type words ("book", "novel", "memoir", "autobiography", "short story collection") with enough context to identify the work.
-- Author interviews count — if an author is a guest and their book is named, extract it.
-
-When NOT to extract:
-- Author name alone without a specific book being identified.
-- Titles that could be film or TV without clear book signals. Genres like "thriller" or "comedy" often mean screen, not print.
-- The segment is about an adaptation, play, or musical — not the source book. E.g. "musical based on The Unlikely Pilgrimage of Harold Fry" = about the musical, not the book.
-- Exception: if the source book is clearly identified (title + author + book content described) even within adaptation framing, extract it. E.g. "The new movie Fairyland is adapted from the memoir by Alysia Abbott. She wrote about growing up as the child of a gay single father..." = the book and author are the subject, include with high confidence.
-
-Every extracted book MUST have a real author name. If the text doesn't name the author, skip the book. Never use "Unknown" or "N/A" as author.
-
-INCLUDE: "Mark Haddon's autobiography Leaving Home"; "Eric Schlosser's book Fast Food Nation... talks to the author"; "George Saunders' new book, Vigil"; prize announcements with author + book; "short story collection by Joy Williams".
-
-EXCLUDE: "Anne Brontë biographer" (no book named); "thriller Lurker" (TV show); "BBC adaptation of Lord of the Flies" (adaptation context); "her new play My Brother's a Genius" (play, not book); "RSC's new production of Cyrano de Bergerac" (theatre).
-
-Return JSON only:
-{{
-    "has_book": true/false,
-    "confidence": 0.95,
-    "books": [
-        {{
-            "title": "Book Title",
-            "author": "Author Name",
-            "description": "A brief, engaging description of what the book is about",
-            "topics": ["fiction"]
-        }}
-    ],
-    "reasoning": "Brief explanation of your decision"
-}}
-
-Topics: assign from this list: fiction, classics, prize-winners, debut, history, biography, cookbooks, politics, science, arts. A book can have multiple (e.g. ["fiction", "debut"]). "science" = natural sciences, medicine, physics, biology, climate — not technology or economics. You may suggest up to 2 additional slugs if needed (lowercase with hyphens, e.g. true-crime, philosophy, memoir, nature, music).
-
-Confidence: 0.9+ = book clearly identified, 0.7-0.9 = probable but some ambiguity, <0.7 = uncertain. Return ONLY valid JSON."""
-
+        params = self.request_params(text)
         for attempt in range(max_retries + 1):
             try:
-                message = self.client.messages.create(
-                    model="claude-sonnet-4-6",  # Reliable instruction-following
-                    max_tokens=1024,
-                    messages=[{"role": "user", "content": prompt}],
-                )
+                message = self.client.messages.create(**params)
+                _log_usage(message.usage)
 
                 # Extract text from response
                 response_text = message.content[0].text.strip()
-
-                # Strip markdown code fences if present
-                if response_text.startswith("```"):
-                    response_text = response_text.split("\n", 1)[1]
-                    response_text = response_text.rsplit("```", 1)[0].strip()
-
-                # Parse JSON response
-                result = json.loads(response_text)
-
-                # Validate response structure
-                if not isinstance(result, dict):
-                    raise ValueError("Response is not a dict")
-                if "has_book" not in result:
-                    raise ValueError("Response missing 'has_book' field")
-
-                # Ensure required fields
-                result.setdefault("books", [])
-                result.setdefault("reasoning", "No reasoning provided")
+                result = self.parse_response(response_text)
 
                 logger.info(
                     f"AI extraction result: has_book={result['has_book']}, "
@@ -190,7 +290,7 @@ Confidence: 0.9+ = book clearly identified, 0.7-0.9 = probable but some ambiguit
                 logger.debug(f"Response was: {response_text[:200]}")
                 if attempt < max_retries:
                     continue
-                return {"has_book": False, "books": [], "reasoning": "JSON parse error"}
+                return {"has_book": False, "books": [], "reasoning": "JSON parse error", "failed": True}
 
             except (APIError, APITimeoutError, RateLimitError) as e:
                 logger.error(
@@ -202,13 +302,36 @@ Confidence: 0.9+ = book clearly identified, 0.7-0.9 = probable but some ambiguit
                     "has_book": False,
                     "books": [],
                     "reasoning": f"API error: {str(e)}",
+                    "failed": True,
                 }
 
             except Exception as e:
                 logger.exception(f"Unexpected error in AI extraction: {e}")
-                return {"has_book": False, "books": [], "reasoning": f"Error: {str(e)}"}
+                return {"has_book": False, "books": [], "reasoning": f"Error: {str(e)}", "failed": True}
+
+        return {"has_book": False, "books": [], "reasoning": "Max retries exceeded", "failed": True}
 
-        return {"has_book": False, "books": [], "reasoning": "Max retries exceeded"}
+    def extract_books_multi(self, texts: Dict[int, str]) -> Dict[int, Dict]:
+        """
+        Extract books from several episodes ({id: text}) in one call.
+
+        Returns {id: result} for the episodes the reply covered; callers
+        fall back to extract_books for the rest. One attempt only: on API
+        or parse errors this returns {} so every episode falls back.
+        """
+        if not self.client or not texts:
+            return {}
+        try:
+            message = self.client.messages.create(**self.multi_request_params(texts))
+            _log_usage(message.usage)
+            results = self.parse_multi_response(message.content[0].text)
+        except (APIError, APITimeoutError, RateLimitError, ValueError) as e:
+            logger.error(f"Multi-episode extraction of {len(texts)} episodes failed: {e}")
+            return {}
+
+        results = {episode_id: r for episode_id, r in results.items() if episode_id in texts}
+        logger.info(f"Multi-episode extraction covered {len(results)}/{len(texts)} episodes")
+        return results
 
     def is_available(self) -> bool:
         """Check if the AI extractor is available (API key configured)."""
@@ -217,7 +340,8 @@ Confidence: 0.9+ = book clearly identified, 0.7-0.9 = probable but some ambiguit
 
 def download_and_save_cover(book, cover_url: str, allow_fallback: bool = False) -> bool:
     """
-    Download a cover image from URL and save it to the book's ImageField.
+    Download a cover image from URL and save it to the book's ImageField
+    (see covers.ingest_cover; an unchanged cover counts as success).
 
     Args:
         book: Book model instance
@@ -231,6 +355,9 @@ def download_and_save_cover(book, cover_url: str, allow_fallback: bool = False)
     if not cover_url:
         return False
 
+    from . import http_client
+    from .covers import ingest_cover
+
     try:
         # Google Books /books/content path 403s from datacenter IPs;
         # /books/publisher/content serves the same images and works.
@@ -239,32 +366,19 @@ def download_and_save_cover(book, cover_url: str, allow_fallback: bool = False)
             "books.google.com/books/publisher/content",
         )
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
-            request = urllib.request.Request(
-                cover_url,
-                headers={"User-Agent": "Mozilla/5.0 (compatible; RadioReads/1.0)"},
-            )
-            with urllib.request.urlopen(request, timeout=30) as response:
-                tmp_file.write(response.read())
-                tmp_path = tmp_file.name
-
-        filename = f"{book.slug}.jpg"
-        with open(tmp_path, "rb") as f:
-            book.cover_image.save(filename, File(f), save=True)
-
-        os.unlink(tmp_path)
-        book.cover_fetch_error = ""
-        book.save(update_fields=["cover_fetch_error"])
-        logger.info(f"Downloaded and saved cover for '{book.title}'")
+        ingest_cover(book, cover_url)
         return True
 
-    except urllib.error.HTTPError as e:
-        if e.code == 403 and "books.google.com" in cover_url:
+    except http_client.HTTPError as e:
+        if e.status == 403 and "books.google.com" in cover_url:
             if allow_fallback:
                 # Manual refetch: try Open Library as fallback.
-                from .utils import _open_library_cover_url
+                from .providers import ProviderUnavailable, get_provider
 
-                ol_url = _open_library_cover_url(book.title, book.author)
+                try:
+                    ol_url = get_provider("open_library").cover_url(book.title, book.author)
+                except ProviderUnavailable:
+                    ol_url = ""
                 if ol_url:
                     logger.info(f"Google Books 403 for '{book.title}', trying Open Library")
                     return download_and_save_cover(book, ol_url)
@@ -297,6 +411,37 @@ def get_book_extractor() -> BookExtractor:
     return _extractor
 
 
+def memoized_result(text: str) -> Optional[Dict]:
+    """The memoized extraction result for text under the current prompt and model, or None."""
+    from .models import ExtractionMemo
+
+    result = ExtractionMemo.get_result(text, EXTRACTION_PROMPT_VERSION, EXTRACTION_MODEL)
+    if result is not None:
+        logger.info("AI extraction memo hit")
+    return result
+
+
+def memoize_result(text: str, result: Dict) -> None:
+    """Remember a Sonnet extraction result for text (failures and cascade rejections are skipped)."""
+    from .models import ExtractionMemo
+
+    if not result.get("failed") and not result.get("rejected_by"):
+        result = {key: value for key, value in result.items() if key != "cascade"}
+        ExtractionMemo.store(text, EXTRACTION_PROMPT_VERSION, EXTRACTION_MODEL, result)
+
+
+def _extract_with_cascade(extractor: BookExtractor, text: str) -> Dict:
+    """extract_books behind the cheap tiers of extraction_cascade, with the trace attached."""
+    from . import extraction_cascade
+
+    rejected_by, trace = extraction_cascade.screen(text)
+    if rejected_by:
+        return extraction_cascade.rejection_result(rejected_by, trace)
+    started = time.perf_counter()
+    result = extractor.extract_books(text)
+    return dict(result, cascade=trace + [extraction_cascade.full_step(started)])
+
+
 def _set_episode_failed(episode, error: Exception) -> None:
     """Set episode stage to EXTRACTION_FAILED and store short error message."""
     from django.utils import timezone
@@ -309,16 +454,20 @@ def _set_episode_failed(episode, error: Exception) -> None:
     episode.save(update_fields=["stage", "last_error", "status_changed_at"])
 
 
-def extract_books_from_episode(episode_id: int) -> Dict:
+def extract_books_from_episode(episode_id: int, refresh: bool = False, screen: bool = True) -> Dict:
     """
     Extract book information from an episode using AI.
 
     Reads from episode.scraped_data, writes extraction_result and status to Episode.
     Replaces all books for the episode (delete then create). Sets PROCESSED or FAILED.
+    Text that was extracted before (same prompt and model) reuses the
+    memoized result without an API call; refresh=True always calls Claude.
+    With EXTRACTION_CASCADE_TIERS set, cheap tiers screen the text before
+    Sonnet sees it (screen=False skips them).
     """
     from django.utils import timezone
 
-    from .models import Book, Topic, Episode
+    from .models import Episode
 
     try:
         episode = Episode.objects.get(pk=episode_id)
@@ -326,6 +475,12 @@ def extract_books_from_episode(episode_id: int) -> Dict:
         logger.warning(f"Episode {episode_id} does not exist")
         return {"has_book": False, "books": [], "reasoning": "Episode not found"}
 
+    text = episode_text(episode)
+    if not refresh:
+        result = memoized_result(text)
+        if result is not None:
+            return apply_extraction_result(episode, result)
+
     extractor = get_book_extractor()
     if not extractor.is_available():
         episode.stage = Episode.STAGE_EXTRACTION_FAILED
@@ -334,19 +489,104 @@ def extract_books_from_episode(episode_id: int) -> Dict:
         episode.save(update_fields=["stage", "last_error", "status_changed_at"])
         return {"has_book": False, "books": [], "reasoning": "API not configured"}
 
-    # Text from scraped_data or fallback to title
-    text_to_analyze = episode.title
-    if episode.scraped_data:
-        raw_title = episode.scraped_data.get("title", episode.title)
-        raw_description = episode.scraped_data.get("description", "")
-        text_to_analyze = f"{raw_title}. {raw_description}".strip()
+    from . import extraction_cascade
 
     try:
-        result = extractor.extract_books(text_to_analyze)
+        if screen and extraction_cascade.enabled():
+            result = _extract_with_cascade(extractor, text)
+        else:
+            result = extractor.extract_books(text)
     except Exception as e:
         _set_episode_failed(episode, e)
         raise
 
+    memoize_result(text, result)
+    return apply_extraction_result(episode, result)
+
+
+def extract_books_from_episodes(episode_ids: List[int], refresh: bool = False) -> Dict[int, Dict]:
+    """
+    Extract books from several episodes with one multi-episode prompt.
+    Memoized episodes are applied first and left out of the prompt
+    (unless refresh=True), as are episodes the extraction cascade rejects.
+
+    Episodes the reply didn't cover (truncated or malformed output, API
+    error) fall back to extract_books_from_episode, one call each. A
+    failure on one episode marks only that episode failed. Returns
+    {episode id: result}; an episode that raised maps to {"error": ...}.
+    """
+    from . import extraction_cascade
+    from .models import Episode
+
+    episodes = {e.pk: e for e in Episode.objects.filter(pk__in=episode_ids)}
+    texts = {pk: episode_text(episode) for pk, episode in episodes.items()}
+    found = {}
+    if not refresh:
+        for pk, text in texts.items():
+            result = memoized_result(text)
+            if result is not None:
+                found[pk] = result
+
+    extractor = get_book_extractor()
+    pending = {pk: text for pk, text in texts.items() if pk not in found}
+    traces = {}
+    if extractor.is_available() and extraction_cascade.enabled():
+        phrases = extraction_cascade.load_phrases() if pending else None
+        for pk, text in list(pending.items()):
+            rejected_by, traces[pk] = extraction_cascade.screen(text, phrases)
+            if rejected_by:
+                found[pk] = extraction_cascade.rejection_result(rejected_by, traces[pk])
+                del pending[pk]
+
+    if extractor.is_available() and len(pending) > 1:
+        started = time.perf_counter()
+        covered = extractor.extract_books_multi(pending)
+        for pk, result in covered.items():
+            memoize_result(pending[pk], result)
+            if pk in traces:
+                full = extraction_cascade.full_step(started, shared=len(pending))
+                result = dict(result, cascade=traces[pk] + [full])
+            found[pk] = result
+
+    results = {}
+    for pk, result in found.items():
+        try:
+            results[pk] = apply_extraction_result(episodes[pk], result)
+        except Exception as e:  # apply_extraction_result marked it failed
+            logger.error(f"Error applying extraction for episode {pk}: {e}")
+            results[pk] = {"error": str(e)}
+
+    for pk in episode_ids:
+        if pk in results:
+            continue
+        try:
+            # Already screened above; don't pay for the screen tier twice
+            results[pk] = extract_books_from_episode(pk, refresh=refresh, screen=pk not in traces)
+        except Exception as e:
+            logger.error(f"Error extracting books for episode {pk}: {e}")
+            results[pk] = {"error": str(e)}
+    return results
+
+
+def episode_text(episode) -> str:
+    """The text extraction reads: scraped title and description, or the title."""
+    if not episode.scraped_data:
+        return episode.title
+    raw_title = episode.scraped_data.get("title", episode.title)
+    raw_description = episode.scraped_data.get("description", "")
+    return f"{raw_title}. {raw_description}".strip()
+
+
+def apply_extraction_result(episode, result: Dict) -> Dict:
+    """
+    Persist an extraction result on episode: extraction_result, its books
+    (replacing the previous ones), aired_at and the next stage. Shared by
+    per-episode and batch extraction.
+    """
+    from django.utils import timezone
+
+    from .models import Book, Topic
+
     try:
         # Persist extraction result and overall confidence
         episode.extraction_result = {
@@ -355,13 +595,19 @@ def extract_books_from_episode(episode_id: int) -> Dict:
             "reasoning": result.get("reasoning", ""),
             "books": result.get("books", []),
         }
+        for key in ("rejected_by", "cascade"):
+            if key in result:
+                episode.extraction_result[key] = result[key]
         episode.ai_confidence = result.get("confidence")
 
         # Unlink this episode's books (not delete — other episodes may reference them)
+        unlinked_book_ids = []
         for book in episode.books.all():
             book.episodes.remove(episode)
             if not book.episodes.exists():
                 book.delete()
+            else:
+                unlinked_book_ids.append(book.pk)
 
         from .utils import generate_bookshop_affiliate_url
 
@@ -442,6 +688,8 @@ def extract_books_from_episode(episode_id: int) -> Dict:
                 "status_changed_at",
             ]
         )
+        # After the save above, so a freshly parsed aired_at is included
+        Book.refresh_latest_aired(unlinked_book_ids + [b.pk for b in new_books])
         return result
     except Exception as e:
         _set_episode_failed(episode, e)
@@ -0,0 +1,186 @@
+"""
+Response cache for the public read API.
+
+Astro SSR calls the book/brand/topic endpoints on every page render, but
+the underlying data only changes when the pipeline or an admin writes.
+Rendered JSON responses are cached in Redis under a key that includes a
+global *generation* number; any Book/Episode/Topic/Brand write bumps the
+generation (see signals.py), which orphans every cached entry at once.
+Orphans age out via API_CACHE_TIMEOUT — the TTL is for memory, not for
+freshness.
+
+The generation is a nanosecond timestamp of the last write, so it also
+serves as the change marker for HTTP conditional requests: api_etag and
+api_last_modified feed Django's ``condition`` decorator (wrapped by
+conditional_public_response), which answers If-None-Match /
+If-Modified-Since with 304 before the view runs.
+
+The cache fails open: if Redis is unreachable, views run uncached.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "api:generation"
+
+
+def get_generation():
+    """Current cache generation; initialised on first use."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so an evicted counter never reuses an old value
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """Invalidate every cached API response and ETag."""
+    try:
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+    except Exception as e:
+        logger.warning(f"API cache invalidation failed: {e}")
+
+
+def invalidate_on_commit():
+    """Bump the generation once the current transaction commits."""
+    transaction.on_commit(bump_generation)
+
+
+def _request_digest(request):
+    # Normalise the query string so ?a=1&b=2 and ?b=2&a=1 share an entry
+    params = sorted(
+        (key, value)
+        for key in request.GET
+        for value in request.GET.getlist(key)
+    )
+    # Absolute URLs in the body (pagination links, cover URLs) depend on
+    # scheme and host, and DRF picks the renderer from Accept (or ?format=,
+    # already in params) after this runs, so all of them are part of the key
+    accept = request.META.get("HTTP_ACCEPT", "").replace(" ", "")
+    raw = f"{request.scheme}://{request.get_host()}{request.path}?{params!r}|{accept}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _cache_key(request, namespace, generation):
+    return f"api:{generation}:{namespace}:{_request_digest(request)}"
+
+
+def _request_generation(request):
+    """Generation for this request, looked up once; None if Redis is down."""
+    if not hasattr(request, "_api_generation"):
+        try:
+            request._api_generation = get_generation()
+        except Exception as e:
+            logger.warning(f"API cache unavailable, skipping conditional headers: {e}")
+            request._api_generation = None
+    return request._api_generation
+
+
+def api_etag(request, *args, **kwargs):
+    """Strong ETag for a public API request: generation + request digest."""
+    generation = _request_generation(request) if _is_cacheable(request) else None
+    if generation is None:
+        return None
+    return hashlib.md5(f"{generation}:{_request_digest(request)}".encode()).hexdigest()
+
+
+def api_last_modified(request, *args, **kwargs):
+    """Time of the last public data write, from the generation timestamp."""
+    generation = _request_generation(request) if _is_cacheable(request) else None
+    if generation is None:
+        return None
+    return datetime.fromtimestamp(generation / 1e9, tz=dt_timezone.utc)
+
+
+def conditional_public_response(view_func):
+    """
+    Django's ``condition`` with api_etag / api_last_modified, sending
+    validators only on 200 (and the 304s answered from them): an ETag on
+    a 404 or 400 would let clients revalidate an error as if it were data.
+    """
+    conditional_view = condition(etag_func=api_etag, last_modified_func=api_last_modified)(view_func)
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if response.status_code not in (200, 304):
+            for header in ("ETag", "Last-Modified"):
+                if response.has_header(header):
+                    del response[header]
+        return response
+
+    return wrapper
+
+
+def _is_cacheable(request):
+    # Browsers get the DRF browsable API (HTML); only cache API clients
+    return (
+        request.method in ("GET", "HEAD")
+        and "text/html" not in request.META.get("HTTP_ACCEPT", "")
+    )
+
+
+def cache_public_response(namespace):
+    """
+    Cache successful JSON responses of a public read view.
+
+    Works on plain Django views and on DRF views via
+    ``method_decorator(cache_public_response(...), name="dispatch")``.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable(request):
+                return view_func(request, *args, **kwargs)
+
+            try:
+                key = _cache_key(request, namespace, get_generation())
+                cached = cache.get(key)
+            except Exception as e:
+                logger.warning(f"API cache unavailable, serving uncached: {e}")
+                return view_func(request, *args, **kwargs)
+
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response["X-Cache"] = "HIT"
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            def store(rendered):
+                try:
+                    cache.set(
+                        key,
+                        (rendered.content, rendered["Content-Type"]),
+                        timeout=settings.API_CACHE_TIMEOUT,
+                    )
+                except Exception as e:
+                    logger.warning(f"API cache write failed: {e}")
+
+            # DRF responses are rendered after the view returns
+            if hasattr(response, "add_post_render_callback") and not response.is_rendered:
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
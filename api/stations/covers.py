@@ -0,0 +1,328 @@
+"""
+Cover image ingest.
+
+Every cover download (verification, admin refetch, download_book_covers)
+goes through ingest_cover:
+
+- The response is streamed in chunks into a spooled temporary file (kept
+  in memory while small), hashing as it goes. Downloads over
+  COVER_MAX_BYTES are abandoned as soon as they cross the limit.
+- The Content-Type header and the file's magic bytes must both say it is
+  an image we can serve; the file extension comes from the magic bytes.
+- If the SHA-256 matches the book's current cover, nothing is written.
+  Otherwise the bytes are stored once and the model is saved once.
+
+Covers and their variants are content-addressed: stored as
+``covers/sha256/<ab>/<sha256>.<ext>`` (see blob_name), so identical images
+are shared across books and editions, and a URL never changes content
+(nginx serves that prefix as immutable). Nothing is deleted when a book
+moves to a new cover; ``manage.py gc_covers`` removes unreferenced files.
+
+After a cover is stored, generate_cover_variants writes resized copies at
+COVER_VARIANT_WIDTHS in WebP (and AVIF when Pillow has an AVIF encoder)
+and records them on Book.cover_variants for the API's ``cover_sources``.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from . import http_client
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 64 * 1024
+# Covers above this stay in memory rather than spilling to a temp file
+_SPOOL_MAX = 1024 * 1024
+
+COVER_BLOB_PREFIX = "covers/sha256/"
+
+
+class CoverRejected(Exception):
+    """Downloaded data isn't an acceptable cover image."""
+
+
+def sniff_image_type(head):
+    """File extension for an image's leading bytes, or None if unrecognised."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return ".avif"
+    return None
+
+
+def file_sha256(fileobj):
+    """Hex SHA-256 of a file object, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def current_cover_sha256(book):
+    """Hash of the book's stored cover (computed once for pre-hash covers)."""
+    if book.cover_sha256 or not book.cover_image:
+        return book.cover_sha256
+    try:
+        with book.cover_image.open("rb") as f:
+            return file_sha256(f)
+    except (OSError, ValueError):
+        return ""  # missing file: treat as no cover
+
+
+def blob_name(sha256, extension):
+    """Content-addressed storage name for bytes with this hash."""
+    return f"{COVER_BLOB_PREFIX}{sha256[:2]}/{sha256}{extension}"
+
+
+def store_blob(storage, sha256, extension, content):
+    """
+    Save content under its content-addressed name unless already there.
+
+    A reused blob may be one gc_covers is about to collect, so its mtime is
+    refreshed: the grace period then covers it until the book referencing
+    it is saved.
+    """
+    name = blob_name(sha256, extension)
+    if storage.exists(name):
+        try:
+            os.utime(storage.path(name))
+        except NotImplementedError:
+            pass  # remote storage: gc_covers re-checks references before deleting
+        return name
+    return storage.save(name, content)
+
+
+def is_referenced(name):
+    """Whether any book uses the stored file name as its cover or a variant."""
+    from django.db.models import Q
+
+    from .models import Book
+
+    return Book.objects.filter(
+        Q(cover_image=name) | Q(cover_variants__contains=[{"name": name}])
+    ).exists()
+
+
+def download_cover(url, max_bytes=None):
+    """
+    Stream url into a spooled temp file.
+
+    Returns (file, sha256, extension) with the file rewound. Raises
+    CoverRejected for oversized or non-image responses, and lets
+    http_client errors propagate.
+    """
+    max_bytes = max_bytes or settings.COVER_MAX_BYTES
+    headers = {"User-Agent": "Mozilla/5.0 (compatible; RadioReads/1.0)"}
+    with http_client.stream(url, headers=headers, timeout=30) as response:
+        content_type = response.headers.get("Content-Type", "")
+        if content_type and not content_type.startswith("image/"):
+            raise CoverRejected(f"Not an image (Content-Type {content_type})")
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > max_bytes:
+            raise CoverRejected(f"Cover too large ({length} bytes)")
+
+        tmp = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            for chunk in iter(lambda: response.read(_CHUNK_SIZE), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise CoverRejected(f"Cover too large (over {max_bytes} bytes)")
+                digest.update(chunk)
+                tmp.write(chunk)
+            tmp.seek(0)
+            extension = sniff_image_type(tmp.read(16))
+            if extension is None:
+                raise CoverRejected("Downloaded file is not a recognised image")
+            tmp.seek(0)
+        except BaseException:
+            tmp.close()
+            raise
+    return tmp, digest.hexdigest(), extension
+
+
+def ingest_cover(book, url):
+    """
+    Download url as book's cover. Returns True if a new file was stored,
+    False if it matched the current cover (nothing written).
+
+    Clears cover_fetch_error either way. Raises CoverRejected and http_client
+    errors for the caller to record.
+    """
+    tmp, sha256, extension = download_cover(url)
+    with tmp:
+        if book.cover_image and sha256 == current_cover_sha256(book):
+            update_fields = []
+            if book.cover_sha256 != sha256:
+                book.cover_sha256 = sha256
+                update_fields.append("cover_sha256")
+            if book.cover_fetch_error:
+                book.cover_fetch_error = ""
+                update_fields.append("cover_fetch_error")
+            if update_fields:
+                book.save(update_fields=update_fields)
+            logger.info(f"Cover for '{book.title}' unchanged, skipped write")
+            if not book.cover_variants:
+                _generate_variants_safely(book)
+            return False
+
+        book.cover_image = store_blob(book.cover_image.storage, sha256, extension, File(tmp))
+        book.cover_sha256 = sha256
+        book.cover_fetch_error = ""
+        book.save(update_fields=["cover_image", "cover_sha256", "cover_fetch_error"])
+
+    logger.info(f"Stored cover for '{book.title}' ({book.cover_image.name})")
+    _generate_variants_safely(book)
+    return True
+
+
+def adopt_stored_cover(book):
+    """
+    Move a cover saved some other way (admin upload, pre-content-addressing
+    path) to its content-addressed name and regenerate variants.
+
+    Returns True if the book was updated. The old file is left for gc_covers.
+    """
+    if not book.cover_image:
+        return False
+    with book.cover_image.open("rb") as f:
+        extension = sniff_image_type(f.read(16))
+        if extension is None:
+            raise CoverRejected("Stored cover is not a recognised image")
+        f.seek(0)
+        sha256 = file_sha256(f)
+        f.seek(0)
+        name = store_blob(book.cover_image.storage, sha256, extension, File(f))
+    if name == book.cover_image.name and sha256 == book.cover_sha256:
+        return False
+    book.cover_image = name
+    book.cover_sha256 = sha256
+    book.save(update_fields=["cover_image", "cover_sha256"])
+    generate_cover_variants(book)
+    return True
+
+
+# Encoder settings per variant format; AVIF only if Pillow can write it
+_VARIANT_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+
+
+def variant_formats():
+    """Formats generated on this install, smallest first."""
+    Image.init()
+    return (["avif"] if "AVIF" in Image.SAVE else []) + ["webp"]
+
+
+def _variant_widths(image_width):
+    """Widths to generate for a cover image_width wide: never upscaled."""
+    widths = sorted(w for w in settings.COVER_VARIANT_WIDTHS if w <= image_width)
+    return widths or [image_width]  # tiny cover: re-encode at its own size
+
+
+def _variants_current(variants, formats):
+    """Whether variants match the formats and COVER_VARIANT_WIDTHS configured now."""
+    source_widths = {v.get("source_width") for v in variants}
+    if len(source_widths) != 1 or None in source_widths:
+        return False  # recorded before source_width was stored
+    expected = {(fmt, width) for fmt in formats for width in _variant_widths(source_widths.pop())}
+    return {(v["format"], v["width"]) for v in variants} == expected
+
+
+def generate_cover_variants(book, reuse=True):
+    """
+    Write resized, re-encoded copies of book's cover and record them.
+
+    One file per (format, width) for each COVER_VARIANT_WIDTHS entry no
+    wider than the original (never upscaled), each content-addressed.
+    Stores a list of {"format", "width", "height", "name", "source_width"}
+    on book.cover_variants and returns it.
+
+    With reuse, a book sharing the same cover bytes lends its variants
+    instead of re-encoding, as long as they match the formats and widths
+    configured now.
+    """
+    storage = book.cover_image.storage
+    formats = set(variant_formats())
+    sibling = None
+    if reuse and book.cover_sha256:
+        sibling = (
+            type(book).objects.filter(cover_sha256=book.cover_sha256)
+            .exclude(pk=book.pk).exclude(cover_variants=[])
+            .values_list("cover_variants", flat=True).first()
+        )
+    if sibling and _variants_current(sibling, formats):
+        book.cover_variants = sibling
+        book.save(update_fields=["cover_variants"])
+        return sibling
+
+    variants = []
+    if book.cover_image:
+        with book.cover_image.open("rb") as f:
+            image = ImageOps.exif_transpose(Image.open(f))
+            image = image.convert("RGB")
+        for fmt in variant_formats():
+            for width in _variant_widths(image.width):
+                height = round(image.height * width / image.width)
+                buf = io.BytesIO()
+                image.resize((width, height), Image.LANCZOS).save(buf, **_VARIANT_FORMATS[fmt])
+                data = buf.getvalue()
+                name = store_blob(
+                    storage, hashlib.sha256(data).hexdigest(), f".{fmt}", ContentFile(data)
+                )
+                variants.append({
+                    "format": fmt, "width": width, "height": height, "name": name,
+                    "source_width": image.width,
+                })
+
+    book.cover_variants = variants
+    book.save(update_fields=["cover_variants"])
+    return variants
+
+
+def _generate_variants_safely(book):
+    # A bad variant must not fail the cover download itself
+    try:
+        generate_cover_variants(book)
+    except Exception as e:
+        logger.error(f"Cover variants failed for '{book.title}': {e}")
+
+
+def cover_sources(book):
+    """
+    ``<picture>``-ready sources for the API: one entry per format, best
+    compression first, each with a srcset string and the largest variant's
+    dimensions (for aspect ratio).
+    """
+    if not book.cover_variants:
+        return []
+    storage = book.cover_image.storage
+    sources = []
+    for fmt in ("avif", "webp"):
+        variants = sorted(
+            (v for v in book.cover_variants if v["format"] == fmt), key=lambda v: v["width"]
+        )
+        if variants:
+            sources.append({
+                "type": f"image/{fmt}",
+                "srcset": ", ".join(f"{storage.url(v['name'])} {v['width']}w" for v in variants),
+                "width": variants[-1]["width"],
+                "height": variants[-1]["height"],
+            })
+    return sources
@@ -0,0 +1,212 @@
+"""
+Book extraction through the Anthropic Message Batches API.
+
+Large runs (a backfill, reprocess_all --batch, or a sweep that finds at
+least EXTRACTION_BATCH_MIN_EPISODES waiting) submit their episodes as
+one Message Batch instead of one messages.create call each: same
+prompt (BookExtractor.request_params), half the price, and no
+per-request rate limits. The episodes move to EXTRACTION_BATCHED, with
+task_id set to the batch id.
+
+poll_extraction_batches (Celery beat, every few minutes) checks the
+unfinished batches. Once a batch has ended, the poll claims it
+(IN_PROGRESS -> APPLYING, so an overlapping poll leaves it alone) and
+each result goes through ai_utils.apply_extraction_result, the same
+persistence path as per-episode extraction. Requests that errored,
+expired or came back unparseable put their episode back to SCRAPED for
+the next sweep; episodes whose results failed to save are left failed.
+Episodes whose text has a memoized result (ExtractionMemo) are applied
+at submission and never enter a batch.
+Results for episodes that have since been reprocessed some other way are
+ignored.
+"""
+
+import logging
+
+from django.utils import timezone
+
+from .ai_utils import (
+    apply_extraction_result,
+    episode_text,
+    get_book_extractor,
+    memoize_result,
+    memoized_result,
+)
+from .models import Episode, ExtractionBatch
+
+logger = logging.getLogger(__name__)
+
+_CUSTOM_ID_PREFIX = "episode-"
+
+
+def batching_enabled():
+    from django.conf import settings
+
+    return settings.EXTRACTION_BATCH_MIN_EPISODES > 0
+
+
+def submit_extraction_batch(episodes, refresh=False):
+    """
+    Submit episodes (a queryset or list) as one Message Batch. Memoized
+    episodes are applied right away instead, unless refresh=True.
+
+    Returns the ExtractionBatch, or None if there was nothing left to
+    submit or the API isn't configured. API errors propagate; the
+    episodes are left as they were.
+    """
+    extractor = get_book_extractor()
+    episodes = list(episodes)
+    if not episodes or not extractor.is_available():
+        return None
+
+    if not refresh:
+        unmemoized = []
+        for episode in episodes:
+            result = memoized_result(episode_text(episode))
+            if result is None:
+                unmemoized.append(episode)
+                continue
+            try:
+                apply_extraction_result(episode, result)
+            except Exception as e:  # marked failed; don't let one episode stop the batch
+                logger.error(f"Error applying memoized extraction for episode {episode.pk}: {e}")
+        episodes = unmemoized
+        if not episodes:
+            return None
+
+    requests = [
+        {
+            "custom_id": f"{_CUSTOM_ID_PREFIX}{episode.pk}",
+            "params": extractor.request_params(episode_text(episode)),
+        }
+        for episode in episodes
+    ]
+    message_batch = extractor.client.messages.batches.create(requests=requests)
+    batch = ExtractionBatch.objects.create(batch_id=message_batch.id, episode_count=len(episodes))
+    Episode.objects.filter(pk__in=[episode.pk for episode in episodes]).update(
+        stage=Episode.STAGE_EXTRACTION_BATCHED,
+        task_id=message_batch.id,
+        last_error=None,
+        status_changed_at=timezone.now(),
+    )
+    logger.info(f"Submitted extraction batch {batch.batch_id} with {len(episodes)} episodes")
+    return batch
+
+
+def _return_to_sweep(episode_ids, error):
+    """Put batched episodes back to SCRAPED so the next sweep retries them."""
+    return Episode.objects.filter(
+        pk__in=episode_ids, stage=Episode.STAGE_EXTRACTION_BATCHED
+    ).update(
+        stage=Episode.STAGE_SCRAPED,
+        task_id=None,
+        last_error=error[:200],
+        status_changed_at=timezone.now(),
+    )
+
+
+def _apply_result(batch, item, extractor):
+    """Apply one batch result line. Returns "applied", "retry" or "stale"."""
+    try:
+        episode_id = int(item.custom_id.removeprefix(_CUSTOM_ID_PREFIX))
+    except ValueError:
+        logger.warning(f"Batch {batch.batch_id}: unexpected custom_id {item.custom_id}")
+        return "stale"
+    episode = Episode.objects.filter(
+        pk=episode_id, stage=Episode.STAGE_EXTRACTION_BATCHED, task_id=batch.batch_id
+    ).first()
+    if episode is None:
+        return "stale"  # deleted, or reprocessed since the batch was submitted
+
+    if item.result.type != "succeeded":
+        _return_to_sweep([episode_id], f"Batch request {item.result.type}")
+        return "retry"
+    try:
+        result = extractor.parse_response(item.result.message.content[0].text)
+    except ValueError as e:  # json.JSONDecodeError is a ValueError
+        _return_to_sweep([episode_id], f"Batch response unparseable: {e}")
+        return "retry"
+
+    memoize_result(episode_text(episode), result)
+    apply_extraction_result(episode, result)
+    return "applied"
+
+
+def apply_batch(batch):
+    """
+    Apply an ended batch's results. Returns counts per outcome, or None if
+    another poll has already claimed the batch.
+
+    If applying raises part-way, the batch goes back to IN_PROGRESS for the
+    next poll; results already applied come back "stale" then.
+    """
+    claimed = ExtractionBatch.objects.filter(
+        pk=batch.pk, status=ExtractionBatch.STATUS_IN_PROGRESS
+    ).update(status=ExtractionBatch.STATUS_APPLYING)
+    if not claimed:
+        logger.info(f"Extraction batch {batch.batch_id} is already being applied")
+        return None
+    batch.status = ExtractionBatch.STATUS_APPLYING
+
+    extractor = get_book_extractor()
+    counts = {"applied": 0, "retry": 0, "failed": 0, "stale": 0}
+    try:
+        for item in extractor.client.messages.batches.results(batch.batch_id):
+            try:
+                outcome = _apply_result(batch, item, extractor)
+            except Exception as e:
+                # apply_extraction_result has marked the episode failed; it stays failed
+                logger.error(f"Batch {batch.batch_id}: failed to apply {item.custom_id}: {e}")
+                outcome = "failed"
+            counts[outcome] += 1
+    except Exception:
+        batch.status = ExtractionBatch.STATUS_IN_PROGRESS
+        batch.save(update_fields=["status"])
+        raise
+
+    # Episodes the results never mentioned
+    counts["retry"] += _return_to_sweep(
+        Episode.objects.filter(task_id=batch.batch_id).values_list("pk", flat=True),
+        "Missing from batch results",
+    )
+    batch.status = ExtractionBatch.STATUS_APPLIED
+    batch.save(update_fields=["status"])
+    logger.info(f"Applied extraction batch {batch.batch_id}: {counts}")
+    return counts
+
+
+def poll_extraction_batches():
+    """
+    Check every unfinished batch and apply those that have ended. Returns
+    {batch_id: processing status, or outcome counts once applied}.
+    """
+    from anthropic import NotFoundError
+
+    extractor = get_book_extractor()
+    if not extractor.is_available():
+        return {}
+
+    report = {}
+    for batch in ExtractionBatch.objects.filter(status=ExtractionBatch.STATUS_IN_PROGRESS):
+        try:
+            message_batch = extractor.client.messages.batches.retrieve(batch.batch_id)
+        except NotFoundError as e:
+            batch.status = ExtractionBatch.STATUS_FAILED
+            batch.last_error = str(e)[:500]
+            batch.save(update_fields=["status", "last_error"])
+            _return_to_sweep(
+                Episode.objects.filter(task_id=batch.batch_id).values_list("pk", flat=True),
+                "Extraction batch not found",
+            )
+            report[batch.batch_id] = "not_found"
+            continue
+
+        batch.request_counts = message_batch.request_counts.model_dump()
+        if message_batch.processing_status != "ended":
+            batch.save(update_fields=["request_counts"])
+            report[batch.batch_id] = message_batch.processing_status
+            continue
+        batch.ended_at = message_batch.ended_at or timezone.now()
+        batch.save(update_fields=["request_counts", "ended_at"])
+        report[batch.batch_id] = apply_batch(batch) or ExtractionBatch.STATUS_APPLYING
+    return report
@@ -0,0 +1,200 @@
+"""
+Cheap tiers in front of the Sonnet book extractor.
+
+Most episodes mention no book, yet each one used to cost a full Sonnet
+call. When EXTRACTION_CASCADE_TIERS is set, screen() first runs the
+episode text through the configured tiers, in order:
+
+- "keyword": rejects text that contains none of BOOK_SIGNALS and none of
+  the admin's Phrase list. It costs nothing. It does miss books named
+  without any book word ("George Saunders on Vigil"), so leave it out if
+  that matters more than the savings. Callers screening a batch load the
+  phrases once with load_phrases() and pass them to each screen() call.
+- "screen": one short call to SCREEN_MODEL asking how likely it is that
+  a specific book is discussed. Below EXTRACTION_SCREEN_THRESHOLD the
+  text is rejected. Errors and unparseable replies pass it on.
+
+A rejection becomes a no-book result without calling Sonnet. Everything
+else goes on to BookExtractor as before.
+
+Every step is recorded in extraction_result["cascade"] as {"tier",
+"passed", "ms"}, plus the screen's probability "p". cascade_stats()
+(manage.py cascade_report) computes per-tier pass rates and latency from
+the database. With EXTRACTION_CASCADE_AUDIT_RATE > 0, that fraction of
+rejections still goes on to Sonnet, marked "audit", which measures how
+many books each tier throws away.
+
+Rejections are never memoized, because ExtractionMemo holds Sonnet
+results only. Message Batches skip the cascade: they are already half
+price, and screening a thousand episodes at submission would stall the
+sweep.
+"""
+
+import json
+import logging
+import random
+import re
+import time
+
+from anthropic import APIError
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+SCREEN_MODEL = "claude-haiku-4-5-20251001"
+
+BOOK_SIGNALS = re.compile(
+    r"\b(books?|novels?|novelists?|novellas?|memoirs?|autobiograph\w*|biograph\w*|"
+    r"authors?|writers?|poets?|poems?|poetry|stories|fiction|non-fiction|published|"
+    r"publishing|literary|literature|prizes?|shortlist\w*|longlist\w*|reads?|reading)\b",
+    re.IGNORECASE,
+)
+
+SCREEN_INSTRUCTIONS = """Does this radio episode text discuss or review a specific, identifiable book, or interview its author about it? Books mentioned only as the source of a film, TV, theatre or musical adaptation don't count.
+
+Return JSON only: {"book_probability": <0.0 to 1.0>}"""
+
+
+def enabled():
+    return bool(settings.EXTRACTION_CASCADE_TIERS)
+
+
+def load_phrases():
+    """The admin's Phrase list, casefolded for the keyword tier (None if that tier is off)."""
+    from .models import Phrase
+
+    if "keyword" not in settings.EXTRACTION_CASCADE_TIERS:
+        return None
+    return [phrase.casefold() for phrase in Phrase.objects.values_list("text", flat=True)]
+
+
+# Tiers take the text and the batch's phrases (None = not loaded yet)
+
+
+def _keyword_tier(text, phrases):
+    if BOOK_SIGNALS.search(text):
+        return True, {}
+    if phrases is None:
+        phrases = load_phrases()
+    lowered = text.casefold()
+    return any(phrase in lowered for phrase in phrases), {}
+
+
+def _screen_tier(text, phrases):
+    from .ai_utils import BookExtractor, get_book_extractor
+
+    extractor = get_book_extractor()
+    if not extractor.is_available():
+        return True, {"error": "API not configured"}
+    try:
+        message = extractor.client.messages.create(
+            model=SCREEN_MODEL,
+            max_tokens=50,
+            system=SCREEN_INSTRUCTIONS,
+            messages=[{"role": "user", "content": f'Episode text: "{text}"'}],
+        )
+        reply = json.loads(BookExtractor._strip_fences(message.content[0].text))
+        probability = float(reply["book_probability"])
+    except (APIError, IndexError, KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Screen tier failed, passing episode on: {e}")
+        return True, {"error": str(e)[:200]}
+    return probability >= settings.EXTRACTION_SCREEN_THRESHOLD, {"p": round(probability, 3)}
+
+
+_TIERS = {"keyword": _keyword_tier, "screen": _screen_tier}
+
+
+def screen(text, phrases=None):
+    """
+    Run text through the configured tiers. Returns (rejected_by, trace):
+    rejected_by names the tier that rejected it, or is None if the text
+    should go on to the extractor (audited rejections included).
+
+    phrases is load_phrases() for the batch; if None, the keyword tier
+    loads them itself when it needs them.
+    """
+    trace = []
+    for tier in settings.EXTRACTION_CASCADE_TIERS:
+        if tier not in _TIERS:
+            raise ImproperlyConfigured(f"Unknown extraction cascade tier: {tier}")
+        started = time.perf_counter()
+        passed, details = _TIERS[tier](text, phrases)
+        trace.append({
+            "tier": tier,
+            "passed": passed,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+            **details,
+        })
+        if not passed:
+            if random.random() < settings.EXTRACTION_CASCADE_AUDIT_RATE:
+                trace[-1]["audit"] = True
+                return None, trace
+            logger.info(f"Extraction cascade: rejected by {tier} tier")
+            return tier, trace
+    return None, trace
+
+
+def rejection_result(rejected_by, trace):
+    """The no-book result for text a tier rejected."""
+    return {
+        "has_book": False,
+        "confidence": None,
+        "books": [],
+        "reasoning": f"No book discussed ({rejected_by} tier)",
+        "rejected_by": rejected_by,
+        "cascade": trace,
+    }
+
+
+def full_step(started, shared=1):
+    """Trace entry for the Sonnet call, started at perf_counter() time started."""
+    step = {"tier": "full", "passed": True, "ms": round((time.perf_counter() - started) * 1000 / shared, 1)}
+    if shared > 1:
+        step["shared"] = shared
+    return step
+
+
+def _p95(values):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.95))] if values else 0
+
+
+def cascade_stats(results):
+    """
+    Per-tier counts and latency over extraction results that have a trace.
+
+    Returns {tier: {seen, passed, pass_rate, mean_ms, p95_ms}}. The "full"
+    tier also gets book_rate: how many episodes that reached Sonnet had a
+    book, i.e. the precision of the tiers before it. Tiers with audited
+    rejections get audited and missed: how many of those Sonnet still
+    found a book in.
+    """
+    stats = {}
+    for result in results:
+        for step in result.get("cascade") or []:
+            tier = stats.setdefault(step["tier"], {"seen": 0, "passed": 0, "ms": [], "books": 0, "audited": 0, "missed": 0})
+            tier["seen"] += 1
+            tier["passed"] += int(step["passed"])
+            tier["ms"].append(step["ms"])
+            if step["tier"] == "full" and result.get("has_book"):
+                tier["books"] += 1
+            if step.get("audit"):
+                tier["audited"] += 1
+                tier["missed"] += int(bool(result.get("has_book")))
+
+    report = {}
+    for name, tier in stats.items():
+        report[name] = {
+            "seen": tier["seen"],
+            "passed": tier["passed"],
+            "pass_rate": round(tier["passed"] / tier["seen"], 3),
+            "mean_ms": round(sum(tier["ms"]) / len(tier["ms"]), 1),
+            "p95_ms": _p95(tier["ms"]),
+        }
+        if name == "full":
+            report[name]["book_rate"] = round(tier["books"] / tier["seen"], 3)
+        if tier["audited"]:
+            report[name]["audited"] = tier["audited"]
+            report[name]["missed"] = tier["missed"]
+    return report
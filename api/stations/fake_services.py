@@ -0,0 +1,511 @@
+"""
+Local stand-ins for the external services the pipeline calls.
+
+FakeServices runs one threaded HTTP server that answers, by path prefix:
+
+- ``/anthropic/v1/messages``: Anthropic Messages API. Replies with the
+  extraction JSON BookExtractor expects, finding the book in episode text
+  written by the feeds below. ``/anthropic/v1/messages/batches`` is the
+  Message Batches API over the same replies; a batch ends on its second
+  status check.
+- ``/books/v1/volumes``: Google Books search (``intitle:``/``inauthor:``,
+  ``isbn:``) and volume detail.
+- ``/openlibrary/search.json``: Open Library search.
+- ``/covers/<name>.jpg``: cover images.
+- ``/bbc/<slug>`` and ``/bbc/<slug>/episodes/<n>``: BBC Sounds list pages
+  (paginated) and episode detail pages, in the markup the spider parses.
+- ``/rss/<slug>.xml``: podcast RSS feeds.
+- ``/wnyc/api/v3/story/``: the WNYC story API.
+
+Every feed has ``episodes`` episodes, generated deterministically from its
+slug; ``book_rate`` of them discuss a (made-up) book. Each service gets a
+ServiceProfile with latency, jitter, a 5xx error rate and a 429 rate.
+Responses recorded in ``fixtures_dir/<service>.json`` (a map of request
+path, with or without query string, to ``{"status", "content_type",
+"body"}``) replace the generated ones. Request counts per service are
+kept for reports and served at ``/_stats``.
+
+settings_overrides() returns the Django settings that point the app at
+the server; setting FAKE_SERVICES_URL does the same for other processes
+(e.g. Celery workers in benchmark_pipeline --live-workers).
+"""
+
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+SERVICES = ("anthropic", "google_books", "open_library", "covers", "bbc", "rss", "wnyc")
+
+_ROUTES = (
+    ("/anthropic/", "anthropic"),
+    ("/books/v1/", "google_books"),
+    ("/openlibrary/", "open_library"),
+    ("/covers/", "covers"),
+    ("/bbc/", "bbc"),
+    ("/rss/", "rss"),
+    ("/wnyc/", "wnyc"),
+)
+
+_FIRST_NAMES = ("Ada", "Ben", "Clara", "Dev", "Elif", "Femi", "Grace", "Hugo", "Ines", "Jonah")
+_LAST_NAMES = ("Achebe", "Brooks", "Castell", "Dunmore", "Ellery", "Farrow", "Goldin", "Hale")
+_ADJECTIVES = ("Silent", "Golden", "Hidden", "Last", "Northern", "Paper", "Salt", "Winter")
+_NOUNS = ("River", "Orchard", "Lighthouse", "Archive", "Harbour", "Garden", "Letters", "Road")
+
+# The fake Anthropic endpoint finds books by this phrasing in episode text
+_BOOK_MENTION = re.compile(r"([A-Z][a-z]+ [A-Z][a-z]+) discusses the novel ([^.]+)\.")
+
+_EPISODE_TAG = re.compile(r'<episode id="(\d+)">(.*?)</episode>', re.S)
+
+_BBC_PAGE_SIZE = 10
+
+
+class ServiceProfile:
+    """Latency and failure behaviour for one fake service."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, rate_limit_rate=0.0):
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self.rate_limit_rate = float(rate_limit_rate)
+
+    @classmethod
+    def parse(cls, spec, base=None):
+        """``"latency_ms=800,error_rate=0.02"`` on top of base's values."""
+        values = dict(vars(base)) if base else {}
+        for part in filter(None, spec.split(",")):
+            key, _, value = part.partition("=")
+            if key not in ("latency_ms", "jitter_ms", "error_rate", "rate_limit_rate"):
+                raise ValueError(f"Unknown profile setting '{key}'")
+            values[key] = float(value)
+        return cls(**values)
+
+
+class FakeEpisode:
+    """One generated episode of a fake feed."""
+
+    def __init__(self, slug, index, book_rate):
+        rng = random.Random(f"{slug}:{index}")
+        self.index = index
+        self.aired = date(2026, 1, 1) - timedelta(days=index)
+        self.title = f"{slug.replace('-', ' ').title()}: episode {index}"
+        self.book = None
+        if rng.random() < book_rate:
+            author = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+            title = f"The {rng.choice(_ADJECTIVES)} {rng.choice(_NOUNS)} {index}"
+            self.book = (title, author)
+            self.description = (
+                f"{author} discusses the novel {title}. "
+                "Plus reviews of this week's exhibitions and new music."
+            )
+        else:
+            self.description = "Arts news and reviews from this week, with live music in the studio."
+
+
+def _extraction_result(text):
+    """What the extraction prompt should return for text."""
+    match = _BOOK_MENTION.search(text)
+    if not match:
+        return {"has_book": False, "confidence": 0.9, "books": [], "reasoning": "No book discussed."}
+    author, title = match.groups()
+    return {
+        "has_book": True,
+        "confidence": 0.95,
+        "books": [{
+            "title": title, "author": author,
+            "description": f"A novel by {author}.", "topics": ["fiction"],
+        }],
+        "reasoning": "Author interviewed about a named novel.",
+    }
+
+
+class FakeServices:
+    """
+    The fake services on one local HTTP server.
+
+    Use as a context manager (or start()/stop()); ``url`` is the base URL,
+    or public_url when other hosts reach the server under another name.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, episodes=20, book_rate=0.6,
+                 default_profile=None, profiles=None, fixtures_dir=None, public_url=None):
+        self.host = host
+        self.port = port
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.episodes = episodes
+        self.book_rate = book_rate
+        self.default_profile = default_profile or ServiceProfile()
+        self.profiles = profiles or {}
+        self.fixtures = {}
+        if fixtures_dir:
+            for path in Path(fixtures_dir).glob("*.json"):
+                self.fixtures[path.stem] = json.loads(path.read_text())
+        self.volumes = {}  # Google Books volume id -> volume, for detail requests
+        self.batches = {}  # Anthropic Message Batch id -> requests' results
+        self._counts = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self._server = None
+        self._cover = None
+
+    # --- lifecycle ---
+
+    def start(self):
+        handler = type("FakeServicesHandler", (_Handler,), {"services": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self):
+        if self.public_url:
+            return self.public_url
+        host, port = self._server.server_address[:2]
+        if host == "0.0.0.0":
+            host = "127.0.0.1"
+        return f"http://{host}:{port}"
+
+    def settings_overrides(self):
+        """Django settings pointing the app at this server."""
+        url = self.url
+        return {
+            "ANTHROPIC_BASE_URL": f"{url}/anthropic",
+            "GOOGLE_BOOKS_API_BASE": f"{url}/books/v1",
+            "OPEN_LIBRARY_API_BASE": f"{url}/openlibrary",
+            "WNYC_API_BASE": f"{url}/wnyc/api/v3/story/",
+        }
+
+    def brand_url(self, kind, slug):
+        """Brand.url for a fake feed: kind is "bbc", "rss" or "wnyc"."""
+        url = self.url
+        return {
+            "bbc": f"{url}/bbc/{slug}",
+            "rss": f"{url}/rss/{slug}.xml",
+            "wnyc": f"{url}/wnyc/shows/{slug}",
+        }[kind]
+
+    # --- bookkeeping ---
+
+    def profile(self, service):
+        return self.profiles.get(service, self.default_profile)
+
+    def count(self, service, outcome):
+        with self._lock:
+            self._counts[service][outcome] += 1
+
+    def stats(self):
+        """{service: {"calls", "errors", "rate_limited"}} for services called so far."""
+        with self._lock:
+            return {
+                service: {
+                    "calls": counts["calls"],
+                    "errors": counts["errors"],
+                    "rate_limited": counts["rate_limited"],
+                }
+                for service, counts in self._counts.items()
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
+
+    def roll(self, rate):
+        with self._lock:
+            return self._rng.random() < rate
+
+    def feed(self, slug):
+        return [FakeEpisode(slug, i, self.book_rate) for i in range(1, self.episodes + 1)]
+
+    def cover_bytes(self):
+        if self._cover is None:
+            from PIL import Image
+
+            buf = io.BytesIO()
+            Image.new("RGB", (400, 600), (40, 90, 140)).save(buf, "JPEG")
+            self._cover = buf.getvalue()
+        return self._cover
+
+    # --- responses: (status, content_type, body) ---
+
+    def anthropic(self, method, path, query, body):
+        if path.endswith("/v1/messages") and method == "POST":
+            return 200, "application/json", self._message(json.loads(body or b"{}"))
+        batch_path = re.match(r".*/v1/messages/batches(?:/([\w-]+))?(/results)?$", path)
+        if batch_path:
+            batch_id, results = batch_path.groups()
+            if batch_id is None and method == "POST":
+                return 200, "application/json", self._create_batch(json.loads(body or b"{}"))
+            batch = self.batches.get(batch_id)
+            if batch is not None:
+                if results:
+                    lines = (json.dumps(line) for line in batch["results"])
+                    return 200, "application/binary", "\n".join(lines) + "\n"
+                # Batches report "in_progress" once, then end (results_url appears)
+                batch["polls"] += 1
+                return 200, "application/json", self._batch_status(batch)
+        return 404, "application/json", {"type": "error", "error": {"type": "not_found_error"}}
+
+    def _message(self, request):
+        content = request.get("messages", [{}])[0].get("content", "")
+        if isinstance(content, list):  # content blocks
+            content = " ".join(block.get("text", "") for block in content)
+        episodes = _EPISODE_TAG.findall(content)
+        if "book_probability" in str(request.get("system", "")):  # extraction cascade screen
+            text = json.dumps({"book_probability": 0.9 if _BOOK_MENTION.search(content) else 0.05})
+        elif episodes:  # multi-episode prompt: one result per tagged episode
+            text = json.dumps([{"id": int(i), **_extraction_result(t)} for i, t in episodes])
+        else:
+            text = json.dumps(_extraction_result(content))
+        return {
+            "id": f"msg_fake_{hashlib.sha1(content.encode()).hexdigest()[:16]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": len(content) // 4,
+                "output_tokens": len(text) // 4,
+            },
+        }
+
+    def _create_batch(self, request):
+        batch_id = f"msgbatch_fake_{len(self.batches) + 1:06d}"
+        results = [
+            {"custom_id": r["custom_id"], "result": {"type": "succeeded", "message": self._message(r["params"])}}
+            for r in request.get("requests", [])
+        ]
+        batch = {"id": batch_id, "results": results, "polls": 0}
+        with self._lock:
+            self.batches[batch_id] = batch
+        return self._batch_status(batch)
+
+    def _batch_status(self, batch):
+        ended = batch["polls"] > 1
+        created = "2026-01-01T00:00:00Z"
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else len(batch["results"]),
+                "succeeded": len(batch["results"]) if ended else 0,
+                "errored": 0, "canceled": 0, "expired": 0,
+            },
+            "created_at": created,
+            "expires_at": "2026-01-02T00:00:00Z",
+            "ended_at": created if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.url}/anthropic/v1/messages/batches/{batch['id']}/results" if ended else None,
+        }
+
+    def _volume(self, title, author):
+        digest = hashlib.sha1(f"{title}|{author}".lower().encode()).hexdigest()
+        volume_id = digest[:12]
+        cover = f"{self.url}/covers/{volume_id}.jpg"
+        volume = {
+            "id": volume_id,
+            "volumeInfo": {
+                "title": title,
+                "authors": [author] if author else [],
+                "description": f"A novel by {author}." if author else "",
+                "industryIdentifiers": [
+                    {"type": "ISBN_13", "identifier": f"978{int(digest, 16) % 10**10:010d}"},
+                ],
+                "imageLinks": {"thumbnail": cover, "large": cover},
+            },
+            "searchInfo": {"textSnippet": f"{title} by {author}"},
+        }
+        with self._lock:
+            self.volumes[volume_id] = volume
+        return volume
+
+    def google_books(self, method, path, query, body):
+        if path.startswith("/books/v1/volumes/"):
+            volume = self.volumes.get(urllib.parse.unquote(path.rsplit("/", 1)[1]))
+            if volume is None:
+                return 404, "application/json", {"error": {"code": 404, "message": "Not found"}}
+            return 200, "application/json", volume
+        q = query.get("q", [""])[0]
+        isbn = re.match(r"isbn:(\d+)", q)
+        if isbn:
+            items = [
+                v for v in list(self.volumes.values())
+                if v["volumeInfo"]["industryIdentifiers"][0]["identifier"] == isbn.group(1)
+            ]
+        else:
+            match = re.match(r"intitle:(.*?) inauthor:(.*)", q)
+            title, author = match.groups() if match else (q, "")
+            items = [self._volume(title.strip(), author.strip())] if title.strip() else []
+        return 200, "application/json", {"items": items} if items else {}
+
+    def open_library(self, method, path, query, body):
+        title = query.get("title", [""])[0]
+        author = query.get("author", [""])[0]
+        if not title:
+            return 200, "application/json", {"docs": []}
+        volume = self._volume(title, author)
+        return 200, "application/json", {"docs": [{
+            "title": title,
+            "author_name": [author] if author else [],
+            "isbn": [volume["volumeInfo"]["industryIdentifiers"][0]["identifier"]],
+            "cover_i": int(volume["id"][:6], 16),
+        }]}
+
+    def covers(self, method, path, query, body):
+        return 200, "image/jpeg", self.cover_bytes()
+
+    def bbc(self, method, path, query, body):
+        parts = path.strip("/").split("/")  # bbc, slug[, episodes, n]
+        if len(parts) == 4 and parts[2] == "episodes":
+            episode = FakeEpisode(parts[1], int(parts[3]), self.book_rate)
+            return 200, "text/html", (
+                f"<html><head><title>{escape(episode.title)}</title>"
+                f'<meta property="og:title" content="{escape(episode.title, {chr(34): "&quot;"})}">'
+                f'<meta property="og:description" content="{escape(episode.description, {chr(34): "&quot;"})}">'
+                f"</head><body><p>{escape(episode.description)}</p></body></html>"
+            )
+        slug = parts[1]
+        page = int(query.get("page", ["1"])[0])
+        episodes = self.feed(slug)[(page - 1) * _BBC_PAGE_SIZE:page * _BBC_PAGE_SIZE]
+        items = "".join(
+            f'<li><a aria-label="{escape(e.title)}, release date: {e.aired:%d %b %Y}, duration: 28 mins" '
+            f'href="/bbc/{slug}/episodes/{e.index}">{e.aired:%d %b %Y}</a>'
+            f'<span class="sw-font-bold sw-transition">{escape(e.title)}</span></li>'
+            for e in episodes
+        )
+        more = page * _BBC_PAGE_SIZE < self.episodes
+        next_link = f'<a aria-label="View the next page" href="?page={page + 1}">Next</a>' if more else ""
+        return 200, "text/html", f"<html><body><ul>{items}</ul>{next_link}</body></html>"
+
+    def rss(self, method, path, query, body):
+        slug = path.strip("/").split("/")[1].removesuffix(".xml")
+        items = "".join(
+            f"<item><title>{escape(e.title)}</title>"
+            f"<link>{self.url}/rss/{slug}/episodes/{e.index}</link>"
+            f"<guid>{slug}-{e.index}</guid>"
+            f"<pubDate>{format_datetime(_midnight(e.aired))}</pubDate>"
+            f"<description>{escape(e.description)}</description></item>"
+            for e in self.feed(slug)
+        )
+        return 200, "application/rss+xml", (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>{escape(slug)}</title><link>{self.url}/rss/{slug}</link>{items}</channel></rss>"
+        )
+
+    def wnyc(self, method, path, query, body):
+        slug = query.get("show", [""])[0]
+        limit = int(query.get("limit", ["10"])[0])
+        page = int(query.get("page", ["1"])[0])
+        episodes = self.feed(slug)
+        return 200, "application/json", {
+            "data": [
+                {"attributes": {
+                    "url": f"https://www.wnyc.org/story/{slug}-{e.index}/",
+                    "title": e.title,
+                    "newsdate": _midnight(e.aired).isoformat(),
+                    "body": e.description,
+                }}
+                for e in episodes[(page - 1) * limit:page * limit]
+            ],
+            "meta": {"pagination": {"page": page, "pages": max(1, -(-len(episodes) // limit))}},
+        }
+
+
+def _midnight(day):
+    from datetime import datetime, timezone
+
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    services = None  # set on the subclass FakeServices.start() builds
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+
+    def log_message(self, format, *args):
+        pass  # request logging would swamp benchmark output
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method):
+        fake = self.services
+        parsed = urllib.parse.urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if parsed.path == "/_stats":
+            return self._send(200, "application/json", fake.stats())
+        service = next((name for prefix, name in _ROUTES if parsed.path.startswith(prefix)), None)
+        if service is None:
+            return self._send(404, "text/plain", "Unknown fake service")
+
+        fake.count(service, "calls")
+        profile = fake.profile(service)
+        delay = profile.latency_ms + random.uniform(0, profile.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        if fake.roll(profile.rate_limit_rate):
+            fake.count(service, "rate_limited")
+            return self._send(429, "application/json", _error_body(service, "rate_limit_error"),
+                              {"Retry-After": "1", "retry-after-ms": "100"})
+        if fake.roll(profile.error_rate):
+            fake.count(service, "errors")
+            return self._send(500, "application/json", _error_body(service, "api_error"))
+
+        fixtures = fake.fixtures.get(service, {})
+        recorded = fixtures.get(self.path) or fixtures.get(parsed.path)
+        if recorded:
+            return self._send(
+                recorded.get("status", 200), recorded.get("content_type", "application/json"),
+                recorded.get("body", ""),
+            )
+        query = urllib.parse.parse_qs(parsed.query)
+        self._send(*getattr(fake, service)(method, parsed.path, query, body))
+
+    def _send(self, status, content_type, body, headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _error_body(service, kind):
+    if service == "anthropic":
+        return {"type": "error", "error": {"type": kind, "message": "Injected by fake services"}}
+    return {"error": {"message": f"Injected {kind}"}}
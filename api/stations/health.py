@@ -220,6 +220,7 @@ def _check_pipeline(result):
         awaiting = Episode.objects.filter(stage=Episode.STAGE_SCRAPED).count()
         extraction_queued = Episode.objects.filter(stage=Episode.STAGE_EXTRACTION_QUEUED).count()
         extracting = Episode.objects.filter(stage=Episode.STAGE_EXTRACTING).count()
+        extraction_batched = Episode.objects.filter(stage=Episode.STAGE_EXTRACTION_BATCHED).count()
         verification_queued = Episode.objects.filter(stage=Episode.STAGE_VERIFICATION_QUEUED).count()
         review = Episode.objects.filter(stage=Episode.STAGE_REVIEW).count()
         complete = Episode.objects.filter(stage=Episode.STAGE_COMPLETE).count()
@@ -269,6 +270,7 @@ def _check_pipeline(result):
             "awaiting_processing": awaiting,
             "extraction_queued": extraction_queued,
             "extracting": extracting,
+            "extraction_batched": extraction_batched,
             "verification_queued": verification_queued,
             "review": review,
             "complete": complete,
@@ -0,0 +1,229 @@
+"""
+Shared outbound HTTP client for the stations app.
+
+Google Books, Open Library, WNYC, RSS feeds and cover downloads all go
+through one urllib3 PoolManager per process. It keeps a keep-alive pool
+per host (HTTP_POOL_MAXSIZE connections), so repeated calls to the same
+few hosts reuse a connection instead of paying a TCP+TLS handshake each
+time. Every request gets the same policy:
+
+- connect timeout HTTP_CONNECT_TIMEOUT, read timeout HTTP_READ_TIMEOUT
+  (callers may pass a shorter read timeout);
+- up to HTTP_RETRIES retries for connection errors, read errors and
+  500/502/503/504, with exponential backoff (HTTP_RETRY_BACKOFF) plus the
+  same amount of random jitter. 429 is never retried here: callers turn
+  it into a provider cooldown (see ratelimit.py). Callers whose every
+  attempt must pass a rate limiter pass retries=0 and retry themselves
+  with is_retryable() and retry_delay().
+
+Failures raise RequestError (no response) or its subclass HTTPError
+(status >= 400, with .status and .headers). stats() returns per-host
+request, error and retry counts, latency, and how many connections each
+pool has opened.
+
+The Anthropic SDK keeps its own pooled httpx client and Scrapy its own
+Twisted pool; neither goes through here.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import urllib3
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "RadioReads/1.0 (https://radioreads.fun)"
+
+_RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class RequestError(Exception):
+    """A request failed without a usable response (connection error, timeout)."""
+
+    def __init__(self, message, url=""):
+        super().__init__(message)
+        self.url = url
+
+
+class HTTPError(RequestError):
+    """The server answered with an error status."""
+
+    def __init__(self, url, status, headers=None, body=b""):
+        super().__init__(f"HTTP {status} from {url}", url)
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+
+
+_manager = None
+_manager_lock = threading.Lock()
+_stats = defaultdict(lambda: {"requests": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0})
+_stats_lock = threading.Lock()
+
+
+def _pool_manager():
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = urllib3.PoolManager(
+                    num_pools=50,
+                    maxsize=settings.HTTP_POOL_MAXSIZE,
+                    block=False,  # beyond maxsize, open a one-off connection rather than wait
+                )
+    return _manager
+
+
+def reset():
+    """Drop pooled connections and counters (tests, and forked children)."""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.clear()
+        _manager = None
+    with _stats_lock:
+        _stats.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    # Celery prefork children must not share the parent's sockets
+    os.register_at_fork(after_in_child=reset)
+
+
+def _retry_policy(retries):
+    if retries is None:
+        retries = settings.HTTP_RETRIES
+    return urllib3.Retry(
+        total=retries,
+        redirect=5,
+        status_forcelist=_RETRY_STATUSES,
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        backoff_jitter=settings.HTTP_RETRY_BACKOFF,
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+
+
+def _record(host, started, error=False, retries=0):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _stats_lock:
+        host_stats = _stats[host]
+        host_stats["requests"] += 1
+        host_stats["errors"] += int(error)
+        host_stats["retries"] += retries
+        host_stats["total_ms"] += elapsed_ms
+        host_stats["max_ms"] = max(host_stats["max_ms"], elapsed_ms)
+
+
+def request(method, url, headers=None, body=None, timeout=None, retries=None, stream=False):
+    """
+    Send a request on the shared pool and return the urllib3 response.
+
+    timeout is the read timeout in seconds (default HTTP_READ_TIMEOUT);
+    retries overrides HTTP_RETRIES. With stream=True the body is left
+    unread; use stream() so the connection goes back to the pool.
+    """
+    host = urlsplit(url).netloc
+    started = time.perf_counter()
+    try:
+        response = _pool_manager().request(
+            method,
+            url,
+            headers={"User-Agent": USER_AGENT, **(headers or {})},
+            body=body,
+            timeout=urllib3.Timeout(
+                connect=settings.HTTP_CONNECT_TIMEOUT,
+                read=timeout or settings.HTTP_READ_TIMEOUT,
+            ),
+            retries=_retry_policy(retries),
+            preload_content=not stream,
+        )
+    except urllib3.exceptions.HTTPError as e:  # retries exhausted, timeouts, protocol errors
+        _record(host, started, error=True, retries=_retries_used(e))
+        raise RequestError(f"{method} {url} failed: {e}", url) from e
+
+    _record(
+        host,
+        started,
+        error=response.status >= 500,
+        retries=len(response.retries.history) if response.retries else 0,
+    )
+    if response.status >= 400:
+        error_body = response.data[:2048] if not stream else b""
+        response.release_conn()
+        raise HTTPError(url, response.status, dict(response.headers), error_body)
+    return response
+
+
+def _retries_used(error):
+    retry = getattr(error, "retries", None) or getattr(getattr(error, "reason", None), "retries", None)
+    return len(retry.history) if retry is not None else 0
+
+
+def is_retryable(error):
+    """Whether the shared Retry policy would have retried this RequestError."""
+    status = getattr(error, "status", None)
+    return status is None or status in _RETRY_STATUSES
+
+
+def retry_delay(retry):
+    """Seconds to wait before retry number retry (from 1), with the policy's backoff and jitter."""
+    backoff = settings.HTTP_RETRY_BACKOFF
+    return backoff * 2 ** (retry - 1) + random.uniform(0, backoff)
+
+
+def get_json(url, **kwargs):
+    """GET url and decode the JSON body."""
+    return json.loads(request("GET", url, **kwargs).data.decode())
+
+
+@contextmanager
+def stream(url, **kwargs):
+    """
+    GET url without reading the body; yields the response, whose
+    .headers and .read(n) the caller consumes. A fully read response
+    returns its connection to the pool; an abandoned one is closed.
+    """
+    response = request("GET", url, stream=True, **kwargs)
+    try:
+        yield response
+    except BaseException:
+        response.close()  # unread body: don't hand this connection to the next request
+        raise
+    finally:
+        response.release_conn()
+
+
+def stats():
+    """
+    {host: {requests, errors, retries, mean_ms, max_ms, connections}} for
+    this process. connections counts connections opened by the host's pool;
+    far fewer than requests means keep-alive is working.
+    """
+    connections = {}
+    if _manager is not None:
+        for key in list(_manager.pools.keys()):
+            pool = _manager.pools.get(key)
+            if pool is not None:
+                host = key.key_host if key.key_port in (None, 80, 443) else f"{key.key_host}:{key.key_port}"
+                connections[host] = connections.get(host, 0) + pool.num_connections
+    with _stats_lock:
+        return {
+            host: {
+                "requests": s["requests"],
+                "errors": s["errors"],
+                "retries": s["retries"],
+                "mean_ms": round(s["total_ms"] / s["requests"], 1) if s["requests"] else 0,
+                "max_ms": round(s["max_ms"], 1),
+                "connections": connections.get(host, 0),
+            }
+            for host, s in _stats.items()
+        }
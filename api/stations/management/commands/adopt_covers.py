@@ -0,0 +1,42 @@
+"""
+Move covers stored under the old brand/slug paths to content-addressed
+names (covers/sha256/...), regenerating their variants.
+
+The old files stay in place until `gc_covers` removes them, so this is
+safe to run while the site is serving.
+
+Usage:
+    python manage.py adopt_covers
+    python manage.py adopt_covers --limit 500
+"""
+
+from django.core.management.base import BaseCommand
+from stations.covers import COVER_BLOB_PREFIX, adopt_stored_cover
+from stations.models import Book
+
+
+class Command(BaseCommand):
+    help = "Move existing covers to content-addressed storage"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Process at most this many books")
+
+    def handle(self, *args, **options):
+        books = (
+            Book.objects.exclude(cover_image="").exclude(cover_image__isnull=True)
+            .exclude(cover_image__startswith=COVER_BLOB_PREFIX)
+            .order_by("pk")
+        )[: options["limit"]]
+
+        moved = failed = 0
+        for book in books:
+            try:
+                if adopt_stored_cover(book):
+                    moved += 1
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"  {book.title}: {e}"))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Moved {moved} covers to content-addressed storage, {failed} failed")
+        )
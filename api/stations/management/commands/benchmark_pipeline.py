@@ -0,0 +1,423 @@
+"""
+Benchmark the whole pipeline (scrape, extract, verify, covers) end to end
+against the fake external services.
+
+Creates throwaway brands whose feeds are served by stations.fake_services,
+then drives every stage through its Celery task, the way beat would, but
+only for the benchmark's own episodes and books: scrape_brand per brand,
+ai_extract_books_task per scraped episode, verify_book_task per pending
+book (which queues fetch_cover_task). Reports episodes/min, per-task
+latency and calls made to each external service, then deletes everything
+it created unless --keep is given.
+
+By default tasks run eagerly in this process against an in-process fake
+server, with covers written to a temporary MEDIA_ROOT. Scrapy's reactor
+can only start once per process, so eager runs allow one bbc brand.
+
+With --live-workers, tasks go through the broker to real workers, which
+must be started with FAKE_SERVICES_URL set to --fake-url (the address at
+which they can reach this process). Per-task latency isn't visible from
+here, so stage completion times are reported instead.
+
+Writes to the configured database: refuses to run unless DEBUG is on or
+--force is given.
+
+Usage:
+    python manage.py benchmark_pipeline
+    python manage.py benchmark_pipeline --brands rss=3,wnyc=1,bbc=1 --episodes 30
+    python manage.py benchmark_pipeline --latency-ms 300 --jitter-ms 200 --rate-limit-rate 0.05
+    python manage.py benchmark_pipeline --profile anthropic:latency_ms=1500,error_rate=0.02
+    python manage.py benchmark_pipeline --live-workers --fake-url http://bench-host:8765
+    python manage.py benchmark_pipeline --batch-extraction
+    python manage.py benchmark_pipeline --json > before.json
+"""
+
+import json
+import os
+import statistics
+import tempfile
+import time
+import urllib.parse
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import override_settings
+from stations.ai_utils import EXTRACTION_MODEL, EXTRACTION_PROMPT_VERSION, episode_text
+from stations.management.commands.run_fake_services import (
+    add_profile_arguments,
+    fake_services_from_options,
+)
+from stations.models import Book, BookLookup, Brand, Episode, ExtractionBatch, ExtractionMemo, Station
+
+SPIDERS = {"bbc": "bbc_episodes", "rss": "rss", "wnyc": "wnyc_api"}
+
+PENDING_EXTRACTION = (
+    Episode.STAGE_SCRAPED, Episode.STAGE_EXTRACTION_QUEUED, Episode.STAGE_EXTRACTING,
+    Episode.STAGE_EXTRACTION_BATCHED,
+)
+
+
+class TaskTimer:
+    """
+    Collects per-task run times from Celery's task_prerun/task_postrun
+    signals. Eager tasks nest (verification runs the cover fetch inline),
+    so each task is charged only for its own time, not its children's.
+    """
+
+    def __init__(self):
+        self.durations = defaultdict(list)
+        self._stack = []
+
+    def prerun(self, task=None, **kwargs):
+        self._stack.append([task.name, time.perf_counter(), 0.0])
+
+    def postrun(self, task=None, **kwargs):
+        name, started, children = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.durations[name].append(elapsed - children)
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def connect(self):
+        from celery.signals import task_postrun, task_prerun
+
+        task_prerun.connect(self.prerun, weak=False)
+        task_postrun.connect(self.postrun, weak=False)
+
+    def disconnect(self):
+        from celery.signals import task_postrun, task_prerun
+
+        task_prerun.disconnect(self.prerun)
+        task_postrun.disconnect(self.postrun)
+
+    def summary(self):
+        report = {}
+        for name, durations in sorted(self.durations.items()):
+            ms = sorted(d * 1000 for d in durations)
+            report[name.rsplit(".", 1)[-1]] = {
+                "n": len(ms),
+                "mean_ms": round(statistics.fmean(ms), 1),
+                "p50_ms": round(_percentile(ms, 50), 1),
+                "p95_ms": round(_percentile(ms, 95), 1),
+                "max_ms": round(ms[-1], 1),
+            }
+        return report
+
+
+def _percentile(ordered, pct):
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def parse_brands(spec):
+    counts = {}
+    for part in filter(None, spec.split(",")):
+        kind, _, count = part.partition("=")
+        if kind not in SPIDERS:
+            raise CommandError(f"Unknown brand kind '{kind}' (expected {', '.join(SPIDERS)})")
+        counts[kind] = int(count or 1)
+    if not sum(counts.values()):
+        raise CommandError("--brands needs at least one brand")
+    return counts
+
+
+class Command(BaseCommand):
+    help = "Run scrape → extract → verify → covers end to end against fake services and report throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--brands",
+            default="rss=2,wnyc=1",
+            help="Fake brands to create, as kind=count (kinds: bbc, rss, wnyc; default rss=2,wnyc=1)",
+        )
+        add_profile_arguments(parser)
+        parser.add_argument(
+            "--gb-rate",
+            type=float,
+            default=None,
+            help="Google Books requests/second for the run (default GOOGLE_BOOKS_RATE_PER_SECOND)",
+        )
+        parser.add_argument(
+            "--verify-rounds",
+            type=int,
+            default=3,
+            help="Times to re-queue books left pending by rate limiting (default 3)",
+        )
+        parser.add_argument(
+            "--batch-extraction",
+            action="store_true",
+            help="Extract through one Message Batch (polled every second) instead of a task per episode",
+        )
+        parser.add_argument(
+            "--live-workers",
+            action="store_true",
+            help="Send tasks to running Celery workers instead of running them eagerly",
+        )
+        parser.add_argument(
+            "--fake-url",
+            default=None,
+            help="With --live-workers: URL at which workers reach the fake services in this process",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=600,
+            help="With --live-workers: seconds to wait for each stage (default 600)",
+        )
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark station, brands and books")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+        parser.add_argument("--force", action="store_true", help="Run even when DEBUG is off")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("benchmark_pipeline writes to the database; pass --force to run with DEBUG off")
+        brand_counts = parse_brands(options["brands"])
+        live = options["live_workers"]
+        if live and not options["fake_url"]:
+            raise CommandError("--live-workers needs --fake-url (the FAKE_SERVICES_URL workers were started with)")
+        if not live and brand_counts.get("bbc", 0) > 1:
+            raise CommandError("Scrapy can only run once per process: use bbc=1, or --live-workers")
+
+        if live:
+            port = urllib.parse.urlsplit(options["fake_url"]).port or 80
+            fake = fake_services_from_options(options, host="0.0.0.0", port=port, public_url=options["fake_url"])
+        else:
+            fake = fake_services_from_options(options)
+
+        run_id = uuid.uuid4().hex[:6]
+        timer = TaskTimer()
+        with ExitStack() as stack:
+            stack.enter_context(fake)
+            if not live:
+                self._run_eagerly(stack, fake, run_id, options)
+                timer.connect()
+                stack.callback(timer.disconnect)
+
+            station, brands = self._create_brands(fake, run_id, brand_counts)
+            try:
+                report = self._run(fake, brands, options, live)
+            finally:
+                if not options["keep"]:
+                    self._cleanup(station, brands)
+
+        report.update(
+            run_id=run_id,
+            mode="live-workers" if live else "eager",
+            brands=brand_counts,
+            episodes_per_brand=options["episodes"],
+            external_calls=fake.stats(),
+        )
+        if not live:
+            from stations import http_client
+
+            report["tasks"] = timer.summary()
+            report["http_client"] = http_client.stats()
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print_report(report)
+
+    def _run_eagerly(self, stack, fake, run_id, options):
+        """Point this process at the fake and run tasks inline, with bench-only limiters."""
+        from paperwaves.celery import app
+        from stations import ai_utils, ratelimit
+
+        overrides = dict(fake.settings_overrides(), MEDIA_ROOT=stack.enter_context(tempfile.TemporaryDirectory()))
+        if options["gb_rate"]:
+            overrides["GOOGLE_BOOKS_RATE_PER_SECOND"] = options["gb_rate"]
+        stack.enter_context(override_settings(**overrides))
+
+        saved_conf = (app.conf.task_always_eager, app.conf.task_eager_propagates)
+        app.conf.update(task_always_eager=True, task_eager_propagates=False)
+        stack.callback(
+            lambda: app.conf.update(task_always_eager=saved_conf[0], task_eager_propagates=saved_conf[1])
+        )
+
+        if not os.environ.get("ANTHROPIC_API_KEY"):
+            os.environ["ANTHROPIC_API_KEY"] = "benchmark"
+            stack.callback(os.environ.pop, "ANTHROPIC_API_KEY", None)
+        from stations import http_client
+
+        http_client.reset()  # per-host counters for this run only
+        saved_extractor = ai_utils._extractor
+        ai_utils._extractor = None  # rebuilt with the fake base URL
+        stack.callback(setattr, ai_utils, "_extractor", saved_extractor)
+
+        # Don't spend (or reset) the real shared quotas and cooldowns
+        saved_limiters = (ratelimit._google_books, ratelimit._open_library)
+        ratelimit._google_books = ratelimit.RateLimiter(
+            f"bench-{run_id}:google_books",
+            rate=settings.GOOGLE_BOOKS_RATE_PER_SECOND,
+            burst=settings.GOOGLE_BOOKS_RATE_BURST,
+        )
+        ratelimit._open_library = ratelimit.RateLimiter(
+            f"bench-{run_id}:open_library",
+            rate=settings.OPEN_LIBRARY_RATE_PER_SECOND,
+            burst=settings.OPEN_LIBRARY_RATE_BURST,
+        )
+
+        def restore_limiters():
+            ratelimit._google_books.reset()
+            ratelimit._open_library.reset()
+            ratelimit._google_books, ratelimit._open_library = saved_limiters
+
+        stack.callback(restore_limiters)
+
+    def _create_brands(self, fake, run_id, brand_counts):
+        station = Station.objects.create(
+            name=f"Benchmark {run_id}", station_id=f"benchmark-{run_id}", url=fake.url
+        )
+        brands = []
+        for kind, count in brand_counts.items():
+            for i in range(1, count + 1):
+                slug = f"bench-{run_id}-{kind}-{i}"
+                brands.append(Brand.objects.create(
+                    station=station,
+                    name=f"Benchmark {run_id} {kind} {i}",
+                    slug=slug,
+                    url=fake.brand_url(kind, slug),
+                    spider_name=SPIDERS[kind],
+                ))
+        return station, brands
+
+    def _run(self, fake, brands, options, live):
+        from django.utils import timezone
+        from stations.extraction_batches import submit_extraction_batch
+        from stations.tasks import (
+            ai_extract_books_task, poll_extraction_batches, scrape_brand, verify_book_task,
+        )
+
+        timeout = options["timeout"]
+        episodes = Episode.objects.filter(brand__in=brands)
+        books = Book.objects.filter(episodes__brand__in=brands).distinct()
+        stages = {}
+        fake.reset_stats()
+        start = time.monotonic()
+
+        results = [scrape_brand.delay(brand.pk, max_episodes=options["episodes"]) for brand in brands]
+        self._wait_for_results(results, timeout)
+        stages["scrape"] = time.monotonic() - start
+
+        # What extract_books_from_new_episodes does, for our episodes only
+        # (with BOOK_EXTRACTION_MODE=ai the post_save signal may have got there first)
+        if options["batch_extraction"]:
+            submit_extraction_batch(episodes.filter(stage=Episode.STAGE_SCRAPED))
+            deadline = time.monotonic() + timeout
+            while episodes.filter(stage=Episode.STAGE_EXTRACTION_BATCHED).exists():
+                if time.monotonic() > deadline:
+                    self.stderr.write("Extraction batch unfinished, reporting partial results")
+                    break
+                time.sleep(1)
+                poll_extraction_batches.delay()
+        else:
+            for episode in episodes.filter(stage=Episode.STAGE_SCRAPED):
+                Episode.objects.filter(pk=episode.pk).update(
+                    stage=Episode.STAGE_EXTRACTION_QUEUED, status_changed_at=timezone.now()
+                )
+                ai_extract_books_task.delay(episode.pk)
+        self._wait_until(lambda: not episodes.filter(stage__in=PENDING_EXTRACTION).exists(), timeout)
+        stages["extract"] = time.monotonic() - start
+
+        # What verify_pending_books(fan_out=True) does; repeat for books a
+        # rate limit left pending, as the hourly run would
+        for _ in range(options["verify_rounds"]):
+            pending = list(books.filter(verification_status=Book.VERIFICATION_PENDING).values_list("pk", flat=True))
+            if not pending:
+                break
+            self._wait_for_results([verify_book_task.delay(pk) for pk in pending], timeout)
+        stages["verify"] = time.monotonic() - start
+
+        # Verification queues a cover fetch per verified book, which either
+        # stores an image or records why it couldn't
+        verified = books.filter(verification_status=Book.VERIFICATION_VERIFIED)
+        self._wait_until(
+            lambda: not verified.filter(cover_image="", cover_fetch_error="").exists(), timeout
+        )
+        stages["covers"] = time.monotonic() - start
+        elapsed = time.monotonic() - start
+
+        scraped = episodes.count()
+        finished = episodes.exclude(
+            stage__in=PENDING_EXTRACTION + (Episode.STAGE_VERIFICATION_QUEUED,)
+        ).count()
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "episodes_scraped": scraped,
+            "episodes_finished": finished,
+            "episodes_per_minute": round(finished / elapsed * 60, 1) if elapsed else 0,
+            "episode_stages": {
+                row["stage"]: row["n"] for row in episodes.values("stage").annotate(n=Count("pk"))
+            },
+            "books": {
+                "total": books.count(),
+                "verified": verified.count(),
+                "with_cover": verified.exclude(cover_image="").count(),
+                "pending": books.filter(verification_status=Book.VERIFICATION_PENDING).count(),
+            },
+            "stage_done_at_seconds": {name: round(t, 2) for name, t in stages.items()},
+        }
+
+    def _wait_for_results(self, results, timeout):
+        deadline = time.monotonic() + timeout
+        for result in results:
+            try:
+                result.get(timeout=max(0.1, deadline - time.monotonic()), propagate=False)
+            except Exception as e:
+                self.stderr.write(f"Gave up waiting for task {result.id}: {e}")
+                return
+
+    def _wait_until(self, condition, timeout, interval=1.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.stderr.write(f"Stage still unfinished after {timeout:.0f}s, reporting partial results")
+                return
+            time.sleep(interval)
+
+    def _cleanup(self, station, brands):
+        batch_ids = Episode.objects.filter(brand__in=brands).values_list("task_id", flat=True)
+        ExtractionBatch.objects.filter(batch_id__in=list(batch_ids)).delete()
+        memo_keys = [
+            ExtractionMemo.make_key(episode_text(e), EXTRACTION_PROMPT_VERSION, EXTRACTION_MODEL)
+            for e in Episode.objects.filter(brand__in=brands)
+        ]
+        ExtractionMemo.objects.filter(key__in=memo_keys).delete()
+        books = Book.objects.filter(episodes__brand__in=brands).distinct()
+        keys = [BookLookup.make_key(title, author) for title, author in books.values_list("title", "author")]
+        BookLookup.objects.filter(key__in=keys).delete()
+        Book.objects.filter(pk__in=list(books.values_list("pk", flat=True))).delete()
+        station.delete()  # cascades to brands and episodes
+
+    def _print_report(self, report):
+        self.stdout.write(self.style.SUCCESS(
+            f"Benchmark {report['run_id']} ({report['mode']}): "
+            f"{report['episodes_finished']}/{report['episodes_scraped']} episodes through the pipeline "
+            f"in {report['elapsed_seconds']}s — {report['episodes_per_minute']} episodes/min"
+        ))
+        self.stdout.write(f"  Episode stages: {report['episode_stages']}")
+        self.stdout.write(f"  Books: {report['books']}")
+        self.stdout.write(f"  Stages done at (s): {report['stage_done_at_seconds']}")
+        if report.get("tasks"):
+            self.stdout.write("  Task latency (ms, own time excluding nested tasks):")
+            for name, t in report["tasks"].items():
+                self.stdout.write(
+                    f"    {name:<24} n={t['n']:<5} mean={t['mean_ms']:<8} "
+                    f"p50={t['p50_ms']:<8} p95={t['p95_ms']:<8} max={t['max_ms']}"
+                )
+        if report.get("http_client"):
+            self.stdout.write("  Shared HTTP client (this process):")
+            for host, h in sorted(report["http_client"].items()):
+                self.stdout.write(
+                    f"    {host:<24} requests={h['requests']:<5} connections={h['connections']:<4} "
+                    f"retries={h['retries']:<4} errors={h['errors']:<4} mean={h['mean_ms']}ms"
+                )
+        self.stdout.write("  External calls:")
+        for service, counts in sorted(report["external_calls"].items()):
+            self.stdout.write(
+                f"    {service:<13} calls={counts['calls']:<5} "
+                f"errors={counts['errors']:<4} rate_limited={counts['rate_limited']}"
+            )
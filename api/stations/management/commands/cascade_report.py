@@ -0,0 +1,55 @@
+"""
+Report how the extraction cascade's tiers are doing, for tuning
+EXTRACTION_CASCADE_TIERS and EXTRACTION_SCREEN_THRESHOLD.
+
+For each tier it shows how many episodes it saw and passed on, and its
+latency. For the full (Sonnet) tier it also shows how many of the
+episodes that got through had a book. With EXTRACTION_CASCADE_AUDIT_RATE
+set, it shows how many audited rejections Sonnet found a book in anyway.
+
+Usage:
+    python manage.py cascade_report
+    python manage.py cascade_report --days 30
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from stations.extraction_cascade import cascade_stats
+from stations.models import Episode
+
+
+class Command(BaseCommand):
+    help = "Per-tier pass rates and latency of the extraction cascade"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=7,
+            help="Only episodes extracted in the last N days (default 7)",
+        )
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"])
+        results = Episode.objects.filter(
+            processed_at__gte=since, extraction_result__has_key="cascade"
+        ).values_list("extraction_result", flat=True)
+        report = cascade_stats(results.iterator())
+        if not report:
+            self.stdout.write(f"No cascade-screened extractions in the last {options['days']} days.")
+            return
+
+        self.stdout.write(f"Extraction cascade, last {options['days']} days:")
+        self.stdout.write(f"  {'tier':8} {'seen':>7} {'passed':>7} {'rate':>6} {'mean ms':>9} {'p95 ms':>9}")
+        for tier, stats in report.items():
+            line = (
+                f"  {tier:8} {stats['seen']:>7} {stats['passed']:>7} {stats['pass_rate']:>6.1%}"
+                f" {stats['mean_ms']:>9.1f} {stats['p95_ms']:>9.1f}"
+            )
+            if "book_rate" in stats:
+                line += f"  books found in {stats['book_rate']:.1%}"
+            if "audited" in stats:
+                line += f"  audited {stats['audited']}, missed {stats['missed']} books"
+            self.stdout.write(line)
@@ -1,14 +1,32 @@
-import os
-import tempfile
-import urllib.request
+"""
+Fetch covers for books on the covers Celery queue.
+
+Queues one fetch_cover_task per book as a group (run by the celery-covers
+worker) and prints progress until the batch finishes, or returns straight
+away with --no-wait. Waiting gives up after --timeout seconds, or when
+no download has finished for --stall-polls polls in a row (a lost or
+revoked task, or expired results); the downloads queued so far carry on
+in the worker. --dry-run looks covers up here without downloading.
+
+Usage:
+    python manage.py download_book_covers
+    python manage.py download_book_covers --overwrite --limit 200
+    python manage.py download_book_covers --no-wait
+    python manage.py download_book_covers --timeout 600
+    python manage.py download_book_covers --dry-run
+"""
+
+import time
+
 from django.core.management.base import BaseCommand
-from django.core.files import File
 from stations.models import Book
-from stations.utils import fetch_book_cover
+from stations.providers import ProviderUnavailable
+from stations.tasks import cover_batch_progress, queue_cover_fetches
+from stations.utils import lookup_book
 
 
 class Command(BaseCommand):
-    help = "Fetch book covers from Open Library and store them locally"
+    help = "Fetch book covers from Google Books (Open Library fallback) and store them locally"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -22,11 +40,39 @@ class Command(BaseCommand):
             action="store_true",
             help="Overwrite existing covers",
         )
+        parser.add_argument(
+            "--refresh-lookups",
+            action="store_true",
+            help="Ignore cached Google Books lookups and query the API again",
+        )
         parser.add_argument(
             "--dry-run",
             action="store_true",
             help="Show what would be downloaded without making changes",
         )
+        parser.add_argument(
+            "--no-wait",
+            action="store_true",
+            help="Queue the downloads and exit without waiting for progress",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5,
+            help="Seconds between progress updates (default 5)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=3600,
+            help="Stop waiting after this many seconds (default 3600, 0 = no limit)",
+        )
+        parser.add_argument(
+            "--stall-polls",
+            type=int,
+            default=60,
+            help="Stop waiting after this many polls without progress (default 60, 0 = never)",
+        )
 
     def handle(self, *args, **options):
         dry_run = options["dry_run"]
@@ -44,75 +90,71 @@ class Command(BaseCommand):
         if options["limit"]:
             books = books[: options["limit"]]
 
-        total = books.count()
-        self.stdout.write(f"Processing {total} books...")
+        if dry_run:
+            self.dry_run(books, options["refresh_lookups"])
+            return
 
-        downloaded = 0
-        failed = 0
-        skipped = 0
+        book_ids = list(books.values_list("pk", flat=True))
+        self.stdout.write(f"Queueing {len(book_ids)} cover downloads...")
+        result = queue_cover_fetches(
+            book_ids, refresh=options["refresh_lookups"], overwrite=overwrite
+        )
+        if options["no_wait"]:
+            self.stdout.write(self.style.SUCCESS(f"Queued batch {result.id}"))
+            return
+
+        progress = cover_batch_progress(result)
+        deadline = time.monotonic() + options["timeout"] if options["timeout"] else None
+        stalled = 0
+        while progress["done"] < progress["total"]:
+            self.stdout.write(f"  {progress['done']}/{progress['total']}")
+            if deadline and time.monotonic() >= deadline:
+                self.stderr.write(self.style.WARNING(
+                    f"Timed out after {options['timeout']:.0f}s; batch {result.id} continues in the worker"
+                ))
+                break
+            if options["stall_polls"] and stalled >= options["stall_polls"]:
+                self.stderr.write(self.style.WARNING(
+                    f"No progress in {stalled} polls; batch {result.id} may have lost tasks"
+                ))
+                break
+            time.sleep(options["poll_interval"])
+            done = progress["done"]
+            progress = cover_batch_progress(result)
+            stalled = stalled + 1 if progress["done"] == done else 0
+
+        finished = progress["done"] >= progress["total"]
+        label = "Completed" if finished else f"Stopped waiting at {progress['done']}/{progress['total']}"
+        style = self.style.SUCCESS if finished else self.style.WARNING
+        self.stdout.write(
+            style(
+                f"\n{label}: {progress.get('downloaded', 0)} downloaded, "
+                f"{progress.get('failed', 0) + progress.get('error', 0)} failed, "
+                f"{progress.get('no_cover', 0)} no cover, "
+                f"{progress.get('skipped', 0) + progress.get('locked', 0)} skipped, "
+                f"{progress.get('rate_limited', 0)} rate limited"
+            )
+        )
 
+    def dry_run(self, books, refresh_lookups):
+        found = missing = 0
         for book in books:
-            # Skip if already has cover and not overwriting
-            if book.cover_image and not overwrite:
-                skipped += 1
-                continue
-
             self.stdout.write(f"Processing: {book.title} by {book.author or 'Unknown'}")
-
-            # Fetch cover URL from Open Library
-            cover_url = fetch_book_cover(book.title, book.author)
-            if not cover_url:
-                self.stdout.write(self.style.WARNING(f"  No cover found"))
-                failed += 1
-                continue
-
-            if dry_run:
-                self.stdout.write(f"  Would download: {cover_url}")
-                downloaded += 1
-                continue
-
             try:
-                # Download the image
-                with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=".jpg"
-                ) as tmp_file:
-                    request = urllib.request.Request(
-                        cover_url,
-                        headers={
-                            "User-Agent": "Mozilla/5.0 (compatible; RadioReads/1.0)"
-                        },
-                    )
-
-                    with urllib.request.urlopen(request, timeout=30) as response:
-                        tmp_file.write(response.read())
-                        tmp_path = tmp_file.name
-
-                # Save to the model
-                filename = f"{book.slug}.jpg"
-                with open(tmp_path, "rb") as f:
-                    book.cover_image.save(filename, File(f), save=True)
-
-                # Clean up temp file
-                os.unlink(tmp_path)
-
-                downloaded += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f"  Downloaded: {book.cover_image.url}")
-                )
-
-            except Exception as e:
-                failed += 1
-                self.stdout.write(self.style.ERROR(f"  Failed: {e}"))
-
-        if dry_run:
-            self.stdout.write(
-                self.style.WARNING(
-                    f"\nDry run: {downloaded} books would be processed, {skipped} skipped, {failed} no cover found"
-                )
-            )
-        else:
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"\nCompleted: {downloaded} downloaded, {failed} failed/no cover, {skipped} skipped"
-                )
+                book_info = lookup_book(book, refresh=refresh_lookups)
+            except ProviderUnavailable:
+                self.stdout.write(self.style.ERROR("  Metadata providers rate limited, stopping"))
+                break
+            cover_url = book_info.get("cover_url") or ""
+            if cover_url:
+                self.stdout.write(f"  Would download: {cover_url}")
+                found += 1
+            else:
+                self.stdout.write(self.style.WARNING("  No cover found"))
+                missing += 1
+
+        self.stdout.write(
+            self.style.WARNING(
+                f"\nDry run: {found} books would be processed, {missing} no cover found"
             )
+        )
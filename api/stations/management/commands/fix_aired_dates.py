@@ -9,7 +9,7 @@ Usage:
 """
 
 from django.core.management.base import BaseCommand
-from stations.models import Episode
+from stations.models import Book, Episode
 from stations.ai_utils import _parse_date
 
 
@@ -39,6 +39,7 @@ class Command(BaseCommand):
 
         fixed = 0
         unfixable = []
+        fixed_ids = []
 
         for ep in episodes:
             scraped = ep.scraped_data or {}
@@ -54,6 +55,7 @@ class Command(BaseCommand):
                 if apply:
                     ep.aired_at = parsed
                     ep.save(update_fields=["aired_at"])
+                    fixed_ids.append(ep.id)
                 fixed += 1
             else:
                 reason = f"date_text={date_text!r}" if date_text else "no date_text"
@@ -64,6 +66,11 @@ class Command(BaseCommand):
                 )
                 unfixable.append((ep.id, ep.title[:55], reason))
 
+        if fixed_ids:
+            Book.refresh_latest_aired(
+                Book.objects.filter(episodes__in=fixed_ids).values_list("pk", flat=True)
+            )
+
         self.stdout.write(f"\n{'=' * 60}")
         self.stdout.write(f"  Fixed: {fixed}  |  Unfixable: {len(unfixable)}  |  Total: {total}")
         if not apply and fixed > 0:
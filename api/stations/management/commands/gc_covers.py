@@ -0,0 +1,84 @@
+"""
+Delete cover files no book references.
+
+Covers and variants are content-addressed and shared between books, so
+replacing or clearing a cover never deletes files inline. This walks
+media/covers/ and removes every file that is neither a Book.cover_image
+nor listed in any Book.cover_variants. Files younger than --grace-hours
+are kept, so a cover being ingested right now (file written, row not yet
+saved) is never collected. Reusing an existing blob refreshes its mtime
+(covers.store_blob), and each file's references are checked again right
+before it is deleted, so a blob adopted during the run survives.
+
+Usage:
+    python manage.py gc_covers --dry-run
+    python manage.py gc_covers
+    python manage.py gc_covers --grace-hours 1
+"""
+
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from stations.covers import is_referenced
+from stations.models import Book
+
+
+def walk(storage, path):
+    """Yield every file name under path in storage."""
+    dirs, files = storage.listdir(path)
+    for name in files:
+        yield f"{path}/{name}"
+    for name in dirs:
+        yield from walk(storage, f"{path}/{name}")
+
+
+class Command(BaseCommand):
+    help = "Delete unreferenced cover and cover-variant files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="List files without deleting")
+        parser.add_argument(
+            "--grace-hours", type=float, default=24,
+            help="Keep unreferenced files newer than this (default 24)",
+        )
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        referenced = set()
+        for cover, variants in Book.objects.exclude(cover_image="").values_list(
+            "cover_image", "cover_variants"
+        ):
+            if cover:
+                referenced.add(cover)
+            referenced.update(v["name"] for v in variants)
+
+        if not storage.exists("covers"):
+            self.stdout.write("No covers directory")
+            return
+
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        deleted = kept = 0
+        for name in walk(storage, "covers"):
+            if name in referenced:
+                continue
+            if storage.get_modified_time(name) > cutoff:
+                kept += 1
+                continue
+            if options["dry_run"]:
+                deleted += 1
+                self.stdout.write(f"  Would delete {name}")
+                continue
+            # The scan above is a snapshot; a fetch may have adopted this blob since
+            if is_referenced(name) or storage.get_modified_time(name) > cutoff:
+                continue
+            deleted += 1
+            storage.delete(name)
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {deleted} unreferenced files, kept {kept} inside the grace period"
+            )
+        )
@@ -0,0 +1,76 @@
+"""
+Generate responsive WebP/AVIF cover variants for existing covers.
+
+New covers get variants when they are downloaded; this backfills books
+whose cover predates that (or all covers with --force, e.g. after
+changing COVER_VARIANT_WIDTHS). Pillow releases the GIL while resizing
+and encoding, so covers are processed on a thread pool.
+
+Usage:
+    python manage.py generate_cover_variants
+    python manage.py generate_cover_variants --workers 8 --limit 500
+    python manage.py generate_cover_variants --force
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from stations.covers import generate_cover_variants
+from stations.models import Book
+
+
+def _process(book_id, force=False):
+    try:
+        book = Book.objects.get(pk=book_id)
+        # --force regenerates: don't copy a sibling's (possibly stale) variants
+        return book_id, len(generate_cover_variants(book, reuse=not force)), None
+    except Exception as e:
+        return book_id, 0, e
+
+
+def _process_in_thread(book_id, force=False):
+    try:
+        return _process(book_id, force)
+    finally:
+        connection.close()  # each worker thread opens its own connection
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/AVIF cover variants for books missing them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Parallel threads (default 4, 1 = serial)")
+        parser.add_argument("--limit", type=int, default=None, help="Process at most this many books")
+        parser.add_argument("--force", action="store_true", help="Regenerate variants for every cover")
+
+    def handle(self, *args, **options):
+        books = Book.objects.exclude(cover_image="").exclude(cover_image__isnull=True)
+        if not options["force"]:
+            books = books.filter(cover_variants=[])
+        book_ids = list(books.order_by("pk").values_list("pk", flat=True)[: options["limit"]])
+        self.stdout.write(f"Generating cover variants for {len(book_ids)} books...")
+
+        if options["workers"] > 1:
+            pool = ThreadPoolExecutor(max_workers=options["workers"])
+            futures = [pool.submit(_process_in_thread, book_id, options["force"]) for book_id in book_ids]
+            results = (future.result() for future in as_completed(futures))
+        else:
+            pool = None
+            results = (_process(book_id, options["force"]) for book_id in book_ids)
+
+        done = failed = 0
+        for book_id, count, error in results:
+            if error:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"  Book {book_id}: {error}"))
+            else:
+                done += 1
+            if (done + failed) % 100 == 0:
+                self.stdout.write(f"  {done + failed}/{len(book_ids)}")
+        if pool:
+            pool.shutdown()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Completed: {done} books processed, {failed} failed")
+        )
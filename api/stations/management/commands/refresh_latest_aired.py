@@ -0,0 +1,43 @@
+"""
+Rebuild Book.latest_aired_at from linked episodes.
+
+The book list endpoints sort on this denormalized column. It is kept up
+to date by the pipeline and admin, so this is only needed after bulk
+edits outside those paths (raw SQL, shell fixes, restores).
+
+Usage:
+    python manage.py refresh_latest_aired
+    python manage.py refresh_latest_aired --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from stations.models import Book
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized Book.latest_aired_at column"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many books are stale without updating them",
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            stale = 0
+            books = Book.objects.annotate(actual=Max("episodes__aired_at")).only(
+                "id", "latest_aired_at"
+            )
+            for book in books.iterator():
+                if book.actual != book.latest_aired_at:
+                    stale += 1
+            self.stdout.write(
+                self.style.WARNING(f"Dry run: {stale} of {books.count()} books are stale")
+            )
+            return
+
+        updated = Book.refresh_latest_aired()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed latest_aired_at on {updated} books"))
@@ -0,0 +1,24 @@
+"""
+Rebuild the materialized BrandStats and TopicStats tables.
+
+Signals keep these current as books are verified and linked, so this is
+only needed after bulk edits that bypass signals (raw SQL, queryset
+update(), restores) or to create rows for brands/topics with no activity.
+
+Usage:
+    python manage.py refresh_stats
+"""
+
+from django.core.management.base import BaseCommand
+from stations.stats import refresh_brand_stats, refresh_topic_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-brand and per-topic verified book counts and aired ranges"
+
+    def handle(self, *args, **options):
+        brands = refresh_brand_stats()
+        topics = refresh_topic_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed stats for {brands} brands and {topics} topics")
+        )
@@ -2,15 +2,26 @@
 Reprocess all episodes through AI extraction (synchronous, diagnostic).
 
 Runs extraction one-by-one with full output per episode so you can
-monitor results, catch errors, and spot patterns.
+monitor results, catch errors, and spot patterns. With --batch, submits
+the episodes as Message Batches instead (half price, applied by the
+poll_extraction_batches task, usually within the hour); --wait polls here
+until they're applied. With --per-prompt N, packs N episodes into each
+extraction call (episodes the reply misses fall back to single calls).
+Episodes whose text was already extracted with the current prompt reuse
+the memoized result; --force calls Claude for every episode regardless.
 
 Usage:
     python manage.py reprocess_all
     python manage.py reprocess_all --status FAILED    # only failed ones
     python manage.py reprocess_all --dry-run           # show what would run
+    python manage.py reprocess_all --batch             # submit as Message Batches
+    python manage.py reprocess_all --batch --wait      # ...and apply results here
+    python manage.py reprocess_all --per-prompt 10     # 10 episodes per call
+    python manage.py reprocess_all --force             # ignore memoized results
 """
 
 import time
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from stations.models import Episode, Book
 
@@ -36,6 +47,33 @@ class Command(BaseCommand):
             default=None,
             help="Max number of episodes to process",
         )
+        parser.add_argument(
+            "--batch",
+            action="store_true",
+            help="Submit through the Message Batches API instead of one call per episode",
+        )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help="With --batch: poll until the batches are applied",
+        )
+        parser.add_argument(
+            "--per-prompt",
+            type=int,
+            default=None,
+            help="Episodes per extraction call (default EXTRACTION_EPISODES_PER_PROMPT)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Ignore memoized extraction results and call Claude for every episode",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=60,
+            help="With --wait: seconds between batch status checks (default 60)",
+        )
 
     def handle(self, *args, **options):
         qs = Episode.objects.all().order_by("id")
@@ -66,7 +104,14 @@ class Command(BaseCommand):
             self.stdout.write(f"\nDry run — {total} episodes would be reprocessed.")
             return
 
-        from stations.ai_utils import extract_books_from_episode
+        if options["batch"]:
+            self._submit_batches(episodes, options)
+            return
+
+        from stations.ai_utils import extract_books_from_episode, extract_books_from_episodes
+
+        per_prompt = options["per_prompt"] or settings.EXTRACTION_EPISODES_PER_PROMPT
+        results = {}
 
         stats = {
             "processed": 0,
@@ -80,16 +125,30 @@ class Command(BaseCommand):
         start_time = time.time()
 
         for i, ep in enumerate(episodes, 1):
-            old_books = set(
-                ep.books.values_list("title", flat=True)
-            )
+            if per_prompt > 1 and ep.id not in results:
+                # Extract this episode and the next few in one call
+                chunk = episodes[i - 1:i - 1 + per_prompt]
+                old_titles = {e.id: set(e.books.values_list("title", flat=True)) for e in chunk}
+                results = extract_books_from_episodes([e.id for e in chunk], refresh=options["force"])
+
+            if per_prompt > 1:
+                old_books = old_titles[ep.id]
+            else:
+                old_books = set(
+                    ep.books.values_list("title", flat=True)
+                )
             stats["books_before"] += len(old_books)
 
             self.stdout.write(f"\n[{i}/{total}] #{ep.id} {ep.title[:65]}")
             self.stdout.write(f"  Stage: {ep.stage} | Old books: {sorted(old_books) or '(none)'}")
 
             try:
-                result = extract_books_from_episode(ep.id)
+                if per_prompt > 1:
+                    result = results[ep.id]
+                    if "error" in result:
+                        raise RuntimeError(result["error"])
+                else:
+                    result = extract_books_from_episode(ep.id, refresh=options["force"])
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f"  EXCEPTION: {e}"))
                 stats["failed"] += 1
@@ -156,3 +215,44 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR(f"    #{eid} {title}: {err}"))
 
         self.stdout.write(f"\n{'=' * 70}\n")
+
+    def _submit_batches(self, episodes, options):
+        from stations.ai_utils import get_book_extractor
+        from stations.extraction_batches import poll_extraction_batches, submit_extraction_batch
+
+        size = settings.EXTRACTION_BATCH_MAX_EPISODES
+        batch_ids = []
+        for start in range(0, len(episodes), size):
+            chunk = episodes[start:start + size]
+            batch = submit_extraction_batch(chunk, refresh=options["force"])
+            if batch is None:
+                if not get_book_extractor().is_available():
+                    self.stdout.write(self.style.ERROR("  Anthropic API not configured, nothing submitted."))
+                    return
+                self.stdout.write(f"  All {len(chunk)} episodes memoized, applied without a batch")
+                continue
+            batch_ids.append(batch.batch_id)
+            self.stdout.write(f"  Submitted {batch.batch_id} ({batch.episode_count} episodes)")
+
+        if not options["wait"]:
+            self.stdout.write(
+                f"\n{len(batch_ids)} batch(es) submitted; poll_extraction_batches applies them when they end."
+            )
+            return
+
+        from stations.models import ExtractionBatch
+
+        pending = set(batch_ids)
+        while pending:
+            time.sleep(options["poll_interval"])
+            for batch_id, status in poll_extraction_batches().items():
+                if batch_id in pending:
+                    self.stdout.write(f"  {batch_id}: {status}")
+            # Also drops batches the beat task applied in the meantime
+            pending = set(
+                ExtractionBatch.objects.filter(
+                    batch_id__in=pending,
+                    status__in=[ExtractionBatch.STATUS_IN_PROGRESS, ExtractionBatch.STATUS_APPLYING],
+                ).values_list("batch_id", flat=True)
+            )
+        self.stdout.write(self.style.SUCCESS(f"\nAll {len(batch_ids)} batch(es) applied."))
@@ -0,0 +1,105 @@
+"""
+Serve the fake external services (stations.fake_services) until interrupted.
+
+Point a web process or Celery workers at it by exporting the printed
+FAKE_SERVICES_URL before starting them, and create brands with the
+printed feed URLs. benchmark_pipeline starts its own server; use this one
+for manual testing or for workers that run on another host.
+
+Usage:
+    python manage.py run_fake_services
+    python manage.py run_fake_services --host 0.0.0.0 --port 8765 --latency-ms 200
+    python manage.py run_fake_services --profile anthropic:latency_ms=1500,rate_limit_rate=0.05
+    python manage.py run_fake_services --fixtures ./recorded
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from stations.fake_services import SERVICES, FakeServices, ServiceProfile
+
+
+def add_profile_arguments(parser):
+    """Options shared with benchmark_pipeline for shaping the fake services."""
+    parser.add_argument("--episodes", type=int, default=20, help="Episodes per fake feed (default 20)")
+    parser.add_argument(
+        "--book-rate", type=float, default=0.6,
+        help="Fraction of episodes that discuss a book (default 0.6)",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency, up to this much")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with 500")
+    parser.add_argument(
+        "--rate-limit-rate", type=float, default=0,
+        help="Fraction of requests answered with 429",
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        default=[],
+        metavar="SERVICE:KEY=VALUE,...",
+        help=f"Override the profile for one service ({', '.join(SERVICES)}); repeatable",
+    )
+    parser.add_argument(
+        "--fixtures",
+        default=None,
+        help="Directory of recorded responses (<service>.json) to serve instead of generated ones",
+    )
+
+
+def fake_services_from_options(options, host="127.0.0.1", port=0, public_url=None):
+    default = ServiceProfile(
+        latency_ms=options["latency_ms"],
+        jitter_ms=options["jitter_ms"],
+        error_rate=options["error_rate"],
+        rate_limit_rate=options["rate_limit_rate"],
+    )
+    profiles = {}
+    for spec in options["profile"]:
+        service, _, values = spec.partition(":")
+        if service not in SERVICES:
+            raise CommandError(f"Unknown service '{service}' (expected one of {', '.join(SERVICES)})")
+        try:
+            profiles[service] = ServiceProfile.parse(values, base=default)
+        except ValueError as e:
+            raise CommandError(str(e))
+    return FakeServices(
+        host=host,
+        port=port,
+        episodes=options["episodes"],
+        book_rate=options["book_rate"],
+        default_profile=default,
+        profiles=profiles,
+        fixtures_dir=options["fixtures"],
+        public_url=public_url,
+    )
+
+
+class Command(BaseCommand):
+    help = "Serve fake Anthropic, Google Books, Open Library, BBC, RSS and WNYC endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default 127.0.0.1)")
+        parser.add_argument("--port", type=int, default=8765, help="Port to bind (default 8765)")
+        parser.add_argument(
+            "--public-url",
+            default=None,
+            help="Base URL other hosts use to reach this server (e.g. http://fakes:8765)",
+        )
+        add_profile_arguments(parser)
+
+    def handle(self, *args, **options):
+        fake = fake_services_from_options(
+            options, host=options["host"], port=options["port"], public_url=options["public_url"]
+        )
+        with fake:
+            self.stdout.write(f"Fake services listening on {fake.url}")
+            self.stdout.write(f"  export FAKE_SERVICES_URL={fake.url}")
+            for kind, spider in (("bbc", "bbc_episodes"), ("rss", "rss"), ("wnyc", "wnyc_api")):
+                self.stdout.write(f"  {spider:<13} brand url: {fake.brand_url(kind, 'any-slug')}")
+            try:
+                while True:
+                    time.sleep(60)
+                    self.stdout.write(f"Calls so far: {fake.stats()}")
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping")
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-17 07:24
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def populate_latest_aired_at(apps, schema_editor):
+    Book = apps.get_model("stations", "Book")
+    Episode = apps.get_model("stations", "Episode")
+    latest = (
+        Episode.objects.filter(books=OuterRef("pk"))
+        .order_by(F("aired_at").desc(nulls_last=True))
+        .values("aired_at")[:1]
+    )
+    Book.objects.update(latest_aired_at=Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0050_remove_episode_has_book'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='latest_aired_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_latest_aired_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(models.F('verification_status'), models.OrderBy(models.F('latest_aired_at'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), name='book_status_latest_aired_idx'),
+        ),
+    ]
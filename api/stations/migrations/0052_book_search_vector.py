@@ -0,0 +1,62 @@
+# Generated by Django 5.1.4 on 2026-10-17 07:45
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.operations import UnaccentExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+CONFIG = "english_unaccent"
+
+
+def populate_search_vector(apps, schema_editor):
+    Book = apps.get_model("stations", "Book")
+    Topic = apps.get_model("stations", "Topic")
+    topic_names = (
+        Topic.objects.filter(book=OuterRef("pk"))
+        .order_by()
+        .values("book")
+        .annotate(names=StringAgg("name", delimiter=" "))
+        .values("names")
+    )
+    Book.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config=CONFIG)
+            + SearchVector("author", weight="B", config=CONFIG)
+            + SearchVector("description", weight="C", config=CONFIG)
+            + SearchVector(Coalesce(Subquery(topic_names), Value(""), output_field=TextField()), weight="D", config=CONFIG)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0051_book_latest_aired_at'),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        # english stemming with accents stripped first, for author names
+        migrations.RunSQL(
+            sql=[
+                f"CREATE TEXT SEARCH CONFIGURATION {CONFIG} (COPY = english);",
+                f"ALTER TEXT SEARCH CONFIGURATION {CONFIG} "
+                "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, english_stem;",
+            ],
+            reverse_sql=f"DROP TEXT SEARCH CONFIGURATION {CONFIG};",
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='book_search_vector_gin'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.1.4 on 2026-10-17 07:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q
+
+
+def populate_stats(apps, schema_editor):
+    Brand = apps.get_model("stations", "Brand")
+    Topic = apps.get_model("stations", "Topic")
+    BrandStats = apps.get_model("stations", "BrandStats")
+    TopicStats = apps.get_model("stations", "TopicStats")
+
+    brands = Brand.objects.values("pk").annotate(
+        verified_books=Count(
+            "episode__books",
+            filter=Q(episode__books__verification_status="verified"),
+            distinct=True,
+        ),
+        episodes=Count("episode", distinct=True),
+        first_aired=Min("episode__aired_at"),
+        last_aired=Max("episode__aired_at"),
+    )
+    BrandStats.objects.bulk_create([
+        BrandStats(
+            brand_id=row["pk"],
+            book_count=row["verified_books"],
+            episode_count=row["episodes"],
+            first_aired_at=row["first_aired"],
+            last_aired_at=row["last_aired"],
+        )
+        for row in brands
+    ])
+
+    verified = Q(book__verification_status="verified")
+    topics = Topic.objects.values("pk").annotate(
+        verified_books=Count("book", filter=verified, distinct=True),
+        first_aired=Min("book__episodes__aired_at", filter=verified),
+        last_aired=Max("book__episodes__aired_at", filter=verified),
+    )
+    TopicStats.objects.bulk_create([
+        TopicStats(
+            topic_id=row["pk"],
+            book_count=row["verified_books"],
+            first_aired_at=row["first_aired"],
+            last_aired_at=row["last_aired"],
+        )
+        for row in topics
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0053_book_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BrandStats',
+            fields=[
+                ('brand', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='stations.brand')),
+                ('book_count', models.PositiveIntegerField(default=0, help_text='Verified books')),
+                ('episode_count', models.PositiveIntegerField(default=0)),
+                ('first_aired_at', models.DateTimeField(blank=True, null=True)),
+                ('last_aired_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'brand stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='TopicStats',
+            fields=[
+                ('topic', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='stations.topic')),
+                ('book_count', models.PositiveIntegerField(default=0, help_text='Verified books')),
+                ('first_aired_at', models.DateTimeField(blank=True, null=True)),
+                ('last_aired_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'topic stats',
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-17 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0054_brand_topic_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookLookup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='sha256 of normalized title|author', max_length=64, unique=True)),
+                ('title', models.CharField(help_text='Normalized title', max_length=500)),
+                ('author', models.CharField(blank=True, help_text='Normalized author', max_length=500)),
+                ('result', models.CharField(choices=[('found', 'Found'), ('not_found', 'Not found'), ('error', 'Error')], max_length=10)),
+                ('data', models.JSONField(default=dict)),
+                ('fetched_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
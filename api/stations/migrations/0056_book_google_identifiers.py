@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-17 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0055_book_lookup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='google_volume_id',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='isbn',
+            field=models.CharField(blank=True, default='', help_text='ISBN-13 (or ISBN-10)', max_length=13),
+        ),
+    ]
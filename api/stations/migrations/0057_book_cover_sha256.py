@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0056_book_google_identifiers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='cover_sha256',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
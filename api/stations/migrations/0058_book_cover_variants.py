@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0057_book_cover_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='cover_variants',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
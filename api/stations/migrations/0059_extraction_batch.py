@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-17 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0058_book_cover_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractionBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.CharField(max_length=100, unique=True)),
+                ('status', models.CharField(choices=[('in_progress', 'In progress'), ('applied', 'Applied'), ('failed', 'Failed')], db_index=True, default='in_progress', max_length=20)),
+                ('episode_count', models.PositiveIntegerField(default=0)),
+                ('request_counts', models.JSONField(blank=True, default=dict)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'extraction batches',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='episode',
+            name='stage',
+            field=models.CharField(choices=[('SCRAPED', 'Scraped'), ('EXTRACTION_QUEUED', 'Extraction Queued'), ('EXTRACTING', 'Extracting'), ('EXTRACTION_BATCHED', 'Extraction Batch Pending'), ('EXTRACTION_NO_BOOKS', 'No Books Found'), ('EXTRACTION_FAILED', 'Extraction Failed'), ('VERIFICATION_QUEUED', 'Verification Queued'), ('VERIFICATION_FAILED', 'Verification Failed'), ('REVIEW', 'Needs Review'), ('COMPLETE', 'Complete')], default='SCRAPED', max_length=25),
+        ),
+    ]
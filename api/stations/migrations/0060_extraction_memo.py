@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-17 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0059_extraction_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractionMemo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='sha256 of normalized text|prompt version|model', max_length=64, unique=True)),
+                ('prompt_version', models.CharField(max_length=20)),
+                ('model', models.CharField(max_length=100)),
+                ('text', models.TextField(help_text='Normalized episode text')),
+                ('result', models.JSONField(default=dict)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0060_extraction_memo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='extractionbatch',
+            name='status',
+            field=models.CharField(choices=[('in_progress', 'In progress'), ('applying', 'Applying'), ('applied', 'Applied'), ('failed', 'Failed')], db_index=True, default='in_progress', max_length=20),
+        ),
+    ]
@@ -1,7 +1,14 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, OuterRef, Subquery
 from django.utils.text import slugify
 from django.utils import timezone
+from datetime import timedelta
+import hashlib
 import json
+import re
+import unicodedata
 
 
 class Station(models.Model):
@@ -29,11 +36,11 @@ class Brand(models.Model):
 
     @property
     def book_count(self):
-        """Count of verified books associated with this brand"""
-        return Book.objects.filter(
-            episodes__brand=self,
-            verification_status=Book.VERIFICATION_VERIFIED,
-        ).distinct().count()
+        """Count of verified books associated with this brand (from BrandStats)"""
+        try:
+            return self.stats.book_count
+        except BrandStats.DoesNotExist:
+            return 0
 
     def save(self, *args, **kwargs):
         # Auto-generate slug from name if not provided
@@ -55,10 +62,16 @@ class Brand(models.Model):
         return self.name
 
 
+def stats_snapshot(instance):
+    """Current values of instance.STATS_FIELDS (None where deferred)."""
+    return tuple(instance.__dict__.get(field) for field in instance.STATS_FIELDS)
+
+
 class Episode(models.Model):
     STAGE_SCRAPED = "SCRAPED"
     STAGE_EXTRACTION_QUEUED = "EXTRACTION_QUEUED"
     STAGE_EXTRACTING = "EXTRACTING"
+    STAGE_EXTRACTION_BATCHED = "EXTRACTION_BATCHED"
     STAGE_EXTRACTION_NO_BOOKS = "EXTRACTION_NO_BOOKS"
     STAGE_EXTRACTION_FAILED = "EXTRACTION_FAILED"
     STAGE_VERIFICATION_QUEUED = "VERIFICATION_QUEUED"
@@ -69,6 +82,7 @@ class Episode(models.Model):
         (STAGE_SCRAPED, "Scraped"),
         (STAGE_EXTRACTION_QUEUED, "Extraction Queued"),
         (STAGE_EXTRACTING, "Extracting"),
+        (STAGE_EXTRACTION_BATCHED, "Extraction Batch Pending"),
         (STAGE_EXTRACTION_NO_BOOKS, "No Books Found"),
         (STAGE_EXTRACTION_FAILED, "Extraction Failed"),
         (STAGE_VERIFICATION_QUEUED, "Verification Queued"),
@@ -97,6 +111,15 @@ class Episode(models.Model):
     ai_confidence = models.FloatField(null=True, blank=True)
     status_changed_at = models.DateTimeField(null=True, blank=True)
 
+    # Fields whose change moves BrandStats/TopicStats (see signals.py)
+    STATS_FIELDS = ("brand_id", "aired_at")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stats_snapshot = stats_snapshot(instance)
+        return instance
+
     @classmethod
     def stuck(cls, threshold_minutes=60):
         """Return episodes stuck in EXTRACTION_QUEUED/EXTRACTING longer than threshold."""
@@ -149,17 +172,15 @@ class Episode(models.Model):
 
 
 def book_cover_path(instance, filename):
-    """Generate upload path for book covers: covers/brand-slug/author-title.ext"""
+    """
+    Staging path for covers uploaded through the admin. BookAdmin moves them
+    to a content-addressed name (covers.adopt_stored_cover) right after saving.
+    """
     import os
+    import uuid
 
     ext = os.path.splitext(filename)[1] or ".jpg"
-    first_episode = instance.episodes.select_related("brand").first() if instance.pk else None
-    brand_slug = (
-        first_episode.brand.slug
-        if first_episode and first_episode.brand
-        else "unknown"
-    )
-    return f"covers/{brand_slug}/{instance.slug}{ext}"
+    return f"covers/uploads/{uuid.uuid4().hex}{ext}"
 
 
 class Topic(models.Model):
@@ -197,6 +218,11 @@ class Book(models.Model):
         null=True,
         help_text="Book cover image stored locally",
     )
+    # SHA-256 of the stored cover file, so unchanged refetches skip the write
+    cover_sha256 = models.CharField(max_length=64, blank=True, default="", editable=False)
+    # Resized WebP/AVIF copies of the cover: [{"format", "width", "height", "name"}]
+    # Written by covers.generate_cover_variants; backfill with `generate_cover_variants`.
+    cover_variants = models.JSONField(default=list, blank=True, editable=False)
     cover_fetch_error = models.TextField(blank=True, default="")
     purchase_link = models.URLField(blank=True, default="")
     verification_status = models.CharField(
@@ -205,7 +231,76 @@ class Book(models.Model):
         default=VERIFICATION_PENDING,
     )
     verification_checked_at = models.DateTimeField(null=True, blank=True)
+    # Google Books match, kept so later lookups fetch this volume directly
+    google_volume_id = models.CharField(max_length=32, blank=True, default="")
+    isbn = models.CharField(max_length=13, blank=True, default="", help_text="ISBN-13 (or ISBN-10)")
     unmatched_topics = models.CharField(max_length=255, blank=True, default="")
+    # Denormalized Max(episodes__aired_at) — list endpoints sort on this.
+    # Maintained by refresh_latest_aired(); rebuild with `refresh_latest_aired`.
+    latest_aired_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Weighted tsvector over title/author/description/topic names (see search.py).
+    # Maintained by refresh_search_vector() from signals.
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    # Fields whose change moves BrandStats/TopicStats (see signals.py)
+    STATS_FIELDS = ("verification_status",)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                "verification_status",
+                F("latest_aired_at").desc(nulls_last=True),
+                F("id").desc(),
+                name="book_status_latest_aired_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="book_search_vector_gin"),
+            GinIndex(fields=["title"], name="book_title_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["author"], name="book_author_trgm", opclasses=["gin_trgm_ops"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stats_snapshot = stats_snapshot(instance)
+        return instance
+
+    @classmethod
+    def refresh_latest_aired(cls, book_ids=None):
+        """
+        Recompute latest_aired_at from linked episodes in a single UPDATE.
+
+        Call after linking/unlinking episodes or changing an episode's aired_at.
+        Pass book_ids to limit the update; None refreshes every book.
+        Returns the number of rows updated.
+        """
+        latest = (
+            Episode.objects.filter(books=OuterRef("pk"))
+            .order_by(F("aired_at").desc(nulls_last=True))
+            .values("aired_at")[:1]
+        )
+        queryset = cls.objects.all()
+        if book_ids is not None:
+            queryset = queryset.filter(pk__in=list(book_ids))
+        updated = queryset.update(latest_aired_at=Subquery(latest))
+        # update() bypasses post_save, and this changes list order
+        from .cache import invalidate_on_commit
+        invalidate_on_commit()
+        return updated
+
+    @classmethod
+    def refresh_search_vector(cls, book_ids=None):
+        """
+        Rebuild search_vector in a single UPDATE.
+
+        Pass book_ids to limit the update; None refreshes every book.
+        Returns the number of rows updated.
+        """
+        from .search import book_search_vector
+
+        queryset = cls.objects.all()
+        if book_ids is not None:
+            queryset = queryset.filter(pk__in=list(book_ids))
+        return queryset.update(search_vector=book_search_vector())
 
     def _generate_slug(self):
         """Generate slug from author + title, ensuring uniqueness."""
@@ -240,6 +335,19 @@ class Book(models.Model):
         brand_slug = episode.brand.slug if episode and episode.brand else "unknown"
         return f"https://radioreads.fun/{brand_slug}/{self.slug}"
 
+    def set_google_identifiers(self, book_info):
+        """
+        Copy volume id and ISBN from a Google Books lookup result.
+        Returns the changed field names, for save(update_fields=...).
+        """
+        changed = []
+        for field, key in (("google_volume_id", "volume_id"), ("isbn", "isbn")):
+            value = book_info.get(key) or ""
+            if value and value != getattr(self, field):
+                setattr(self, field, value)
+                changed.append(field)
+        return changed
+
     def get_bookshop_affiliate_url(self):
         """Generate Bookshop.org affiliate search URL for this book"""
         from .utils import generate_bookshop_affiliate_url
@@ -252,3 +360,211 @@ class Phrase(models.Model):
 
     def __str__(self):
         return self.text
+
+
+class BrandStats(models.Model):
+    """
+    Materialized per-brand counts, so list pages and admin don't aggregate
+    over episodes and books on every request. Maintained incrementally by
+    stations.stats (via signals); rebuild with `manage.py refresh_stats`.
+    """
+
+    brand = models.OneToOneField(
+        Brand, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    book_count = models.PositiveIntegerField(default=0, help_text="Verified books")
+    episode_count = models.PositiveIntegerField(default=0)
+    first_aired_at = models.DateTimeField(null=True, blank=True)
+    last_aired_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "brand stats"
+
+    def __str__(self):
+        return f"{self.brand}: {self.book_count} books"
+
+
+class TopicStats(models.Model):
+    """Materialized per-topic verified book counts and aired range (see BrandStats)."""
+
+    topic = models.OneToOneField(
+        Topic, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    book_count = models.PositiveIntegerField(default=0, help_text="Verified books")
+    first_aired_at = models.DateTimeField(null=True, blank=True)
+    last_aired_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "topic stats"
+
+    def __str__(self):
+        return f"{self.topic}: {self.book_count} books"
+
+
+class BookLookup(models.Model):
+    """
+    Cached Google Books lookup (the parsed verify_book_exists result), keyed
+    on normalized title + author so re-verification, cover refetches and
+    management commands reuse earlier answers instead of spending quota.
+    Found, not-found and error results expire after different TTLs.
+    """
+
+    RESULT_FOUND = "found"
+    RESULT_NOT_FOUND = "not_found"
+    RESULT_ERROR = "error"
+    RESULT_CHOICES = [
+        (RESULT_FOUND, "Found"),
+        (RESULT_NOT_FOUND, "Not found"),
+        (RESULT_ERROR, "Error"),
+    ]
+
+    key = models.CharField(max_length=64, unique=True, help_text="sha256 of normalized title|author")
+    title = models.CharField(max_length=500, help_text="Normalized title")
+    author = models.CharField(max_length=500, blank=True, help_text="Normalized author")
+    result = models.CharField(max_length=10, choices=RESULT_CHOICES)
+    data = models.JSONField(default=dict)
+    fetched_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.title} / {self.author}: {self.result}"
+
+    @staticmethod
+    def normalize(text):
+        """Casefold, strip accents and punctuation, collapse whitespace."""
+        text = unicodedata.normalize("NFKD", text or "")
+        text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+        return " ".join(re.findall(r"\w+", text))
+
+    @classmethod
+    def make_key(cls, title, author=""):
+        normalized = f"{cls.normalize(title)}|{cls.normalize(author)}"
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    @classmethod
+    def get_fresh(cls, title, author=""):
+        """Cached result dict for title/author, or None if missing or expired."""
+        lookup = cls.objects.filter(
+            key=cls.make_key(title, author), expires_at__gt=timezone.now()
+        ).first()
+        if lookup is None:
+            return None
+        data = dict(lookup.data, requests=0)
+        if not data.get("exists"):
+            # Not-found results echo the query back, which may differ in case
+            data["title"], data["author"] = title, author
+        return data
+
+    @classmethod
+    def store(cls, title, author, data):
+        """Save a verify_book_exists result with the TTL for its outcome."""
+        from django.conf import settings
+
+        if data.get("exists"):
+            result, ttl = cls.RESULT_FOUND, settings.GOOGLE_BOOKS_CACHE_TTL_FOUND
+        elif data.get("error"):
+            result, ttl = cls.RESULT_ERROR, settings.GOOGLE_BOOKS_CACHE_TTL_ERROR
+        else:
+            result, ttl = cls.RESULT_NOT_FOUND, settings.GOOGLE_BOOKS_CACHE_TTL_NOT_FOUND
+        now = timezone.now()
+        cls.objects.update_or_create(
+            key=cls.make_key(title, author),
+            defaults={
+                "title": cls.normalize(title)[:500],
+                "author": cls.normalize(author)[:500],
+                "result": result,
+                "data": data,
+                "fetched_at": now,
+                "expires_at": now + timedelta(seconds=ttl),
+            },
+        )
+
+
+class ExtractionMemo(models.Model):
+    """
+    A memoized book extraction result, keyed on the normalized episode text,
+    the prompt version and the model. Reprocessing an episode, or a repeat
+    republished with the same synopsis, reuses the result instead of calling
+    Claude again. Changing the extraction prompt or model changes the key,
+    so old rows simply stop matching.
+    """
+
+    key = models.CharField(max_length=64, unique=True, help_text="sha256 of normalized text|prompt version|model")
+    prompt_version = models.CharField(max_length=20)
+    model = models.CharField(max_length=100)
+    text = models.TextField(help_text="Normalized episode text")
+    result = models.JSONField(default=dict)
+    hits = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.text[:60]} ({self.prompt_version}, {self.hits} hits)"
+
+    @staticmethod
+    def normalize(text):
+        """Unicode-normalize and collapse whitespace; case is kept, it can matter to the model."""
+        return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+    @classmethod
+    def make_key(cls, text, prompt_version, model):
+        keyed = f"{cls.normalize(text)}|{prompt_version}|{model}"
+        return hashlib.sha256(keyed.encode()).hexdigest()
+
+    @classmethod
+    def get_result(cls, text, prompt_version, model):
+        """The memoized result dict for text, or None; counts the hit."""
+        key = cls.make_key(text, prompt_version, model)
+        memo = cls.objects.filter(key=key).only("result").first()
+        if memo is None:
+            return None
+        cls.objects.filter(key=key).update(hits=models.F("hits") + 1, last_used_at=timezone.now())
+        return memo.result
+
+    @classmethod
+    def store(cls, text, prompt_version, model, result):
+        cls.objects.update_or_create(
+            key=cls.make_key(text, prompt_version, model),
+            defaults={
+                "prompt_version": prompt_version,
+                "model": model,
+                "text": cls.normalize(text),
+                "result": result,
+            },
+        )
+
+
+class ExtractionBatch(models.Model):
+    """
+    An Anthropic Message Batch of episode extractions. Its episodes wait in
+    EXTRACTION_BATCHED (with task_id set to batch_id) until
+    poll_extraction_batches finds the batch ended and applies the results.
+    """
+
+    STATUS_IN_PROGRESS = "in_progress"
+    STATUS_APPLYING = "applying"
+    STATUS_APPLIED = "applied"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_IN_PROGRESS, "In progress"),
+        (STATUS_APPLYING, "Applying"),
+        (STATUS_APPLIED, "Applied"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    batch_id = models.CharField(max_length=100, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_IN_PROGRESS, db_index=True)
+    episode_count = models.PositiveIntegerField(default=0)
+    request_counts = models.JSONField(default=dict, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created = models.DateTimeField(auto_now_add=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created"]
+        verbose_name_plural = "extraction batches"
+
+    def __str__(self):
+        return f"{self.batch_id} ({self.episode_count} episodes, {self.status})"
@@ -0,0 +1,119 @@
+"""
+Keyset (cursor) pagination for book listings.
+
+Page-number pagination runs a COUNT(DISTINCT ...) plus an OFFSET scan that
+gets slower the deeper a client pages. Keyset pagination instead remembers
+the (latest_aired_at, id) of the last row served and asks for rows after
+it, so every page costs the same index range scan.
+
+Opt in by passing ``cursor`` (empty for the first page); follow ``next``
+to continue. ``count`` is only computed when ``?count=1`` is passed.
+Searches ignore ``cursor`` and page by number (see BookViewSet.paginator).
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class BookKeysetPagination(BasePagination):
+    """Paginate books ordered by latest_aired_at DESC NULLS LAST, id DESC."""
+
+    ordering_field = "latest_aired_at"
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    @classmethod
+    def is_requested(cls, request):
+        """True when the client asked for cursor mode (``?cursor`` present)."""
+        return cls.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = None
+
+        queryset = queryset.order_by(
+            F(self.ordering_field).desc(nulls_last=True), "-pk"
+        )
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count = queryset.count()
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self._after(*position))
+
+        # One extra row tells us whether there is a next page
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        results = results[: self.page_size]
+        self.last = results[-1] if results else None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": None,
+                "results": data,
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        value = getattr(self.last, self.ordering_field)
+        token = self.encode_cursor(value, self.last.pk)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def encode_cursor(self, value, pk):
+        payload = {"t": value.isoformat() if value else None, "id": pk}
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        """Return (value, pk) from the cursor param, or None for the first page."""
+        token = request.query_params.get(self.cursor_query_param, "")
+        if not token:
+            return None
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            value = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+            return value, int(payload["id"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _after(self, value, pk):
+        """Rows that sort strictly after (value, pk) with NULLs last."""
+        field = self.ordering_field
+        if value is None:
+            return Q(**{f"{field}__isnull": True, "pk__lt": pk})
+        return (
+            Q(**{f"{field}__lt": value})
+            | Q(**{field: value, "pk__lt": pk})
+            | Q(**{f"{field}__isnull": True})
+        )
@@ -0,0 +1,275 @@
+"""
+Book metadata providers.
+
+Verification and cover lookups go through an ordered list of providers
+(settings.METADATA_PROVIDERS, Google Books first by default) rather than
+straight to Google Books, so a Google quota outage (the 12-hour cooldown
+after a 429) no longer stops the verification backlog:
+
+- Each provider has its own shared RateLimiter (ratelimit.py) whose
+  cooldown doubles as its health: a 429 starts the provider's long
+  cooldown, a failed lookup (timeout, 5xx) a short one
+  (METADATA_PROVIDER_ERROR_COOLDOWN).
+- search() skips providers that are cooling down and falls through to the
+  next one after a failure. Only the primary may report a book as not
+  found; a miss on a fallback is returned as an error, so the book stays
+  pending and is retried once the primary is back.
+- With METADATA_HEDGE_AFTER_SECONDS set, a search still running on one
+  provider after that long is also sent to the next, and the first
+  conclusive answer wins.
+
+Providers return the verify_book_exists dict (exists, title, author,
+cover_url, isbn, volume_id, requests) plus "provider". Caching stays in
+utils (BookLookup); nothing here touches the database, so hedged searches
+can run on threads.
+"""
+
+import logging
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from . import http_client
+
+logger = logging.getLogger(__name__)
+
+_OL_COOLDOWN_SECONDS = 600  # after a 429/503 from Open Library
+
+
+class ProviderUnavailable(Exception):
+    """A metadata provider (or every provider) is cooling down."""
+
+
+class MetadataProvider:
+    """Search, volume lookup and cover URL for one metadata source."""
+
+    name = ""
+
+    def limiter(self):
+        raise NotImplementedError
+
+    def search(self, title, author=""):
+        """Title/author lookup. Raises ProviderUnavailable during cooldown."""
+        raise NotImplementedError
+
+    def volume(self, volume_id="", isbn=""):
+        """Lookup by stored identifiers, or None if this provider can't."""
+        return None
+
+    def cover_url(self, title, author=""):
+        return self.search(title, author).get("cover_url") or ""
+
+    def cooldown_remaining(self):
+        return self.limiter().cooldown_remaining()
+
+    def mark_unhealthy(self):
+        self.limiter().start_cooldown(settings.METADATA_PROVIDER_ERROR_COOLDOWN)
+
+
+class GoogleBooksProvider(MetadataProvider):
+    name = "google_books"
+
+    def limiter(self):
+        from .ratelimit import google_books_limiter
+
+        return google_books_limiter()
+
+    def search(self, title, author=""):
+        from .utils import _fetch_google_books
+
+        return _fetch_google_books(title, author)
+
+    def volume(self, volume_id="", isbn=""):
+        from .utils import fetch_google_books_volume
+
+        return fetch_google_books_volume(volume_id, isbn)
+
+
+class OpenLibraryProvider(MetadataProvider):
+    name = "open_library"
+
+    _SEARCH_FIELDS = "title,author_name,isbn,cover_i"
+
+    def limiter(self):
+        from .ratelimit import open_library_limiter
+
+        return open_library_limiter()
+
+    def _request(self, params):
+        limiter = self.limiter()
+        remaining = limiter.cooldown_remaining()
+        if remaining:
+            raise ProviderUnavailable(f"Open Library in cooldown ({remaining}s remaining)")
+        limiter.acquire()
+
+        url = f"{settings.OPEN_LIBRARY_API_BASE}/search.json?{urllib.parse.urlencode(params)}"
+        try:
+            return http_client.get_json(url, timeout=10)
+        except http_client.HTTPError as e:
+            if e.status in (429, 503):
+                limiter.start_cooldown(_OL_COOLDOWN_SECONDS)
+                logger.warning(f"Open Library {e.status}, entering {_OL_COOLDOWN_SECONDS}s cooldown")
+                raise ProviderUnavailable(str(e)) from e
+            raise
+
+    def _result(self, docs):
+        doc = docs[0]
+        authors = doc.get("author_name") or []
+        isbns = doc.get("isbn") or []
+        # Prefer a cover from the top result, else the first edition that has one
+        cover_id = next((d["cover_i"] for d in docs if d.get("cover_i")), None)
+        return {
+            "exists": True,
+            "title": doc.get("title", ""),
+            "author": authors[0] if authors else "",
+            "cover_url": f"https://covers.openlibrary.org/b/id/{cover_id}-L.jpg" if cover_id else None,
+            "isbn": next((i for i in isbns if len(i) == 13), isbns[0] if isbns else None),
+            "description": "",
+            "search_snippet": "",
+            "volume_id": "",
+            "requests": 1,
+        }
+
+    def search(self, title, author=""):
+        not_found = {"exists": False, "title": title, "author": author, "cover_url": None, "isbn": None}
+        params = {"title": title, "limit": 5, "fields": self._SEARCH_FIELDS}
+        if author:
+            params["author"] = author
+        try:
+            docs = self._request(params).get("docs")
+        except ProviderUnavailable:
+            raise
+        except Exception as e:
+            logger.warning(f"Open Library lookup failed for '{title}': {e}")
+            return dict(not_found, error=str(e)[:200], requests=1)
+        return self._result(docs) if docs else dict(not_found, requests=1)
+
+    def volume(self, volume_id="", isbn=""):
+        if not isbn:
+            return None
+        try:
+            docs = self._request({"isbn": isbn, "limit": 1, "fields": self._SEARCH_FIELDS}).get("docs")
+        except ProviderUnavailable:
+            raise
+        except Exception as e:
+            logger.warning(f"Open Library ISBN lookup failed for {isbn}: {e}")
+            return None
+        return self._result(docs) if docs else None
+
+
+_PROVIDER_CLASSES = {cls.name: cls for cls in (GoogleBooksProvider, OpenLibraryProvider)}
+_providers = {}
+
+
+def get_provider(name):
+    """The process-wide instance of a provider, by name."""
+    if name not in _providers:
+        _providers[name] = _PROVIDER_CLASSES[name]()
+    return _providers[name]
+
+
+def get_providers():
+    """Configured providers, primary first."""
+    return [get_provider(name) for name in settings.METADATA_PROVIDERS]
+
+
+def cooldown_remaining():
+    """Seconds until any configured provider can be used again, 0 if one can now."""
+    return min(provider.cooldown_remaining() for provider in get_providers())
+
+
+def _attempt(provider, primary, title, author, unavailable):
+    """
+    provider.search tagged with its name, or None if it is cooling down
+    (the exception is appended to unavailable).
+    """
+    try:
+        result = provider.search(title, author)
+    except ProviderUnavailable as e:
+        logger.warning(f"{provider.name} unavailable for '{title}': {e}")
+        unavailable.append(e)
+        return None
+    result = dict(result, provider=provider.name)
+    if result.get("error"):
+        provider.mark_unhealthy()
+    elif not result["exists"] and provider is not primary:
+        result["error"] = f"Not found on {provider.name} while {primary.name} unavailable"
+    return result
+
+
+def _hedged(first, second, primary, title, author, hedge_after, unavailable):
+    """
+    Search first; if it hasn't answered within hedge_after seconds, search
+    second as well. Returns (results in completion order, whether second
+    was asked), stopping at the first conclusive result.
+    """
+    pool = ThreadPoolExecutor(max_workers=2)
+    try:
+        futures = {pool.submit(_attempt, first, primary, title, author, unavailable)}
+        done, _ = wait(futures, timeout=hedge_after)
+        hedged = not done
+        if hedged:
+            logger.info(f"{first.name} slower than {hedge_after}s for '{title}', also asking {second.name}")
+            futures.add(pool.submit(_attempt, second, primary, title, author, unavailable))
+        results = []
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                if result and not result.get("error"):
+                    return results, hedged
+        return results, hedged
+    finally:
+        # Don't wait for the slower provider; its answer is discarded
+        pool.shutdown(wait=False)
+
+
+def search(title, author=""):
+    """
+    Look a book up on the first provider that can answer conclusively.
+
+    Returns the verify_book_exists dict; if no provider gives a conclusive
+    answer, the first error result. Raises ProviderUnavailable (the first
+    provider's own, if one was raised) when every provider is cooling down.
+    """
+    providers = get_providers()
+    primary = providers[0]
+    queue = [provider for provider in providers if not provider.cooldown_remaining()]
+    hedge_after = settings.METADATA_HEDGE_AFTER_SECONDS
+    results = []
+    unavailable = []
+    while queue:
+        provider = queue.pop(0)
+        if hedge_after and queue:
+            attempts, hedged = _hedged(
+                provider, queue[0], primary, title, author, hedge_after, unavailable
+            )
+            if hedged:
+                queue.pop(0)
+        else:
+            attempts = [_attempt(provider, primary, title, author, unavailable)]
+        results += attempts
+        if attempts[-1] and not attempts[-1].get("error"):
+            return attempts[-1]
+    for result in results:
+        if result:
+            return result
+    if unavailable:
+        raise unavailable[0]  # e.g. GoogleBooksRateLimited from a fresh 429
+    raise ProviderUnavailable(f"No metadata provider available for '{title}'")
+
+
+def lookup_volume(volume_id="", isbn=""):
+    """Identifier fast path on the first available provider that supports it, else None."""
+    for provider in get_providers():
+        if provider.cooldown_remaining():
+            continue
+        try:
+            result = provider.volume(volume_id, isbn)
+        except ProviderUnavailable:
+            continue
+        if result is not None:
+            return dict(result, provider=provider.name)
+    return None
@@ -0,0 +1,169 @@
+"""
+Cross-process rate limiting for external APIs.
+
+Celery runs several worker processes, so a limiter held in module globals
+lets each process spend the whole quota on its own. RateLimiter keeps a
+token bucket and a cooldown flag in Redis instead, shared by every worker:
+
+- acquire() blocks until the bucket has a token. Tokens refill at ``rate``
+  per second up to ``burst``. The bucket is updated by a Lua script using
+  Redis server time, so concurrent workers and clock skew can't overspend.
+- start_cooldown() / cooldown_remaining() share a "back off entirely" flag
+  (e.g. after a 429) through a key with a TTL.
+
+If Redis is unreachable the limiter degrades to an in-process bucket and
+cooldown, i.e. the old per-process behaviour, rather than failing calls.
+"""
+
+import logging
+import threading
+import time
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] = bucket hash; ARGV = rate (tokens/s), burst (capacity)
+# Returns seconds to wait before retrying, "0" when a token was taken.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+def get_redis():
+    """Redis client for shared limiter state."""
+    return redis.Redis.from_url(
+        settings.RATE_LIMIT_REDIS_URL, socket_timeout=2, socket_connect_timeout=2
+    )
+
+
+class RateLimiter:
+    """Shared token bucket + cooldown, namespaced by ``name``."""
+
+    def __init__(self, name, rate, burst=1, client=None):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.bucket_key = f"ratelimit:{name}:bucket"
+        self.cooldown_key = f"ratelimit:{name}:cooldown"
+        self._client = client
+        self._script = None
+        # In-process fallback state
+        self._lock = threading.Lock()
+        self._local_tokens = float(self.burst)
+        self._local_ts = time.monotonic()
+        self._local_cooldown_until = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_redis()
+        return self._client
+
+    def _redis_try_acquire(self):
+        if self._script is None:
+            self._script = self.client.register_script(_TOKEN_BUCKET_LUA)
+        return float(self._script(keys=[self.bucket_key], args=[self.rate, self.burst]))
+
+    def _local_try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._local_tokens = min(
+                self.burst, self._local_tokens + (now - self._local_ts) * self.rate
+            )
+            self._local_ts = now
+            if self._local_tokens >= 1:
+                self._local_tokens -= 1
+                return 0.0
+            return (1 - self._local_tokens) / self.rate
+
+    def try_acquire(self):
+        """Take a token if one is available. Returns seconds to wait, 0.0 on success."""
+        try:
+            return self._redis_try_acquire()
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter '{self.name}' using local bucket, Redis unavailable: {e}")
+            return self._local_try_acquire()
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def start_cooldown(self, seconds):
+        """Stop all callers from using the API for ``seconds`` (never shortens a longer one)."""
+        if self.cooldown_remaining() >= seconds:
+            return
+        self._local_cooldown_until = time.monotonic() + seconds
+        try:
+            self.client.set(self.cooldown_key, 1, ex=int(seconds))
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter '{self.name}' cooldown is local only: {e}")
+
+    def cooldown_remaining(self):
+        """Seconds left in the current cooldown, 0 if none."""
+        local = max(0, int(self._local_cooldown_until - time.monotonic()))
+        try:
+            shared = self.client.ttl(self.cooldown_key)
+        except redis.RedisError:
+            return local
+        return max(local, shared if shared and shared > 0 else 0)
+
+    def reset(self):
+        """Clear bucket and cooldown (admin/tests)."""
+        self._local_cooldown_until = 0.0
+        self._local_tokens = float(self.burst)
+        try:
+            self.client.delete(self.bucket_key, self.cooldown_key)
+        except redis.RedisError:
+            pass
+
+
+_google_books = None
+
+
+def google_books_limiter():
+    """The process-wide limiter for Google Books API calls."""
+    global _google_books
+    if _google_books is None:
+        _google_books = RateLimiter(
+            "google_books",
+            rate=settings.GOOGLE_BOOKS_RATE_PER_SECOND,
+            burst=settings.GOOGLE_BOOKS_RATE_BURST,
+        )
+    return _google_books
+
+
+_open_library = None
+
+
+def open_library_limiter():
+    """The process-wide limiter for Open Library API calls."""
+    global _open_library
+    if _open_library is None:
+        _open_library = RateLimiter(
+            "open_library",
+            rate=settings.OPEN_LIBRARY_RATE_PER_SECOND,
+            burst=settings.OPEN_LIBRARY_RATE_BURST,
+        )
+    return _open_library
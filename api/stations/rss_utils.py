@@ -9,6 +9,7 @@ from datetime import datetime
 
 import feedparser
 
+from . import http_client
 from .models import Episode
 
 logger = logging.getLogger(__name__)
@@ -26,7 +27,13 @@ def scrape_rss_brand(brand, max_episodes=50, since_date=None):
     Returns:
         dict with new_episodes count
     """
-    feed = feedparser.parse(brand.url)
+    # Fetched on the shared pool; feedparser's own fetching opens a new connection every time
+    try:
+        body = http_client.request("GET", brand.url).data
+    except http_client.RequestError as e:
+        logger.error(f"Failed to fetch RSS feed for {brand.name}: {e}")
+        return {"new_episodes": 0}
+    feed = feedparser.parse(body)
     if feed.bozo and not feed.entries:
         logger.error(f"Failed to parse RSS feed for {brand.name}: {feed.bozo_exception}")
         return {"new_episodes": 0}
@@ -0,0 +1,127 @@
+"""
+Postgres full-text search for books.
+
+Each Book carries a precomputed ``search_vector`` (GIN-indexed) built from
+title (weight A), author (B), description (C) and topic names (D) with the
+``english_unaccent`` text search configuration — the english stemmer with
+the unaccent dictionary in front of it, so "Garcia Marquez" matches
+"García Márquez" on both the indexing and the query side.
+
+The vector is refreshed by Book.refresh_search_vector, which signals.py
+calls when a book's text fields or topics change and when a topic is
+renamed. Bulk writes that bypass signals must call it themselves.
+
+Fuzzy (typo-tolerant) search for /api/search/ uses pg_trgm word
+similarity against trigram GIN indexes on title and author instead.
+"""
+
+import re
+from contextlib import contextmanager
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Greatest
+
+SEARCH_CONFIG = "english_unaccent"
+
+# Fields whose change requires a new search vector
+BOOK_SEARCH_FIELDS = {"title", "author", "description"}
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# word_similarity cut-off for fuzzy matches. pg_trgm's default (0.6) misses
+# everyday misspellings: "tolkein" scores 0.5 against "J.R.R. Tolkien".
+FUZZY_THRESHOLD = 0.4
+FUZZY_MIN_LENGTH = 3
+
+
+def book_search_vector():
+    """Weighted search vector expression for use in Book.objects.update()."""
+    from .models import Topic
+
+    topic_names = (
+        Topic.objects.filter(book=OuterRef("pk"))
+        .order_by()
+        .values("book")
+        .annotate(names=StringAgg("name", delimiter=" "))
+        .values("names")
+    )
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("author", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+        + SearchVector(
+            Coalesce(Subquery(topic_names), Value(""), output_field=TextField()),
+            weight="D",
+            config=SEARCH_CONFIG,
+        )
+    )
+
+
+def prefix_query(term):
+    """
+    Build a tsquery matching every word of term, the last one as a prefix.
+
+    "lord of the ri" -> 'lord & of & the & ri:*', so results narrow as the
+    user types. Returns None when term has no searchable words.
+    """
+    words = _WORD_RE.findall(term)
+    if not words:
+        return None
+    words[-1] = f"{words[-1]}:*"
+    return SearchQuery(" & ".join(words), search_type="raw", config=SEARCH_CONFIG)
+
+
+def search_books(queryset, term):
+    """Filter books matching term, annotated with ``rank`` (best first)."""
+    query = prefix_query(term)
+    if query is None:
+        return queryset
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", F("latest_aired_at").desc(nulls_last=True), "-id")
+    )
+
+
+@contextmanager
+def fuzzy_threshold(threshold=FUZZY_THRESHOLD):
+    """
+    Run queries with a custom pg_trgm word similarity threshold.
+
+    The threshold is what the indexed ``%>`` operator compares against, so it
+    is set for the enclosing transaction only. Evaluate querysets from
+    fuzzy_search_books inside this block.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            [str(threshold)],
+        )
+        yield
+
+
+def fuzzy_search_books(queryset, term):
+    """
+    Filter books whose title or author fuzzily contains term.
+
+    Annotates ``title_similarity``, ``author_similarity`` and ``score`` (the
+    greater of the two) and orders best match first. Both conditions can
+    use the trigram GIN indexes on title and author.
+    """
+    return (
+        queryset.filter(Q(title__trigram_word_similar=term) | Q(author__trigram_word_similar=term))
+        .annotate(
+            title_similarity=TrigramWordSimilarity(term, "title"),
+            author_similarity=TrigramWordSimilarity(term, "author"),
+        )
+        .annotate(score=Greatest("title_similarity", "author_similarity"))
+        .order_by("-score", F("latest_aired_at").desc(nulls_last=True), "-id")
+    )
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .covers import cover_sources
 from .models import Station, Book, Episode, Brand, Topic
 
 
@@ -46,14 +47,55 @@ class TopicSerializer(serializers.ModelSerializer):
 class BookSerializer(serializers.ModelSerializer):
     episodes = EpisodeSerializer(many=True, read_only=True)
     cover_image = serializers.SerializerMethodField()
+    cover_sources = serializers.SerializerMethodField()
     topics = TopicSerializer(many=True, read_only=True)
 
     class Meta:
         model = Book
-        fields = ('id', 'title', 'slug', 'author', 'topics', 'description', 'cover_image', 'purchase_link', 'episodes')
+        fields = ('id', 'title', 'slug', 'author', 'topics', 'description', 'cover_image', 'cover_sources', 'purchase_link', 'episodes')
 
     def get_cover_image(self, obj):
         """Return cover image URL if available"""
         if obj.cover_image:
             return obj.cover_image.url
         return ""
+
+    def get_cover_sources(self, obj):
+        """Resized cover variants as <picture> sources (type + srcset)"""
+        return cover_sources(obj)
+
+
+class BookListSerializer(serializers.ModelSerializer):
+    """
+    Compact book for list pages (``?view=compact``).
+
+    Instead of every episode with its nested brand and station, carries the
+    latest episode's show and an episode count. Both come from queryset
+    annotations (see views.with_list_summary), so serializing a page costs
+    no extra queries.
+    """
+
+    cover_image = serializers.SerializerMethodField()
+    cover_sources = serializers.SerializerMethodField()
+    topics = TopicSerializer(many=True, read_only=True)
+    show = serializers.SerializerMethodField()
+    episode_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Book
+        fields = ('id', 'title', 'slug', 'author', 'topics', 'description', 'cover_image', 'cover_sources', 'purchase_link', 'latest_aired_at', 'show', 'episode_count')
+
+    def get_cover_image(self, obj):
+        if obj.cover_image:
+            return obj.cover_image.url
+        return ""
+
+    def get_cover_sources(self, obj):
+        return cover_sources(obj)
+
+    def get_show(self, obj):
+        # {slug, name, brand_color, station_name} from with_list_summary
+        show = obj.latest_show
+        if not show or not show['slug']:
+            return None
+        return show
@@ -1,8 +1,11 @@
 from django.dispatch import receiver
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.conf import settings
-from .models import Episode
+from .cache import invalidate_on_commit
+from .models import Book, Brand, Episode, Station, Topic, stats_snapshot
+from .search import BOOK_SEARCH_FIELDS
+from . import stats
 from .tasks import contains_keywords_task, ai_extract_books_task
 
 
@@ -18,12 +21,19 @@ def episode_post_save(sender, instance, created, **kwargs):
     - 'keyword': Legacy keyword matching (default)
     - 'ai': AI-powered extraction using Claude
     - 'both': Run both methods
+
+    With extraction batching on (EXTRACTION_BATCH_MIN_EPISODES), AI
+    extraction is left to the 30-minute sweep, which batches backlogs.
     """
     if not created:
         return
 
     if instance.stage == Episode.STAGE_SCRAPED:
         mode = getattr(settings, "BOOK_EXTRACTION_MODE", "keyword")
+        if mode in ("ai", "both") and settings.EXTRACTION_BATCH_MIN_EPISODES > 0:
+            if mode == "both":
+                transaction.on_commit(lambda: contains_keywords_task.delay(instance.pk))
+            return
 
         if mode == "keyword":
             transaction.on_commit(lambda: contains_keywords_task.delay(instance.pk))
@@ -36,3 +46,213 @@ def episode_post_save(sender, instance, created, **kwargs):
         else:
             # Default to keyword if invalid mode
             transaction.on_commit(lambda: contains_keywords_task.delay(instance.pk))
+
+
+# Fields that never reach the public API; saves touching only these
+# (pipeline bookkeeping) leave cached responses valid.
+_PRIVATE_FIELDS = {
+    Episode: {
+        "scraped_data", "stage", "processed_at", "last_error", "task_id",
+        "extraction_result", "ai_confidence", "status_changed_at",
+    },
+    Book: {"cover_fetch_error", "verification_checked_at", "unmatched_topics"},
+}
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=Episode)
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Topic)
+def invalidate_api_cache_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Bump the API cache generation when public data changes."""
+    if sender is Episode and created:
+        return  # new episodes have no books yet; linking them fires m2m_changed
+    private = _PRIVATE_FIELDS.get(sender, set())
+    if update_fields and set(update_fields) <= private:
+        return
+    invalidate_on_commit()
+
+
+@receiver(post_delete, sender=Station)
+@receiver(post_delete, sender=Brand)
+@receiver(post_delete, sender=Episode)
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Topic)
+@receiver(m2m_changed, sender=Book.episodes.through)
+@receiver(m2m_changed, sender=Book.topics.through)
+def invalidate_api_cache(sender, **kwargs):
+    """Bump the API cache generation on deletes and episode/topic links."""
+    action = kwargs.get("action")
+    if action and not action.startswith("post_"):
+        return
+    invalidate_on_commit()
+
+
+@receiver(post_save, sender=Book)
+def refresh_search_vector_on_save(sender, instance, update_fields=None, **kwargs):
+    """Rebuild a book's search vector when its searchable text changes."""
+    if update_fields and not set(update_fields) & BOOK_SEARCH_FIELDS:
+        return
+    Book.refresh_search_vector([instance.pk])
+
+
+@receiver(m2m_changed, sender=Book.topics.through)
+def refresh_search_vector_on_topics(sender, instance, action, reverse, pk_set, **kwargs):
+    """Topic names are part of the vector; refresh books whose topics changed."""
+    if not reverse:
+        if action.startswith("post_"):
+            Book.refresh_search_vector([instance.pk])
+        return
+    # instance is a Topic; on clear the links are gone by post_clear
+    if action == "pre_clear":
+        instance._search_book_ids = list(instance.book_set.values_list("pk", flat=True))
+    elif action == "post_clear":
+        Book.refresh_search_vector(getattr(instance, "_search_book_ids", []))
+    elif action in ("post_add", "post_remove"):
+        Book.refresh_search_vector(pk_set)
+
+
+@receiver(post_save, sender=Topic)
+def refresh_search_vector_on_topic_rename(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and "name" not in update_fields):
+        return
+    Book.refresh_search_vector(instance.book_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Topic)
+def remember_topic_books(sender, instance, **kwargs):
+    instance._search_book_ids = list(instance.book_set.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Topic)
+def refresh_search_vector_on_topic_delete(sender, instance, **kwargs):
+    Book.refresh_search_vector(getattr(instance, "_search_book_ids", []))
+
+
+# --- Materialized brand/topic stats (see stats.py) ---
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=Topic)
+def create_stats_row(sender, instance, created, **kwargs):
+    if not created:
+        return
+    if sender is Brand:
+        stats.refresh_brand_stats([instance.pk])
+    else:
+        stats.refresh_topic_stats([instance.pk])
+
+
+def _stats_fields_changed(instance, update_fields):
+    """
+    Whether a save changed instance.STATS_FIELDS. Saves with update_fields
+    that skip them stop here; otherwise compare against the snapshot that
+    from_db (or the previous save) took. Returns (changed, previous).
+    """
+    names = {name.removesuffix("_id") for name in instance.STATS_FIELDS}
+    if update_fields and not {name.removesuffix("_id") for name in update_fields} & names:
+        return False, None
+    previous = getattr(instance, "_stats_snapshot", None)
+    instance._stats_snapshot = stats_snapshot(instance)
+    return previous != instance._stats_snapshot, previous
+
+
+@receiver(post_save, sender=Book)
+def refresh_stats_on_book_save(sender, instance, created, update_fields=None, **kwargs):
+    """Verification status decides whether a book counts."""
+    if created:
+        instance._stats_snapshot = stats_snapshot(instance)
+        return  # new books have no episodes or topics yet
+    changed, _ = _stats_fields_changed(instance, update_fields)
+    if changed:
+        stats.refresh_for_books([instance.pk])
+
+
+@receiver(post_save, sender=Episode)
+def refresh_stats_on_episode_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        # No books yet: bump the brand's episode count and aired range in
+        # place rather than recomputing its row on every scraped episode
+        instance._stats_snapshot = stats_snapshot(instance)
+        stats.count_new_episode(instance)
+        return
+    changed, previous = _stats_fields_changed(instance, update_fields)
+    if not changed:
+        return
+    previous_brand = previous[0] if previous else None
+    stats.refresh_brand_stats({previous_brand, instance.brand_id} - {None})
+    stats.refresh_topic_stats(
+        Topic.objects.filter(book__episodes=instance).values_list("pk", flat=True).distinct()
+    )
+
+
+@receiver(pre_delete, sender=Book)
+@receiver(pre_delete, sender=Episode)
+def remember_stats_links(sender, instance, **kwargs):
+    """Links are cascade-deleted without m2m_changed; note what they touched."""
+    if sender is Book:
+        brand_ids = Episode.objects.filter(books=instance).values_list("brand_id", flat=True)
+        topic_ids = instance.topics.values_list("pk", flat=True)
+    else:
+        brand_ids = [instance.brand_id]
+        topic_ids = Topic.objects.filter(book__episodes=instance).values_list("pk", flat=True)
+    instance._stats_links = (set(brand_ids), set(topic_ids))
+
+
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Episode)
+def refresh_stats_on_delete(sender, instance, **kwargs):
+    brand_ids, topic_ids = getattr(instance, "_stats_links", (set(), set()))
+    stats.refresh_brand_stats(brand_ids)
+    stats.refresh_topic_stats(topic_ids)
+
+
+@receiver(m2m_changed, sender=Book.episodes.through)
+def refresh_stats_on_episode_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance is an Episode, pk_set are book ids
+        if action == "pre_clear":
+            instance._stats_book_ids = list(instance.books.values_list("pk", flat=True))
+            return
+        if action == "post_clear":
+            pk_set = getattr(instance, "_stats_book_ids", [])
+        elif action not in ("post_add", "post_remove"):
+            return
+        stats.refresh_brand_stats([instance.brand_id])
+        stats.refresh_topic_stats(
+            Topic.objects.filter(book__in=pk_set).values_list("pk", flat=True).distinct()
+        )
+        return
+
+    # instance is a Book, pk_set are episode ids; unverified books don't count
+    if instance.verification_status != Book.VERIFICATION_VERIFIED:
+        return
+    if action == "pre_clear":
+        instance._stats_episode_ids = list(instance.episodes.values_list("pk", flat=True))
+        return
+    if action == "post_clear":
+        pk_set = getattr(instance, "_stats_episode_ids", [])
+    elif action not in ("post_add", "post_remove"):
+        return
+    stats.refresh_brand_stats(
+        Episode.objects.filter(pk__in=pk_set).values_list("brand_id", flat=True).distinct()
+    )
+    stats.refresh_topic_stats(instance.topics.values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=Book.topics.through)
+def refresh_stats_on_topic_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance is a Topic; only its own row changes
+        if action.startswith("post_"):
+            stats.refresh_topic_stats([instance.pk])
+        return
+    if instance.verification_status != Book.VERIFICATION_VERIFIED:
+        return
+    if action == "pre_clear":
+        instance._stats_topic_ids = list(instance.topics.values_list("pk", flat=True))
+    elif action == "post_clear":
+        stats.refresh_topic_stats(getattr(instance, "_stats_topic_ids", []))
+    elif action in ("post_add", "post_remove"):
+        stats.refresh_topic_stats(pk_set)
@@ -0,0 +1,121 @@
+"""
+Materialized brand/topic statistics (BrandStats, TopicStats).
+
+Verified-book counts and aired ranges used to be COUNT(DISTINCT ...) joins
+over episodes and books on every topics/brands request and admin page.
+They now live in two small tables that readers join to directly.
+
+Rows are refreshed incrementally: signals.py works out which brands and
+topics a write touches and calls refresh_brand_stats / refresh_topic_stats
+with just those ids. Each refresh recomputes the affected rows from
+scratch and upserts them, so refreshing too much is harmless — only
+missing a refresh leaves stale numbers. `manage.py refresh_stats`
+rebuilds everything.
+"""
+
+from django.db.models import Count, F, Max, Min, Q, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .models import Book, Brand, BrandStats, Episode, Topic, TopicStats
+
+_VERIFIED = Book.VERIFICATION_VERIFIED
+
+
+def refresh_brand_stats(brand_ids=None):
+    """Recompute BrandStats for brand_ids (None = every brand). Returns rows written."""
+    brands = Brand.objects.all()
+    if brand_ids is not None:
+        brand_ids = set(brand_ids)
+        if not brand_ids:
+            return 0
+        brands = brands.filter(pk__in=brand_ids)
+    rows = brands.values("pk").annotate(
+        verified_books=Count(
+            "episode__books",
+            filter=Q(episode__books__verification_status=_VERIFIED),
+            distinct=True,
+        ),
+        episodes=Count("episode", distinct=True),
+        first_aired=Min("episode__aired_at"),
+        last_aired=Max("episode__aired_at"),
+    )
+    stats = [
+        BrandStats(
+            brand_id=row["pk"],
+            book_count=row["verified_books"],
+            episode_count=row["episodes"],
+            first_aired_at=row["first_aired"],
+            last_aired_at=row["last_aired"],
+        )
+        for row in rows
+    ]
+    BrandStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=["brand"],
+        update_fields=["book_count", "episode_count", "first_aired_at", "last_aired_at", "updated_at"],
+    )
+    return len(stats)
+
+
+def refresh_topic_stats(topic_ids=None):
+    """Recompute TopicStats for topic_ids (None = every topic). Returns rows written."""
+    topics = Topic.objects.all()
+    if topic_ids is not None:
+        topic_ids = set(topic_ids)
+        if not topic_ids:
+            return 0
+        topics = topics.filter(pk__in=topic_ids)
+    verified = Q(book__verification_status=_VERIFIED)
+    rows = topics.values("pk").annotate(
+        verified_books=Count("book", filter=verified, distinct=True),
+        first_aired=Min("book__episodes__aired_at", filter=verified),
+        last_aired=Max("book__episodes__aired_at", filter=verified),
+    )
+    stats = [
+        TopicStats(
+            topic_id=row["pk"],
+            book_count=row["verified_books"],
+            first_aired_at=row["first_aired"],
+            last_aired_at=row["last_aired"],
+        )
+        for row in rows
+    ]
+    TopicStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=["topic"],
+        update_fields=["book_count", "first_aired_at", "last_aired_at", "updated_at"],
+    )
+    return len(stats)
+
+
+def count_new_episode(episode):
+    """
+    Add a just-created episode to its brand's row with one UPDATE instead
+    of a full recompute. It has no books yet, so only the episode count
+    and aired range move.
+    """
+    if episode.brand_id is None:
+        return
+    changes = {"episode_count": F("episode_count") + 1, "updated_at": timezone.now()}
+    if episode.aired_at is not None:
+        aired = Value(episode.aired_at)
+        changes["first_aired_at"] = Least(Coalesce("first_aired_at", aired), aired)
+        changes["last_aired_at"] = Greatest(Coalesce("last_aired_at", aired), aired)
+    if not BrandStats.objects.filter(brand_id=episode.brand_id).update(**changes):
+        refresh_brand_stats([episode.brand_id])
+
+
+def refresh_for_books(book_ids):
+    """Refresh stats for every brand and topic the given books belong to."""
+    book_ids = list(book_ids)
+    if not book_ids:
+        return
+    refresh_brand_stats(
+        Episode.objects.filter(books__in=book_ids).values_list("brand_id", flat=True).distinct()
+    )
+    refresh_topic_stats(
+        Topic.objects.filter(book__in=book_ids).values_list("pk", flat=True).distinct()
+    )
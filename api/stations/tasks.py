@@ -1,33 +1,15 @@
 from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.core.management import call_command
-from django.db import DatabaseError
+from django.db import DatabaseError, connection, transaction
 from django.utils import timezone
 from datetime import datetime
 from .utils import contains_keywords
 from .ai_utils import extract_books_from_episode, get_book_extractor
-from .models import Brand, Episode, Book
+from .models import Brand, Episode, Book, BookLookup
 
 logger = get_task_logger(__name__)
 
-_STOP_WORDS = {"the", "a", "an", "and", "of", "in", "on", "for", "to", "is", "at", "by"}
-
-
-def _titles_match(ai_title, gb_title):
-    """Check if two titles refer to the same book using word overlap."""
-    def significant_words(t):
-        # Strip punctuation, split, keep meaningful words
-        import re
-        words = re.findall(r"[a-z0-9]+", t.lower())
-        return set(w for w in words if w not in _STOP_WORDS and len(w) > 1)
-    ai_words = significant_words(ai_title)
-    gb_words = significant_words(gb_title)
-    if not ai_words or not gb_words:
-        return False
-    overlap = ai_words & gb_words
-    smaller = min(len(ai_words), len(gb_words))
-    return len(overlap) >= max(1, smaller * 0.5)
-
 
 @shared_task(
     name="stations.tasks.contains_keywords_task",
@@ -52,9 +34,10 @@ def contains_keywords_task(self, episode_id):
     bind=True,
     max_retries=0,
 )
-def ai_extract_books_task(self, episode_id):
+def ai_extract_books_task(self, episode_id, refresh=False):
     """
-    AI-powered book extraction task using Claude.
+    AI-powered book extraction task using Claude. refresh=True bypasses
+    the extraction memo (see ExtractionMemo).
 
     No auto-retry — failed episodes are caught by the 30-minute
     extraction task which unsticks and re-queues them. This prevents
@@ -82,7 +65,7 @@ def ai_extract_books_task(self, episode_id):
         episode.status_changed_at = timezone.now()
         episode.save(update_fields=["stage", "task_id", "last_error", "status_changed_at"])
 
-        result = extract_books_from_episode(episode_id)
+        result = extract_books_from_episode(episode_id, refresh=refresh)
         logger.info(
             f"AI extraction complete for episode {episode_id}: "
             f"has_book={result['has_book']}, books={len(result.get('books', []))}"
@@ -93,6 +76,43 @@ def ai_extract_books_task(self, episode_id):
         raise
 
 
+@shared_task(
+    name="stations.tasks.ai_extract_books_multi_task",
+    bind=True,
+    max_retries=0,
+)
+def ai_extract_books_multi_task(self, episode_ids, refresh=False):
+    """
+    Extract books from several episodes with one multi-episode prompt
+    (see EXTRACTION_EPISODES_PER_PROMPT). Episodes the reply misses fall
+    back to one call each. No auto-retry, as for ai_extract_books_task.
+    """
+    from .ai_utils import extract_books_from_episodes
+
+    episodes = Episode.objects.filter(
+        pk__in=episode_ids,
+        stage__in=[Episode.STAGE_SCRAPED, Episode.STAGE_EXTRACTION_QUEUED],
+    )
+    ids = list(episodes.values_list("pk", flat=True))
+    if not ids:
+        return {"skipped": True, "episodes": 0}
+    episodes.update(
+        stage=Episode.STAGE_EXTRACTING,
+        task_id=self.request.id,
+        last_error=None,
+        status_changed_at=timezone.now(),
+    )
+
+    results = extract_books_from_episodes(ids, refresh=refresh)
+    with_books = sum(1 for r in results.values() if r.get("has_book"))
+    errors = sum(1 for r in results.values() if "error" in r)
+    logger.info(
+        f"Multi-episode extraction complete for {len(ids)} episodes: "
+        f"{with_books} with books, {errors} errors"
+    )
+    return {"episodes": len(ids), "with_books": with_books, "errors": errors}
+
+
 @shared_task(name="stations.tasks.scrape_brand")
 def scrape_brand(brand_id, max_episodes=50):
     """Scrape recent episodes for a single brand."""
@@ -212,9 +232,18 @@ def backfill_brand_task(brand_id, max_episodes=100, since_date=None, extract=Fal
     logger.info(f"Backfill complete for {brand.name}: {new_episodes} new episodes")
 
     if extract and new_episodes > 0:
-        logger.info(
-            f"AI extraction will run for {new_episodes} episodes via post_save signal"
-        )
+        from django.conf import settings as django_settings
+        from .extraction_batches import batching_enabled, submit_extraction_batch
+
+        if batching_enabled():
+            waiting = Episode.objects.filter(brand=brand, stage=Episode.STAGE_SCRAPED).order_by("id")
+            batch = submit_extraction_batch(waiting[:django_settings.EXTRACTION_BATCH_MAX_EPISODES])
+            if batch:
+                logger.info(f"Submitted {batch.episode_count} episodes as extraction batch {batch.batch_id}")
+        else:
+            logger.info(
+                f"AI extraction will run for {new_episodes} episodes via post_save signal"
+            )
 
     return {
         "status": "complete",
@@ -280,8 +309,22 @@ def extract_books_from_new_episodes():
         )
         logger.warning(f"Reset {stuck_count} stuck episode(s) back to SCRAPED")
 
+    # A large enough backlog goes out as one Message Batch (see extraction_batches.py)
+    from django.conf import settings
+    from .extraction_batches import batching_enabled, submit_extraction_batch
+
+    waiting = Episode.objects.filter(stage=Episode.STAGE_SCRAPED)
+    if batching_enabled() and waiting.count() >= settings.EXTRACTION_BATCH_MIN_EPISODES:
+        batch = submit_extraction_batch(waiting.order_by("id")[:settings.EXTRACTION_BATCH_MAX_EPISODES])
+        if batch:
+            return {
+                "status": "batched",
+                "batch_id": batch.batch_id,
+                "episodes_processed": batch.episode_count,
+            }
+
     # Find episodes with stage=SCRAPED (not yet processed)
-    episodes = Episode.objects.filter(stage=Episode.STAGE_SCRAPED)[:50]
+    episodes = waiting[:50]
 
     if not episodes.exists():
         logger.info("No new episodes to process")
@@ -289,6 +332,19 @@ def extract_books_from_new_episodes():
 
     processed = 0
 
+    per_prompt = settings.EXTRACTION_EPISODES_PER_PROMPT
+    if per_prompt > 1:
+        ids = list(episodes.values_list("id", flat=True))
+        Episode.objects.filter(pk__in=ids).update(
+            stage=Episode.STAGE_EXTRACTION_QUEUED,
+            last_error=None,
+            status_changed_at=timezone.now(),
+        )
+        for start in range(0, len(ids), per_prompt):
+            ai_extract_books_multi_task.delay(ids[start:start + per_prompt])
+        logger.info(f"Triggered multi-episode AI extraction for {len(ids)} episodes")
+        return {"status": "complete", "episodes_processed": len(ids)}
+
     for episode in episodes:
         logger.info(f"Queuing episode: {episode.title} (ID: {episode.id})")
         try:
@@ -305,65 +361,68 @@ def extract_books_from_new_episodes():
     return {"status": "complete", "episodes_processed": processed}
 
 
-@shared_task(name="stations.tasks.verify_pending_books")
-def verify_pending_books(batch_size=20):
+@shared_task(name="stations.tasks.poll_extraction_batches")
+def poll_extraction_batches():
+    """Apply the results of extraction batches that have ended. Runs every 5 minutes."""
+    from .extraction_batches import poll_extraction_batches as poll
+
+    return poll()
+
+
+def _update_episode_stages(book):
+    """Recompute stage on a book's episodes once its verification settles."""
+    for episode in book.episodes.all():
+        new_stage = episode.compute_stage_after_verification()
+        if new_stage != episode.stage:
+            episode.stage = new_stage
+            episode.save(update_fields=["stage"])
+
+
+def _lock_book_identity(title, author):
     """
-    Verify pending books against Google Books API.
+    Take a transaction-scoped Postgres advisory lock on a normalized
+    title/author, so concurrent verify_book_tasks resolving to the same
+    book can't both miss the existing-verified-book check.
+    """
+    if connection.vendor != "postgresql":
+        return
+    lock_id = int(BookLookup.make_key(title, author)[:15], 16)  # fits a signed bigint
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [lock_id])
 
-    Runs hourly. For each pending book:
-    - Found → update canonical title/author, download cover, set verified
-    - Not found → set not_found + timestamp
-    - Rate limited → stop immediately
-    Also cleans up not_found books older than 7 days.
+
+def _verify_book(book):
     """
-    from datetime import timedelta
-    from django.db.models import Q
-    from .utils import verify_book_exists, GoogleBooksRateLimited, generate_bookshop_affiliate_url
-    from .ai_utils import download_and_save_cover
+    Verify one pending book against Google Books.
 
-    pending = Book.objects.filter(
-        verification_status=Book.VERIFICATION_PENDING
-    )[:batch_size]
+    Returns (outcome, requests): outcome is "verified", "merged" (folded
+    into an existing verified book), "not_found" or "error" (API error, left
+    pending for the next run); requests is how many Google Books requests
+    the lookup made (0 when cached). Raises ProviderUnavailable while
+    every metadata provider is in cooldown.
+    """
+    from .utils import lookup_book, generate_bookshop_affiliate_url, gb_result_matches
 
-    verified_count = 0
-    not_found_count = 0
+    book_info = lookup_book(book)
+    requests = book_info.get("requests", 0)
 
-    for book in pending:
-        try:
-            book_info = verify_book_exists(book.title, book.author)
-        except GoogleBooksRateLimited:
-            logger.warning("Google Books rate limited during verification, stopping batch")
-            break
+    if book_info["exists"]:
+        canonical_title = book_info.get("title") or book.title
+        canonical_author = book_info.get("author") or book.author
 
-        if book_info["exists"]:
-            canonical_title = book_info.get("title") or book.title
-            canonical_author = book_info.get("author") or book.author
-
-            # Sanity check: Google Books result must resemble what we searched for.
-            # Title uses word-overlap matching; author checks last name against
-            # the authors field, description, and search snippet (Google Books
-            # sometimes lists publishers instead of human authors).
-            title_ok = _titles_match(book.title, canonical_title)
-            ai_author_words = [w for w in book.author.lower().split() if w not in ("and", "by", "&") and len(w) > 2]
-            gb_text = " ".join([
-                canonical_author.lower(),
-                (book_info.get("description") or "").lower(),
-                (book_info.get("search_snippet") or "").lower(),
-            ])
-            author_ok = (
-                not book.author
-                or any(w in gb_text for w in ai_author_words)
+        # Sanity check: Google Books result must resemble what we searched for.
+        if not gb_result_matches(book.title, book.author, book_info):
+            logger.warning(
+                f"Google Books mismatch for '{book.title}' by {book.author}: "
+                f"got '{canonical_title}' by {canonical_author} — marking not_found"
             )
-            if not (title_ok and author_ok):
-                logger.warning(
-                    f"Google Books mismatch for '{book.title}' by {book.author}: "
-                    f"got '{canonical_title}' by {canonical_author} — marking not_found"
-                )
-                book.verification_status = Book.VERIFICATION_NOT_FOUND
-                book.verification_checked_at = timezone.now()
-                book.save(update_fields=["verification_status", "verification_checked_at"])
-                not_found_count += 1
-                continue
+            book.verification_status = Book.VERIFICATION_NOT_FOUND
+            book.verification_checked_at = timezone.now()
+            book.save(update_fields=["verification_status", "verification_checked_at"])
+            return "not_found", requests
+
+        with transaction.atomic():
+            _lock_book_identity(canonical_title, canonical_author)
 
             # Check if a verified book with the canonical title/author already exists
             existing = Book.objects.filter(
@@ -376,12 +435,16 @@ def verify_pending_books(batch_size=20):
                 # Merge: move episodes to existing book, delete this one
                 for episode in book.episodes.all():
                     existing.episodes.add(episode)
+                Book.refresh_latest_aired([existing.pk])
+                if not existing.google_volume_id:
+                    changed = existing.set_google_identifiers(book_info)
+                    if changed:
+                        existing.save(update_fields=changed)
                 logger.info(
                     f"Merged duplicate '{book.title}' into verified '{existing.title}'"
                 )
                 book.delete()
-                verified_count += 1
-                continue
+                return "merged", requests
 
             # Keep AI-extracted title/author — Google Books often returns
             # subtitles, edition names, or study guides that are less clean.
@@ -389,51 +452,223 @@ def verify_pending_books(batch_size=20):
             book.verification_checked_at = timezone.now()
             book.save(update_fields=[
                 "verification_status", "verification_checked_at",
+                *book.set_google_identifiers(book_info),
             ])
 
-            # Download cover
-            cover_url = book_info.get("cover_url") or ""
-            if cover_url:
-                download_and_save_cover(book, cover_url)
-            else:
+        # Cover download runs on the covers queue, off the verification path
+        cover_url = book_info.get("cover_url") or ""
+        if cover_url:
+            fetch_cover_task.delay(book.pk, cover_url)
+        else:
+            book.cover_fetch_error = "No cover available on Google Books"
+            book.save(update_fields=["cover_fetch_error"])
+
+        # Update purchase link with canonical info
+        purchase_url = generate_bookshop_affiliate_url(book.title, book.author)
+        if purchase_url:
+            book.purchase_link = purchase_url
+            book.save(update_fields=["purchase_link"])
+
+        _update_episode_stages(book)
+        logger.info(f"Verified: '{book.title}' by {book.author}")
+        return "verified", requests
+
+    if not book_info.get("error"):
+        # Genuinely not found (not an API error)
+        book.verification_status = Book.VERIFICATION_NOT_FOUND
+        book.verification_checked_at = timezone.now()
+        book.save(update_fields=["verification_status", "verification_checked_at"])
+        logger.info(f"Not found on Google Books: '{book.title}' by {book.author}")
+        _update_episode_stages(book)
+        return "not_found", requests
+
+    # API error (timeout etc.) — skip, will retry next hour
+    logger.warning(
+        f"Skipping '{book.title}': API error {book_info['error']}"
+    )
+    return "error", requests
+
+
+@shared_task(name="stations.tasks.fetch_cover_task", bind=True, max_retries=5)
+def fetch_cover_task(self, book_id, cover_url="", refresh=False, allow_fallback=False, overwrite=True):
+    """
+    Download one book's cover. Routed to the "covers" queue (CELERY_TASK_ROUTES)
+    so image I/O never holds up verification or an admin request.
+
+    Without cover_url the book is looked up first (lookup_book); while every
+    metadata provider is in cooldown the task is retried once one is back. Returns
+    "downloaded", "failed", "no_cover", "skipped" (book gone, or already has
+    a cover and overwrite is False), "locked" or "rate_limited".
+    """
+    from django.core.cache import cache
+    from .ai_utils import download_and_save_cover
+    from . import providers
+    from .utils import lookup_book
+
+    lock_key = f"fetch-cover:{book_id}"
+    if not cache.add(lock_key, 1, timeout=300):
+        return "locked"
+    try:
+        book = Book.objects.filter(pk=book_id).first()
+        if book is None or (book.cover_image and not overwrite):
+            return "skipped"
+
+        if not cover_url:
+            try:
+                cover_url = lookup_book(book, refresh=refresh).get("cover_url") or ""
+            except providers.ProviderUnavailable:
+                if self.request.retries >= self.max_retries:
+                    return "rate_limited"
+                countdown = max(providers.cooldown_remaining(), 60)
+                logger.warning(f"Metadata providers rate limited, retrying cover {book_id} in {countdown}s")
+                raise self.retry(countdown=countdown)
+            if not cover_url:
                 book.cover_fetch_error = "No cover available on Google Books"
                 book.save(update_fields=["cover_fetch_error"])
+                return "no_cover"
 
-            # Update purchase link with canonical info
-            purchase_url = generate_bookshop_affiliate_url(book.title, book.author)
-            if purchase_url:
-                book.purchase_link = purchase_url
-                book.save(update_fields=["purchase_link"])
+        if download_and_save_cover(book, cover_url, allow_fallback=allow_fallback):
+            return "downloaded"
+        return "failed"
+    finally:
+        cache.delete(lock_key)
 
-            # Update stage on linked episodes
-            for episode in book.episodes.all():
-                new_stage = episode.compute_stage_after_verification()
-                if new_stage != episode.stage:
-                    episode.stage = new_stage
-                    episode.save(update_fields=["stage"])
 
-            verified_count += 1
-            logger.info(f"Verified: '{book.title}' by {book.author}")
+def queue_cover_fetches(book_ids, refresh=False, overwrite=True):
+    """
+    Fan out fetch_cover_task over book_ids as one Celery group.
 
-        elif not book_info.get("error"):
-            # Genuinely not found (not an API error)
-            book.verification_status = Book.VERIFICATION_NOT_FOUND
-            book.verification_checked_at = timezone.now()
-            book.save(update_fields=["verification_status", "verification_checked_at"])
-            not_found_count += 1
-            logger.info(f"Not found on Google Books: '{book.title}' by {book.author}")
-
-            # Update stage on linked episodes
-            for episode in book.episodes.all():
-                new_stage = episode.compute_stage_after_verification()
-                if new_stage != episode.stage:
-                    episode.stage = new_stage
-                    episode.save(update_fields=["stage"])
+    Concurrency is bounded by the covers worker's pool size and Google
+    Books pacing by the shared limiter. The GroupResult is saved to the
+    result backend so progress can be read later (cover_batch_progress).
+    """
+    from celery import group
+
+    result = group(
+        fetch_cover_task.s(book_id, refresh=refresh, allow_fallback=True, overwrite=overwrite)
+        for book_id in book_ids
+    ).apply_async()
+    result.save()
+    return result
+
+
+def cover_batch_progress(result):
+    """Counts for a queue_cover_fetches GroupResult: total, done and each outcome."""
+    from collections import Counter
+
+    outcomes = Counter(
+        r.result if r.successful() else "error" for r in result.results if r.ready()
+    )
+    return {"total": len(result.results), "done": sum(outcomes.values()), **outcomes}
+
+
+@shared_task(name="stations.tasks.verify_book_task")
+def verify_book_task(book_id):
+    """
+    Verify a single pending book.
+
+    Queued once per book by verify_pending_books(fan_out=True) on the
+    verification queue (see CELERY_TASK_ROUTES), so a backlog is spread
+    over that worker's pool; the shared Google Books limiter in
+    ratelimit.py keeps them within quota together.
+    """
+    from django.core.cache import cache
+    from .providers import ProviderUnavailable
+
+    # An hourly run can re-queue a book whose task hasn't finished yet
+    lock_key = f"verify-book:{book_id}"
+    if not cache.add(lock_key, 1, timeout=600):
+        return "locked"
+    # Picked up: the next hourly run may queue it again if it stays pending
+    cache.delete(_verify_queued_key(book_id))
+    try:
+        book = Book.objects.filter(
+            pk=book_id, verification_status=Book.VERIFICATION_PENDING
+        ).first()
+        if book is None:
+            return "skipped"
+        try:
+            outcome, requests = _verify_book(book)
+        except ProviderUnavailable:
+            logger.warning(f"Metadata providers rate limited, leaving book {book_id} pending")
+            return "rate_limited"
+        logger.info(f"Book {book_id}: {outcome} ({requests} Google Books request(s))")
+        return outcome
+    finally:
+        cache.delete(lock_key)
+
+
+def _verify_queued_key(book_id):
+    return f"verify-queued:{book_id}"
+
+
+def _queue_verifications(batch_size):
+    """
+    Queue verify_book_task for up to batch_size pending books that aren't
+    already waiting on the verification queue. Returns the ids queued.
+    """
+    from django.conf import settings
+    from django.core.cache import cache
+
+    queued = []
+    pending_ids = Book.objects.filter(
+        verification_status=Book.VERIFICATION_PENDING
+    ).order_by("pk").values_list("pk", flat=True)
+    for book_id in pending_ids.iterator():
+        if len(queued) >= batch_size:
+            break
+        # Still queued from an earlier run during a backlog: don't add a duplicate
+        if not cache.add(_verify_queued_key(book_id), 1, timeout=settings.VERIFY_QUEUED_TTL):
+            continue
+        verify_book_task.delay(book_id)
+        queued.append(book_id)
+    return queued
+
+
+@shared_task(name="stations.tasks.verify_pending_books")
+def verify_pending_books(batch_size=20, fan_out=False):
+    """
+    Verify pending books against Google Books API.
+
+    Runs hourly. For each pending book:
+    - Found → update canonical title/author, set verified, queue cover download
+    - Not found → set not_found + timestamp
+    - Every provider rate limited → stop immediately
+    Also cleans up not_found books older than 21 days.
+
+    fan_out=True queues one verify_book_task per pending book instead of
+    checking them here one at a time, so all workers share the batch.
+    Books still waiting from an earlier run are skipped, so a backlog
+    doesn't fill the verification queue with duplicates.
+    """
+    from datetime import timedelta
+    from . import providers
+
+    pending = Book.objects.filter(
+        verification_status=Book.VERIFICATION_PENDING
+    )[:batch_size]
+
+    if fan_out:
+        remaining = providers.cooldown_remaining()
+        if remaining:
+            logger.warning(f"All metadata providers in cooldown ({remaining}s remaining), not queueing")
+            book_ids = []
         else:
-            # API error (timeout etc.) — skip, will retry next hour
-            logger.warning(
-                f"Skipping '{book.title}': API error {book_info['error']}"
-            )
+            book_ids = _queue_verifications(batch_size)
+        counts = {"queued": len(book_ids)}
+    else:
+        counts = {"verified": 0, "not_found": 0, "gb_requests": 0}
+        for book in pending:
+            try:
+                outcome, requests = _verify_book(book)
+            except providers.ProviderUnavailable:
+                logger.warning("Metadata providers rate limited during verification, stopping batch")
+                break
+            counts["gb_requests"] += requests
+            if outcome in ("verified", "merged"):
+                counts["verified"] += 1
+            elif outcome == "not_found":
+                counts["not_found"] += 1
 
     # Cleanup: delete not_found books older than 21 days
     cutoff = timezone.now() - timedelta(days=21)
@@ -450,12 +685,9 @@ def verify_pending_books(batch_size=20):
         deleted_count += 1
         logger.info(f"Deleted stale not_found book: '{book_title}'")
 
-    logger.info(
-        f"Verification complete: {verified_count} verified, "
-        f"{not_found_count} not found, {deleted_count} stale deleted"
-    )
-    return {
-        "verified": verified_count,
-        "not_found": not_found_count,
-        "stale_deleted": deleted_count,
-    }
+    counts["stale_deleted"] = deleted_count
+
+    # Expired Google Books lookups would be overwritten on next use anyway
+    BookLookup.objects.filter(expires_at__lt=timezone.now()).delete()
+    logger.info(f"Verification complete: {counts}")
+    return counts
@@ -3,6 +3,19 @@ import pytest
 from stations.models import Station, Brand, Episode, Phrase, Book
 
 
+@pytest.fixture(autouse=True)
+def metadata_providers(settings, monkeypatch):
+    """Google Books only (never a live Open Library fallback), with fresh limiter state."""
+    from stations import ratelimit
+    settings.METADATA_PROVIDERS = ['google_books']
+    monkeypatch.setattr(ratelimit, '_google_books', None)
+    monkeypatch.setattr(ratelimit, '_open_library', None)
+    yield
+    for limiter in (ratelimit._google_books, ratelimit._open_library):
+        if limiter is not None:
+            limiter.reset()  # shared cooldowns, when Redis is reachable
+
+
 @pytest.fixture
 def station():
     """Create a test station."""
@@ -0,0 +1,112 @@
+"""
+factory_boy factories for stations models, plus a bulk catalog seeder.
+
+The factories cover one-off objects in tests. seed_catalog builds a
+realistic catalog (tens of brands, thousands of books, books linked to
+several episodes and topics) with bulk_create, for query-budget and
+benchmark tests.
+"""
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import factory
+from factory.django import DjangoModelFactory
+
+from stations.models import Book, Brand, Episode, Station, Topic
+from stations.stats import refresh_brand_stats, refresh_topic_stats
+
+
+class StationFactory(DjangoModelFactory):
+    class Meta:
+        model = Station
+
+    name = factory.Sequence(lambda n: f'Station {n}')
+    station_id = factory.Sequence(lambda n: f'station_{n}')
+    url = factory.Sequence(lambda n: f'https://example.com/station/{n}')
+
+
+class BrandFactory(DjangoModelFactory):
+    class Meta:
+        model = Brand
+
+    station = factory.SubFactory(StationFactory)
+    name = factory.Sequence(lambda n: f'Show {n}')
+    slug = factory.Sequence(lambda n: f'show-{n}')
+    url = factory.Sequence(lambda n: f'https://example.com/show/{n}')
+    brand_color = '#336699'
+
+
+class EpisodeFactory(DjangoModelFactory):
+    class Meta:
+        model = Episode
+
+    brand = factory.SubFactory(BrandFactory)
+    title = factory.Sequence(lambda n: f'Episode {n}')
+    slug = factory.Sequence(lambda n: f'episode-{n}')
+    url = factory.Sequence(lambda n: f'https://example.com/episode/{n}')
+    aired_at = factory.Sequence(
+        lambda n: datetime(2024, 1, 1, tzinfo=dt_timezone.utc) + timedelta(hours=n)
+    )
+
+
+class TopicFactory(DjangoModelFactory):
+    class Meta:
+        model = Topic
+
+    name = factory.Sequence(lambda n: f'Seed Topic {n}')
+    slug = factory.Sequence(lambda n: f'seed-topic-{n}')
+
+
+class BookFactory(DjangoModelFactory):
+    class Meta:
+        model = Book
+
+    title = factory.Sequence(lambda n: f'Book {n}')
+    slug = factory.Sequence(lambda n: f'book-{n}')
+    author = factory.Sequence(lambda n: f'Author {n % 500}')
+    description = 'A book discussed on the radio.'
+    verification_status = Book.VERIFICATION_VERIFIED
+
+
+def seed_catalog(brands=20, books=2000, episodes_per_brand=60, topics=12,
+                 max_episodes_per_book=3, max_topics_per_book=3, seed=0):
+    """
+    Bulk-create a catalog and return a dict of the created objects.
+
+    Each book is linked to 1..max_episodes_per_book episodes (possibly on
+    different brands) and 0..max_topics_per_book topics, so list endpoints
+    see the same M2M fan-out as production.
+    """
+    rng = random.Random(seed)
+    station = StationFactory()
+    brand_objs = Brand.objects.bulk_create(BrandFactory.build_batch(brands, station=station))
+    episode_objs = Episode.objects.bulk_create([
+        episode
+        for brand in brand_objs
+        for episode in EpisodeFactory.build_batch(episodes_per_brand, brand=brand)
+    ])
+    topic_objs = Topic.objects.bulk_create(TopicFactory.build_batch(topics))
+    book_objs = Book.objects.bulk_create(BookFactory.build_batch(books))
+
+    book_episodes = []
+    book_topics = []
+    for book in book_objs:
+        for episode in rng.sample(episode_objs, rng.randint(1, max_episodes_per_book)):
+            book_episodes.append(Book.episodes.through(book_id=book.pk, episode_id=episode.pk))
+        for topic in rng.sample(topic_objs, rng.randint(0, max_topics_per_book)):
+            book_topics.append(Book.topics.through(book_id=book.pk, topic_id=topic.pk))
+    Book.episodes.through.objects.bulk_create(book_episodes, batch_size=5000)
+    Book.topics.through.objects.bulk_create(book_topics, batch_size=5000)
+    # bulk_create skips the signals that maintain these
+    Book.refresh_latest_aired()
+    Book.refresh_search_vector()
+    refresh_brand_stats()
+    refresh_topic_stats()
+
+    return {
+        'station': station,
+        'brands': brand_objs,
+        'episodes': episode_objs,
+        'topics': topic_objs,
+        'books': book_objs,
+    }
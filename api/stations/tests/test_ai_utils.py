@@ -45,6 +45,20 @@ class TestBookExtractor:
         extractor = BookExtractor()
         assert extractor.is_available() is False
 
+    def test_request_params_keep_instructions_static(self):
+        """Instructions go in the system block; only the episode text varies."""
+        extractor = BookExtractor(api_key="test-key")
+        first = extractor.request_params("Episode about 1984 by George Orwell")
+        second = extractor.request_params("Episode about classical music")
+
+        assert first["system"] == second["system"]
+        # Below Sonnet's minimum cacheable prefix, so no marker that can't fire
+        assert "cache_control" not in first["system"][-1]
+        assert "George Orwell" not in first["system"][0]["text"]
+        assert first["messages"] == [
+            {"role": "user", "content": 'Episode text: "Episode about 1984 by George Orwell"'}
+        ]
+
     @patch("stations.ai_utils.Anthropic")
     def test_extract_books_success(self, mock_anthropic):
         """Test successful book extraction."""
@@ -401,3 +415,152 @@ class TestExtractBooksFromEpisode:
         episode.refresh_from_db()
         assert episode.stage == Episode.STAGE_EXTRACTION_FAILED
         assert "Test error" in (episode.last_error or "")
+
+    @patch("stations.ai_utils.get_book_extractor")
+    def test_extract_books_from_episode_sets_latest_aired(self, mock_get_extractor, brand):
+        """Linked books pick up the episode's aired_at after extraction."""
+        from datetime import datetime, timezone as dt_tz
+        from stations.models import Book, Episode
+
+        episode = Episode.objects.create(
+            brand=brand,
+            title="Book review",
+            url="http://test.com/episode-6",
+            aired_at=datetime(2025, 3, 1, tzinfo=dt_tz.utc),
+        )
+
+        mock_extractor = Mock()
+        mock_extractor.is_available.return_value = True
+        mock_extractor.extract_books.return_value = {
+            "has_book": True,
+            "books": [{"title": "Test", "author": "Author"}],
+            "reasoning": "Book found"
+        }
+        mock_get_extractor.return_value = mock_extractor
+
+        extract_books_from_episode(episode.pk)
+
+        book = Book.objects.get(title="Test")
+        assert book.latest_aired_at == episode.aired_at
+
+
+class TestMultiEpisodeExtraction:
+    """Several episodes per call, with per-episode fallback."""
+
+    def test_parse_multi_response_salvages_truncated_array(self):
+        text = (
+            '```json\n[{"id": 1, "has_book": false, "books": []},\n'
+            ' {"id": 2, "reasoning": "no has_book"},\n'
+            ' {"id": 3, "has_book": true, "books": [{"title": "Vig'
+        )
+        assert BookExtractor.parse_multi_response(text) == {
+            1: {"has_book": False, "books": [], "reasoning": "No reasoning provided"},
+        }
+
+    def test_parse_multi_response_rejects_non_array(self):
+        with pytest.raises(ValueError):
+            BookExtractor.parse_multi_response('{"has_book": false}')
+
+    def test_multi_request_params_keep_cached_system_block(self):
+        extractor = BookExtractor(api_key="test-key")
+        params = extractor.multi_request_params({7: "First", 9: "Second"})
+        assert params["system"] == extractor.request_params("x")["system"]
+        assert '<episode id="7">First</episode>\n<episode id="9">Second</episode>' in (
+            params["messages"][0]["content"]
+        )
+
+    @pytest.mark.django_db
+    @patch("stations.ai_utils.get_book_extractor")
+    def test_missing_and_failing_items_fall_back_per_episode(self, mock_get_extractor, brand):
+        from stations.ai_utils import extract_books_from_episodes
+        from stations.models import Episode
+
+        covered, missing, broken = (
+            Episode.objects.create(brand=brand, title=f"Episode {i}", url=f"http://test.com/multi-{i}")
+            for i in range(3)
+        )
+        mock_extractor = Mock()
+        mock_extractor.is_available.return_value = True
+        mock_extractor.extract_books_multi.return_value = {
+            covered.pk: {"has_book": False, "books": [], "reasoning": "Music"},
+        }
+        mock_extractor.extract_books.side_effect = [
+            {"has_book": False, "books": [], "reasoning": "Fallback"},
+            RuntimeError("boom"),
+        ]
+        mock_get_extractor.return_value = mock_extractor
+
+        results = extract_books_from_episodes([covered.pk, missing.pk, broken.pk])
+
+        assert results[covered.pk]["reasoning"] == "Music"
+        assert results[missing.pk]["reasoning"] == "Fallback"
+        assert results[broken.pk] == {"error": "boom"}
+        assert mock_extractor.extract_books.call_count == 2
+        broken.refresh_from_db()
+        assert broken.stage == Episode.STAGE_EXTRACTION_FAILED
+
+
+@pytest.mark.django_db
+class TestExtractionMemo:
+    """Repeated text reuses the earlier extraction result instead of calling Claude."""
+
+    RESULT = {"has_book": True, "books": [{"title": "Vigil", "author": "George Saunders"}], "reasoning": "Named"}
+
+    @pytest.fixture
+    def extractor(self):
+        with patch("stations.ai_utils.get_book_extractor") as mock_get_extractor:
+            mock_extractor = Mock()
+            mock_extractor.is_available.return_value = True
+            mock_extractor.extract_books.return_value = dict(self.RESULT)
+            mock_get_extractor.return_value = mock_extractor
+            yield mock_extractor
+
+    def make_episode(self, brand, n, description="George Saunders on his new book, Vigil."):
+        from stations.models import Episode
+        return Episode.objects.create(
+            brand=brand, title=f"Repeat {n}", url=f"http://test.com/memo-{n}",
+            scraped_data={"title": "Front Row", "description": description},
+        )
+
+    def test_repeat_with_same_text_skips_api(self, extractor, brand):
+        first = self.make_episode(brand, 1)
+        repeat = self.make_episode(brand, 2, description="George Saunders  on his new book,\nVigil.")
+
+        extract_books_from_episode(first.pk)
+        result = extract_books_from_episode(repeat.pk)
+
+        assert result["books"] == self.RESULT["books"]
+        assert extractor.extract_books.call_count == 1
+        assert [b.title for b in repeat.books.all()] == ["Vigil"]
+        from stations.models import ExtractionMemo
+        assert ExtractionMemo.objects.get().hits == 1
+
+    def test_refresh_calls_api_again(self, extractor, brand):
+        episode = self.make_episode(brand, 1)
+        extract_books_from_episode(episode.pk)
+        extract_books_from_episode(episode.pk, refresh=True)
+        assert extractor.extract_books.call_count == 2
+
+    def test_prompt_change_misses(self, extractor, brand, monkeypatch):
+        episode = self.make_episode(brand, 1)
+        extract_books_from_episode(episode.pk)
+        monkeypatch.setattr("stations.ai_utils.EXTRACTION_PROMPT_VERSION", "edited")
+        extract_books_from_episode(episode.pk)
+        assert extractor.extract_books.call_count == 2
+
+    def test_prompt_version_covers_multi_episode_instructions(self):
+        import hashlib
+        from stations.ai_utils import (
+            EXTRACTION_INSTRUCTIONS, EXTRACTION_PROMPT_VERSION, MULTI_EPISODE_INSTRUCTIONS,
+        )
+        single_only = hashlib.sha256(EXTRACTION_INSTRUCTIONS.encode()).hexdigest()[:12]
+        both = hashlib.sha256((EXTRACTION_INSTRUCTIONS + MULTI_EPISODE_INSTRUCTIONS).encode()).hexdigest()[:12]
+        assert EXTRACTION_PROMPT_VERSION == both != single_only
+
+    def test_failed_results_are_not_memoized(self, extractor, brand):
+        from stations.models import ExtractionMemo
+        extractor.extract_books.return_value = {
+            "has_book": False, "books": [], "reasoning": "API error: overloaded", "failed": True,
+        }
+        extract_books_from_episode(self.make_episode(brand, 1).pk)
+        assert not ExtractionMemo.objects.exists()
@@ -0,0 +1,134 @@
+"""
+Query budgets and latency benchmark for the public API.
+
+TestQueryBudgets runs with the normal suite: every endpoint has a fixed
+ceiling on SQL queries, checked at two page sizes so an N+1 (e.g. a
+serializer falling back to Brand.book_count) fails the build.
+
+TestApiBenchmark is opt-in (``-m benchmark``). It seeds a production-sized
+catalog and records p50/p95/p99 wall-clock latency per endpoint. Run it
+against the dev Postgres before merging query changes:
+
+    docker-compose -f docker-compose.dev.yml exec web pytest -m benchmark --no-cov -s
+
+Set BENCHMARK_REPORT=/path/report.json to also write the results as JSON.
+"""
+import json
+import os
+import statistics
+import time
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from stations.tests.factories import seed_catalog
+
+# (url, max queries). Budgets include pagination COUNTs and prefetches.
+QUERY_BUDGETS = [
+    ('/api/books/?page_size={n}', 5),
+    ('/api/books/?page_size={n}&view=compact', 3),
+    ('/api/books/?cursor=&page_size={n}', 4),
+    ('/api/books/?cursor=&page_size={n}&view=compact', 2),
+    ('/api/books/?brand_slug={brand}&page_size={n}', 5),
+    ('/api/books/?topic={topic}&page_size={n}', 5),
+    ('/api/books/?search=Book&page_size={n}', 5),
+    ('/api/books/{book}/', 4),
+    ('/api/brands/?page_size={n}', 2),
+    ('/api/brands/{brand}/', 1),
+    ('/api/brands/{brand}/books/?page_size={n}', 6),
+    ('/api/brands/{brand}/books/?page_size={n}&view=compact', 4),
+    ('/api/topics/', 1),
+    # set_config + results + topics; the savepoint pair only exists under tests
+    ('/api/search/?q=book&limit={n}', 5),
+    ('/api/stations/?page_size={n}', 2),
+]
+
+PAGE_SIZES = [5, 50]
+
+
+def _format(url, catalog, page_size):
+    return url.format(
+        n=page_size,
+        book=catalog['books'][0].slug,
+        brand=catalog['brands'][0].slug,
+        topic=catalog['topics'][0].slug,
+    )
+
+
+def _run(api_client, url):
+    """GET url uncached; return (response, query count, seconds)."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        response = api_client.get(url)
+        elapsed = time.perf_counter() - start
+    return response, len(ctx.captured_queries), elapsed
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+@pytest.mark.unit
+class TestQueryBudgets:
+    """Every public endpoint stays within a fixed query budget."""
+
+    @pytest.fixture
+    def catalog(self):
+        return seed_catalog(brands=4, books=120, episodes_per_brand=15, topics=5)
+
+    @pytest.mark.parametrize('page_size', PAGE_SIZES)
+    @pytest.mark.parametrize('url, budget', QUERY_BUDGETS)
+    def test_query_budget(self, api_client, catalog, url, budget, page_size):
+        url = _format(url, catalog, page_size)
+        response, queries, _ = _run(api_client, url)
+        assert response.status_code == status.HTTP_200_OK
+        assert queries <= budget, f'{url} ran {queries} queries (budget {budget})'
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+class TestApiBenchmark:
+    """Latency percentiles per endpoint on a production-sized catalog."""
+
+    RUNS = 30
+    PAGE_SIZE = 50
+
+    def test_benchmark(self, api_client):
+        catalog = seed_catalog(brands=30, books=5000, episodes_per_brand=150, topics=20)
+        report = []
+        for url, budget in QUERY_BUDGETS:
+            url = _format(url, catalog, self.PAGE_SIZE)
+            api_client.get(url)  # warm up connection and code paths
+            timings, queries = [], 0
+            for _ in range(self.RUNS):
+                response, queries, elapsed = _run(api_client, url)
+                assert response.status_code == status.HTTP_200_OK
+                timings.append(elapsed * 1000)
+            report.append({
+                'url': url,
+                'queries': queries,
+                'budget': budget,
+                'p50_ms': round(statistics.median(timings), 1),
+                'p95_ms': round(_percentile(timings, 95), 1),
+                'p99_ms': round(_percentile(timings, 99), 1),
+            })
+
+        print(f"\n{'endpoint':<60} {'queries':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for row in report:
+            print(
+                f"{row['url']:<60} {row['queries']:>8} {row['p50_ms']:>8} "
+                f"{row['p95_ms']:>8} {row['p99_ms']:>8}"
+            )
+        report_path = os.environ.get('BENCHMARK_REPORT')
+        if report_path:
+            with open(report_path, 'w') as f:
+                json.dump(report, f, indent=2)
+
+        over = [row['url'] for row in report if row['queries'] > row['budget']]
+        assert not over, f'over query budget: {over}'
@@ -0,0 +1,304 @@
+"""Tests for streaming cover ingest."""
+import hashlib
+import io
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from stations.ai_utils import download_and_save_cover
+from stations.covers import CoverRejected, ingest_cover, sniff_image_type
+
+
+def image_bytes(color='red', fmt='PNG'):
+    buf = io.BytesIO()
+    Image.new('RGB', (4, 6), color).save(buf, fmt)
+    return buf.getvalue()
+
+
+class FakeResponse(io.BytesIO):
+    """Minimal http_client streaming response: a readable body plus headers."""
+
+    def __init__(self, body, content_type='image/png', length=True):
+        super().__init__(body)
+        self.headers = {'Content-Type': content_type}
+        if length:
+            self.headers['Content-Length'] = str(len(body))
+
+    def release_conn(self):
+        pass
+
+
+def serve(*bodies, **kwargs):
+    return patch(
+        'stations.http_client.request',
+        side_effect=[FakeResponse(body, **kwargs) for body in bodies],
+    )
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestIngestCover:
+    """ingest_cover streams, validates and de-duplicates cover downloads."""
+
+    def test_stores_cover_with_hash_and_sniffed_extension(self, book):
+        with serve(image_bytes(fmt='JPEG'), content_type='image/jpeg'):
+            assert ingest_cover(book, 'https://example.com/c') is True
+        book.refresh_from_db()
+        assert book.cover_image.name.endswith('.jpg')
+        assert len(book.cover_sha256) == 64
+        assert book.cover_fetch_error == ''
+
+    def test_unchanged_cover_is_not_rewritten(self, book):
+        body = image_bytes()
+        with serve(body, body):
+            ingest_cover(book, 'https://example.com/c')
+            name = book.cover_image.name
+            with patch('django.core.files.storage.FileSystemStorage.save') as storage_save:
+                assert ingest_cover(book, 'https://example.com/c') is False
+        storage_save.assert_not_called()
+        assert book.cover_image.name == name
+
+    def test_cover_is_content_addressed(self, book):
+        body = image_bytes()
+        with serve(body):
+            ingest_cover(book, 'https://example.com/c')
+        sha = hashlib.sha256(body).hexdigest()
+        assert book.cover_image.name == f'covers/sha256/{sha[:2]}/{sha}.png'
+
+    def test_changed_cover_keeps_old_blob_for_gc(self, book, media_root):
+        with serve(image_bytes('red'), image_bytes('blue')):
+            ingest_cover(book, 'https://example.com/c')
+            old_path = book.cover_image.path
+            ingest_cover(book, 'https://example.com/c')
+        assert book.cover_image.path != old_path
+        assert (media_root / old_path).exists()
+
+    def test_identical_covers_share_one_blob(self, book, media_root):
+        from stations.models import Book
+        other = Book.objects.create(title='Another Edition')
+        body = image_bytes()
+        with serve(body, body):
+            ingest_cover(book, 'https://example.com/a')
+            ingest_cover(other, 'https://example.com/b')
+        assert other.cover_image.name == book.cover_image.name
+        assert other.cover_variants == book.cover_variants
+        assert len(list(media_root.rglob('*.png'))) == 1
+
+    def test_rejects_oversized_download_without_content_length(self, book, settings):
+        settings.COVER_MAX_BYTES = 100
+        with serve(image_bytes() + b'\0' * 200, length=False):
+            with pytest.raises(CoverRejected, match='too large'):
+                ingest_cover(book, 'https://example.com/c')
+        assert not book.cover_image
+
+    def test_rejects_oversized_content_length_before_reading(self, book, settings):
+        settings.COVER_MAX_BYTES = 10
+        with serve(image_bytes()):
+            with pytest.raises(CoverRejected, match='too large'):
+                ingest_cover(book, 'https://example.com/c')
+
+    def test_rejects_non_image_content_type(self, book):
+        with serve(b'<html>', content_type='text/html'):
+            with pytest.raises(CoverRejected, match='Content-Type'):
+                ingest_cover(book, 'https://example.com/c')
+
+    def test_rejects_bytes_that_are_not_an_image(self, book):
+        with serve(b'GIF-ish but not really an image'):
+            with pytest.raises(CoverRejected, match='not a recognised image'):
+                ingest_cover(book, 'https://example.com/c')
+
+    def test_download_and_save_cover_records_rejection(self, book):
+        with serve(b'<html>', content_type='text/html'):
+            assert download_and_save_cover(book, 'https://example.com/c') is False
+        book.refresh_from_db()
+        assert 'Content-Type' in book.cover_fetch_error
+
+    @pytest.mark.parametrize('head,ext', [
+        (b'\xff\xd8\xff\xe0', '.jpg'),
+        (b'\x89PNG\r\n\x1a\n', '.png'),
+        (b'GIF89a', '.gif'),
+        (b'RIFF\0\0\0\0WEBPVP8 ', '.webp'),
+        (b'\0\0\0\x1cftypavif', '.avif'),
+        (b'%PDF-1.4', None),
+    ])
+    def test_sniff_image_type(self, head, ext):
+        assert sniff_image_type(head) == ext
+
+
+@pytest.mark.unit
+class TestCoverVariants:
+    """Responsive variants are generated at ingest and exposed as sources."""
+
+    def ingest(self, book, size=(800, 1200)):
+        buf = io.BytesIO()
+        Image.new('RGB', size, 'green').save(buf, 'JPEG')
+        with serve(buf.getvalue(), content_type='image/jpeg'):
+            ingest_cover(book, 'https://example.com/c')
+        book.refresh_from_db()
+
+    def test_ingest_writes_webp_variants_with_dimensions(self, book, settings):
+        settings.COVER_VARIANT_WIDTHS = [160, 320]
+        self.ingest(book)
+        webp = [v for v in book.cover_variants if v['format'] == 'webp']
+        assert [(v['width'], v['height']) for v in webp] == [(160, 240), (320, 480)]
+        for variant in webp:
+            with book.cover_image.storage.open(variant['name']) as f:
+                image = Image.open(f)
+                assert (image.format, image.size) == ('WEBP', (variant['width'], variant['height']))
+
+    def test_never_upscales(self, book, settings):
+        settings.COVER_VARIANT_WIDTHS = [160, 320, 640]
+        self.ingest(book, size=(300, 450))
+        assert {v['width'] for v in book.cover_variants} == {160}
+
+    def test_regenerating_is_idempotent(self, book, settings, media_root):
+        settings.COVER_VARIANT_WIDTHS = [160]
+        self.ingest(book)
+        from stations.covers import generate_cover_variants
+        generate_cover_variants(book)
+        generate_cover_variants(book)
+        assert len(list(media_root.rglob('*.webp'))) == len(book.cover_variants)
+
+    def test_book_sharing_a_cover_reuses_its_variants(self, book, settings):
+        from stations.models import Book
+        settings.COVER_VARIANT_WIDTHS = [160]
+        self.ingest(book)
+        other = Book.objects.create(title='Another Edition')
+        with patch('stations.covers.Image.open') as image_open:
+            self.ingest(other)
+        image_open.assert_not_called()
+        assert other.cover_variants == book.cover_variants
+
+    def test_sibling_with_stale_widths_is_not_reused(self, book, settings):
+        from stations.models import Book
+        settings.COVER_VARIANT_WIDTHS = [160]
+        self.ingest(book)
+        settings.COVER_VARIANT_WIDTHS = [160, 320]
+        other = Book.objects.create(title='Another Edition')
+        self.ingest(other)
+        assert {v['width'] for v in other.cover_variants} == {160, 320}
+
+    def test_force_backfill_regenerates_duplicates(self, book, settings):
+        from django.core.management import call_command
+        from stations.models import Book
+        settings.COVER_VARIANT_WIDTHS = [160]
+        self.ingest(book)
+        other = Book.objects.create(title='Another Edition')
+        self.ingest(other)
+        settings.COVER_VARIANT_WIDTHS = [160, 320]
+        with patch('stations.covers.Image.open', wraps=Image.open) as image_open:
+            call_command('generate_cover_variants', force=True, workers=1, stdout=io.StringIO())
+        assert image_open.call_count == 2
+        for b in Book.objects.all():
+            assert {v['width'] for v in b.cover_variants} == {160, 320}
+
+    def test_api_exposes_srcset_sources(self, book, settings, api_client):
+        from stations.models import Book
+        settings.COVER_VARIANT_WIDTHS = [160, 320]
+        self.ingest(book)
+        Book.objects.filter(pk=book.pk).update(verification_status=Book.VERIFICATION_VERIFIED)
+
+        data = api_client.get(f'/api/books/{book.slug}/').json()
+        webp = next(s for s in data['cover_sources'] if s['type'] == 'image/webp')
+        assert webp['srcset'].startswith('/media/covers/sha256/')
+        assert webp['srcset'].endswith('.webp 320w')
+        assert '.webp 160w, /media/covers/sha256/' in webp['srcset']
+        assert (webp['width'], webp['height']) == (320, 480)
+
+        compact = api_client.get('/api/books/', {'view': 'compact'}).json()
+        assert compact['results'][0]['cover_sources'] == data['cover_sources']
+
+    def test_backfill_command(self, book, settings):
+        from django.core.management import call_command
+        from stations.models import Book
+        settings.COVER_VARIANT_WIDTHS = [160]
+        self.ingest(book)
+        Book.objects.filter(pk=book.pk).update(cover_variants=[])
+
+        call_command('generate_cover_variants', workers=1, stdout=io.StringIO())
+        book.refresh_from_db()
+        assert [v['width'] for v in book.cover_variants if v['format'] == 'webp'] == [160]
+
+
+@pytest.mark.unit
+class TestCoverMaintenance:
+    """adopt_covers moves legacy covers; gc_covers removes unreferenced files."""
+
+    def legacy_cover(self, book, name='covers/unknown/test-book.png'):
+        from django.core.files.base import ContentFile
+        from stations.models import Book
+        stored = book.cover_image.storage.save(name, ContentFile(image_bytes()))
+        Book.objects.filter(pk=book.pk).update(cover_image=stored)
+        book.refresh_from_db()
+        return stored
+
+    def test_adopt_moves_legacy_cover_to_blob_name(self, book, media_root):
+        from django.core.management import call_command
+        old = self.legacy_cover(book)
+        call_command('adopt_covers', stdout=io.StringIO())
+        book.refresh_from_db()
+        sha = hashlib.sha256(image_bytes()).hexdigest()
+        assert book.cover_image.name == f'covers/sha256/{sha[:2]}/{sha}.png'
+        assert book.cover_sha256 == sha
+        assert book.cover_variants
+        assert (media_root / old).exists()  # left for gc_covers
+
+    def test_gc_deletes_only_unreferenced_files(self, book, media_root):
+        from django.core.management import call_command
+        old = self.legacy_cover(book)
+        call_command('adopt_covers', stdout=io.StringIO())
+        book.refresh_from_db()
+
+        call_command('gc_covers', grace_hours=0, stdout=io.StringIO())
+        assert not (media_root / old).exists()
+        assert (media_root / book.cover_image.name).exists()
+        for variant in book.cover_variants:
+            assert (media_root / variant['name']).exists()
+
+    def test_reused_blob_gets_fresh_mtime(self, book, media_root):
+        import os
+        import time
+        from django.core.files.base import ContentFile
+        from stations.covers import blob_name, store_blob
+        sha = hashlib.sha256(image_bytes()).hexdigest()
+        storage = book.cover_image.storage
+        name = store_blob(storage, sha, 'png', ContentFile(image_bytes()))
+        week_ago = time.time() - 7 * 86400
+        os.utime(media_root / name, (week_ago, week_ago))
+
+        assert store_blob(storage, sha, 'png', ContentFile(image_bytes())) == name == blob_name(sha, 'png')
+        assert (media_root / name).stat().st_mtime > time.time() - 60
+
+    def test_gc_spares_blob_adopted_during_the_run(self, book, media_root):
+        from django.core.management import call_command
+        from stations.management.commands import gc_covers
+        from stations.models import Book
+        old = self.legacy_cover(book)
+        Book.objects.filter(pk=book.pk).update(cover_image='')
+        real_walk = gc_covers.walk
+
+        def walk_while_adopting(storage, path):
+            for name in real_walk(storage, path):
+                Book.objects.filter(pk=book.pk).update(cover_image=name)  # concurrent fetch
+                yield name
+
+        with patch.object(gc_covers, 'walk', walk_while_adopting):
+            call_command('gc_covers', grace_hours=0, stdout=io.StringIO())
+        assert (media_root / old).exists()
+
+    def test_gc_keeps_recent_files_and_honours_dry_run(self, book, media_root):
+        from django.core.management import call_command
+        from stations.models import Book
+        old = self.legacy_cover(book)
+        Book.objects.filter(pk=book.pk).update(cover_image='')
+
+        call_command('gc_covers', stdout=io.StringIO())
+        assert (media_root / old).exists()  # inside the default 24h grace period
+        call_command('gc_covers', grace_hours=0, dry_run=True, stdout=io.StringIO())
+        assert (media_root / old).exists()
@@ -0,0 +1,145 @@
+"""Tests for Message Batches extraction."""
+from types import SimpleNamespace
+
+import pytest
+
+from stations import ai_utils
+from stations.extraction_batches import poll_extraction_batches, submit_extraction_batch
+from stations.fake_services import FakeServices
+from stations.models import Episode, ExtractionBatch
+
+BOOK_TEXT = 'Ada Hale discusses the novel The Salt Road. Plus music.'
+
+
+@pytest.fixture
+def fake_anthropic(settings, monkeypatch):
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+    monkeypatch.setattr(ai_utils, '_extractor', None)
+    with FakeServices() as services:
+        settings.ANTHROPIC_BASE_URL = f'{services.url}/anthropic'
+        yield services
+
+
+def make_episodes(brand, *descriptions):
+    return [
+        Episode.objects.create(
+            brand=brand, title=f'Episode {i}', url=f'https://example.com/batch-{i}',
+            scraped_data={'title': f'Episode {i}', 'description': description},
+        )
+        for i, description in enumerate(descriptions)
+    ]
+
+
+@pytest.mark.unit
+class TestExtractionBatches:
+    """Batched episodes wait in EXTRACTION_BATCHED until the poll applies results."""
+
+    def test_submit_then_poll_applies_results(self, fake_anthropic, brand):
+        with_book, without = make_episodes(brand, BOOK_TEXT, 'Arts news this week.')
+        batch = submit_extraction_batch([with_book, without])
+
+        with_book.refresh_from_db()
+        assert with_book.stage == Episode.STAGE_EXTRACTION_BATCHED
+        assert with_book.task_id == batch.batch_id
+
+        assert poll_extraction_batches() == {batch.batch_id: 'in_progress'}
+        report = poll_extraction_batches()
+        assert report[batch.batch_id] == {'applied': 2, 'retry': 0, 'failed': 0, 'stale': 0}
+
+        with_book.refresh_from_db()
+        without.refresh_from_db()
+        assert with_book.stage == Episode.STAGE_VERIFICATION_QUEUED
+        assert [b.title for b in with_book.books.all()] == ['The Salt Road']
+        assert without.stage == Episode.STAGE_EXTRACTION_NO_BOOKS
+        batch.refresh_from_db()
+        assert batch.status == ExtractionBatch.STATUS_APPLIED
+        assert batch.request_counts['succeeded'] == 2
+        assert fake_anthropic.stats()['anthropic']['calls'] == 5  # create, 2 polls, results
+
+    def test_result_for_reprocessed_episode_is_ignored(self, fake_anthropic, brand):
+        (episode,) = make_episodes(brand, BOOK_TEXT)
+        batch = submit_extraction_batch([episode])
+        Episode.objects.filter(pk=episode.pk).update(stage=Episode.STAGE_EXTRACTING)
+
+        poll_extraction_batches()
+        assert poll_extraction_batches()[batch.batch_id]['stale'] == 1
+        assert not episode.books.exists()
+
+    def test_failed_request_returns_episode_to_sweep(self, brand):
+        from stations.extraction_batches import _apply_result
+        (episode,) = make_episodes(brand, BOOK_TEXT)
+        batch = ExtractionBatch.objects.create(batch_id='msgbatch_1', episode_count=1)
+        Episode.objects.filter(pk=episode.pk).update(
+            stage=Episode.STAGE_EXTRACTION_BATCHED, task_id=batch.batch_id
+        )
+        item = SimpleNamespace(custom_id=f'episode-{episode.pk}', result=SimpleNamespace(type='expired'))
+
+        assert _apply_result(batch, item, ai_utils.BookExtractor(api_key='test')) == 'retry'
+        episode.refresh_from_db()
+        assert episode.stage == Episode.STAGE_SCRAPED
+        assert episode.last_error == 'Batch request expired'
+
+    def test_batch_is_applied_once(self, fake_anthropic, brand):
+        from stations.extraction_batches import apply_batch
+        (episode,) = make_episodes(brand, BOOK_TEXT)
+        batch = submit_extraction_batch([episode])
+        poll_extraction_batches()  # still in progress
+
+        assert apply_batch(batch)['applied'] == 1
+        assert apply_batch(batch) is None
+        assert episode.books.count() == 1
+
+    def test_poll_skips_batch_claimed_by_another_poll(self, fake_anthropic, brand):
+        (episode,) = make_episodes(brand, BOOK_TEXT)
+        batch = submit_extraction_batch([episode])
+        poll_extraction_batches()
+        ExtractionBatch.objects.filter(pk=batch.pk).update(status=ExtractionBatch.STATUS_APPLYING)
+
+        assert poll_extraction_batches() == {}
+        episode.refresh_from_db()
+        assert episode.stage == Episode.STAGE_EXTRACTION_BATCHED
+
+    def test_apply_error_counts_episode_failed(self, fake_anthropic, brand, monkeypatch):
+        from stations import extraction_batches
+        (episode,) = make_episodes(brand, BOOK_TEXT)
+        batch = submit_extraction_batch([episode])
+        poll_extraction_batches()
+
+        def broken(episode, result):
+            Episode.objects.filter(pk=episode.pk).update(stage=Episode.STAGE_EXTRACTION_FAILED)
+            raise RuntimeError('database went away')
+
+        monkeypatch.setattr(extraction_batches, 'apply_extraction_result', broken)
+        counts = extraction_batches.apply_batch(batch)
+        assert (counts['failed'], counts['retry']) == (1, 0)
+        episode.refresh_from_db()
+        assert episode.stage == Episode.STAGE_EXTRACTION_FAILED
+
+    def test_sweep_batches_large_backlog(self, fake_anthropic, brand, settings):
+        from stations.tasks import extract_books_from_new_episodes
+        settings.EXTRACTION_BATCH_MIN_EPISODES = 2
+        make_episodes(brand, BOOK_TEXT, 'Arts news this week.')
+
+        result = extract_books_from_new_episodes()
+        assert result['status'] == 'batched'
+        assert result['episodes_processed'] == 2
+        assert not Episode.objects.filter(stage=Episode.STAGE_SCRAPED).exists()
+
+    def test_new_episodes_wait_for_sweep_when_batching(self, brand, settings, django_capture_on_commit_callbacks):
+        settings.BOOK_EXTRACTION_MODE = 'ai'
+        settings.EXTRACTION_BATCH_MIN_EPISODES = 10
+        with django_capture_on_commit_callbacks() as callbacks:
+            make_episodes(brand, BOOK_TEXT)
+        assert callbacks == []
+
+    def test_memoized_episodes_skip_the_batch(self, fake_anthropic, brand):
+        from stations.ai_utils import memoize_result
+        memoized, fresh = make_episodes(brand, BOOK_TEXT, 'Arts news this week.')
+        memoize_result(ai_utils.episode_text(memoized), {'has_book': False, 'books': [], 'reasoning': 'Memo'})
+
+        batch = submit_extraction_batch([memoized, fresh])
+
+        assert batch.episode_count == 1
+        memoized.refresh_from_db()
+        assert memoized.stage == Episode.STAGE_EXTRACTION_NO_BOOKS
+        assert memoized.extraction_result['reasoning'] == 'Memo'
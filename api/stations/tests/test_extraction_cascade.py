@@ -0,0 +1,115 @@
+"""Tests for the cheap tiers in front of the Sonnet extractor."""
+import io
+
+import pytest
+
+from stations import ai_utils
+from stations.ai_utils import extract_books_from_episode, extract_books_from_episodes
+from stations.extraction_cascade import cascade_stats
+from stations.fake_services import FakeServices
+from stations.models import Episode, ExtractionMemo, Phrase
+
+BOOK_TEXT = 'Ada Hale discusses the novel The Salt Road.'
+NEWS_TEXT = 'Arts news this week, with live music.'
+
+
+@pytest.fixture
+def fake_anthropic(settings, monkeypatch):
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+    monkeypatch.setattr(ai_utils, '_extractor', None)
+    with FakeServices() as services:
+        settings.ANTHROPIC_BASE_URL = f'{services.url}/anthropic'
+        yield services
+
+
+def make_episode(brand, n, description):
+    return Episode.objects.create(
+        brand=brand, title=f'Episode {n}', url=f'https://example.com/cascade-{n}',
+        scraped_data={'title': f'Episode {n}', 'description': description},
+    )
+
+
+def calls(services):
+    return services.stats().get('anthropic', {}).get('calls', 0)
+
+
+@pytest.mark.unit
+class TestExtractionCascade:
+    """Rejected episodes never reach Sonnet; every step is traced for cascade_report."""
+
+    def test_keyword_tier_rejects_without_api_call(self, fake_anthropic, brand, settings):
+        settings.EXTRACTION_CASCADE_TIERS = ['keyword']
+        episode = make_episode(brand, 1, NEWS_TEXT)
+
+        result = extract_books_from_episode(episode.pk)
+
+        assert result['rejected_by'] == 'keyword'
+        assert calls(fake_anthropic) == 0
+        episode.refresh_from_db()
+        assert episode.stage == Episode.STAGE_EXTRACTION_NO_BOOKS
+        assert episode.extraction_result['cascade'][0]['passed'] is False
+        assert not ExtractionMemo.objects.exists()
+
+    def test_keyword_tier_passes_admin_phrases(self, fake_anthropic, brand, settings):
+        settings.EXTRACTION_CASCADE_TIERS = ['keyword']
+        Phrase.objects.create(text='Live Music')
+        result = extract_books_from_episode(make_episode(brand, 1, NEWS_TEXT).pk)
+        assert 'rejected_by' not in result
+        assert [step['tier'] for step in result['cascade']] == ['keyword', 'full']
+
+    def test_screen_tier_sends_only_likely_books_to_sonnet(self, fake_anthropic, brand, settings):
+        settings.EXTRACTION_CASCADE_TIERS = ['screen']
+        with_book = extract_books_from_episode(make_episode(brand, 1, BOOK_TEXT).pk)
+        without = extract_books_from_episode(make_episode(brand, 2, NEWS_TEXT).pk)
+
+        assert with_book['books'][0]['title'] == 'The Salt Road'
+        assert with_book['cascade'][0]['p'] == 0.9
+        assert without['rejected_by'] == 'screen'
+        assert calls(fake_anthropic) == 3  # two screens, one extraction
+
+    def test_audited_rejection_still_reaches_sonnet(self, fake_anthropic, brand, settings):
+        settings.EXTRACTION_CASCADE_TIERS = ['keyword']
+        settings.EXTRACTION_CASCADE_AUDIT_RATE = 1.0
+        result = extract_books_from_episode(make_episode(brand, 1, NEWS_TEXT).pk)
+        assert result['cascade'][0]['audit'] is True
+        assert 'rejected_by' not in result
+        assert cascade_stats([result])['keyword'] == {
+            'seen': 1, 'passed': 0, 'pass_rate': 0.0, 'mean_ms': result['cascade'][0]['ms'],
+            'p95_ms': result['cascade'][0]['ms'], 'audited': 1, 'missed': 0,
+        }
+
+    def test_multi_episode_extraction_screens_first(self, fake_anthropic, brand, settings):
+        settings.EXTRACTION_CASCADE_TIERS = ['keyword']
+        episodes = [make_episode(brand, n, text) for n, text in enumerate([BOOK_TEXT, NEWS_TEXT, BOOK_TEXT])]
+
+        results = extract_books_from_episodes([e.pk for e in episodes])
+
+        assert results[episodes[1].pk]['rejected_by'] == 'keyword'
+        assert calls(fake_anthropic) == 1  # the two survivors share one prompt
+        full = results[episodes[0].pk]['cascade'][-1]
+        assert (full['tier'], full['shared']) == ('full', 2)
+
+    def test_multi_episode_extraction_loads_phrases_once(self, fake_anthropic, brand, settings):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        settings.EXTRACTION_CASCADE_TIERS = ['keyword']
+        episodes = [make_episode(brand, n, NEWS_TEXT) for n in range(4)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            extract_books_from_episodes([e.pk for e in episodes])
+
+        assert sum('stations_phrase' in q['sql'] for q in ctx.captured_queries) == 1
+
+    def test_cascade_report(self, fake_anthropic, brand, settings):
+        from django.core.management import call_command
+        settings.EXTRACTION_CASCADE_TIERS = ['keyword']
+        for n, text in enumerate([BOOK_TEXT, NEWS_TEXT, NEWS_TEXT]):
+            extract_books_from_episode(make_episode(brand, n, text).pk)
+
+        report = cascade_stats(Episode.objects.values_list('extraction_result', flat=True))
+        assert (report['keyword']['seen'], report['keyword']['passed']) == (3, 1)
+        assert report['full']['book_rate'] == 1.0
+
+        out = io.StringIO()
+        call_command('cascade_report', stdout=out)
+        assert 'keyword' in out.getvalue() and 'books found in 100.0%' in out.getvalue()
@@ -0,0 +1,120 @@
+"""Tests for the fake external services and the pipeline benchmark."""
+import io
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from stations.fake_services import FakeServices, ServiceProfile
+
+
+@pytest.fixture
+def fake(settings):
+    with FakeServices(episodes=4, book_rate=1.0) as services:
+        for name, value in services.settings_overrides().items():
+            setattr(settings, name, value)
+        yield services
+
+
+def get_json(url):
+    with urllib.request.urlopen(url) as resp:
+        return json.loads(resp.read())
+
+
+@pytest.mark.unit
+class TestFakeServices:
+    """The fakes answer in the formats the real clients parse."""
+
+    def test_google_books_search_and_volume_detail(self, fake):
+        from stations.utils import verify_book_exists
+        result = verify_book_exists('The Salt Road', 'Ada Hale')
+        assert result['exists'] is True
+        assert result['cover_url'].startswith(f'{fake.url}/covers/')
+        volume = get_json(f"{fake.url}/books/v1/volumes/{result['volume_id']}")
+        assert volume['volumeInfo']['authors'] == ['Ada Hale']
+
+    def test_anthropic_messages_drive_book_extractor(self, fake, monkeypatch):
+        from stations.ai_utils import BookExtractor
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+        result = BookExtractor().extract_books('Ada Hale discusses the novel The Salt Road. Plus music.')
+        assert result['has_book'] is True
+        assert (result['books'][0]['title'], result['books'][0]['author']) == ('The Salt Road', 'Ada Hale')
+        assert fake.stats()['anthropic']['calls'] == 1
+
+    def test_rate_limit_injection(self):
+        profiles = {'google_books': ServiceProfile(rate_limit_rate=1.0)}
+        with FakeServices(profiles=profiles) as services:
+            with pytest.raises(urllib.error.HTTPError) as excinfo:
+                urllib.request.urlopen(f'{services.url}/books/v1/volumes?q=x')
+            get_json(f'{services.url}/openlibrary/search.json?title=x')
+            stats = services.stats()
+        assert excinfo.value.code == 429
+        assert stats['google_books']['rate_limited'] == 1
+        assert stats['open_library']['rate_limited'] == 0
+
+    def test_recorded_fixture_replaces_generated_response(self, tmp_path):
+        recorded = {'/books/v1/volumes?q=isbn:123': {'status': 200, 'body': {'items': [{'id': 'rec'}]}}}
+        (tmp_path / 'google_books.json').write_text(json.dumps(recorded))
+        with FakeServices(fixtures_dir=tmp_path) as services:
+            assert get_json(f'{services.url}/books/v1/volumes?q=isbn:123') == {'items': [{'id': 'rec'}]}
+
+    def test_rss_brand_scrapes_from_fake_feed(self, fake, brand):
+        from stations.rss_utils import scrape_rss_brand
+        brand.url = fake.brand_url('rss', 'fake-show')
+        assert scrape_rss_brand(brand)['new_episodes'] == 4
+        description = brand.episode_set.first().scraped_data['description']
+        assert 'discusses the novel' in description
+
+    def test_wnyc_brand_scrapes_from_fake_api(self, fake, brand, monkeypatch):
+        from stations import wnyc_utils
+        monkeypatch.setattr(wnyc_utils, 'PAGE_SIZE', 3)
+        monkeypatch.setattr(wnyc_utils, 'REQUEST_DELAY', 0)
+        brand.url = fake.brand_url('wnyc', 'fake-show')
+        assert wnyc_utils.scrape_wnyc_brand(brand)['new_episodes'] == 4
+        assert fake.stats()['wnyc']['calls'] == 2
+
+
+@pytest.mark.unit
+class TestBenchmarkPipeline:
+    """benchmark_pipeline drives its own brands through every stage and cleans up."""
+
+    def run(self, **options):
+        from django.core.management import call_command
+        out = io.StringIO()
+        call_command(
+            'benchmark_pipeline', brands='rss=1', episodes=3, book_rate=1.0, gb_rate=100,
+            json=True, force=True, stdout=out, **options,
+        )
+        return json.loads(out.getvalue())
+
+    def test_eager_run_reports_and_cleans_up(self, settings):
+        from stations.models import Book, BookLookup, Brand, Station
+        report = self.run()
+        assert report['episodes_scraped'] == 3
+        assert report['episodes_finished'] == 3
+        assert report['books']['verified'] == report['books']['with_cover'] == 3
+        assert report['external_calls']['anthropic']['calls'] == 3
+        assert report['tasks']['ai_extract_books_task']['n'] == 3
+        assert report['tasks']['fetch_cover_task']['n'] == 3
+        fake_host = next(iter(report['http_client'].values()))
+        assert fake_host['connections'] < fake_host['requests']  # keep-alive reuse
+        assert not Station.objects.filter(station_id=f"benchmark-{report['run_id']}").exists()
+        assert not Brand.objects.filter(name__startswith='Benchmark').exists()
+        assert not Book.objects.exists()
+        assert not BookLookup.objects.exists()
+
+    def test_batch_extraction_run(self, settings):
+        from stations.models import ExtractionBatch
+        report = self.run(batch_extraction=True)
+        assert report['episodes_finished'] == 3
+        assert report['books']['verified'] == 3
+        assert 'ai_extract_books_task' not in report['tasks']
+        assert not ExtractionBatch.objects.exists()
+
+    def test_refuses_without_debug_or_force(self, settings):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        settings.DEBUG = False
+        with pytest.raises(CommandError, match='--force'):
+            call_command('benchmark_pipeline', stdout=io.StringIO())
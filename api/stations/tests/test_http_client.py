@@ -0,0 +1,65 @@
+"""Tests for the shared pooled HTTP client."""
+import pytest
+
+from stations import http_client
+from stations.fake_services import FakeServices, ServiceProfile
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(settings):
+    settings.HTTP_RETRY_BACKOFF = 0
+    http_client.reset()
+    yield
+    http_client.reset()
+
+
+def host(services):
+    return services.url.split('://', 1)[1]
+
+
+@pytest.mark.unit
+class TestHttpClient:
+    """Requests share keep-alive pools and a uniform retry policy."""
+
+    def test_requests_to_one_host_reuse_a_connection(self):
+        with FakeServices() as services:
+            for _ in range(3):
+                http_client.get_json(f'{services.url}/openlibrary/search.json?title=x')
+            stats = http_client.stats()[host(services)]
+        assert stats['requests'] == 3
+        assert stats['connections'] == 1
+
+    def test_5xx_is_retried_then_raised(self, settings):
+        settings.HTTP_RETRIES = 2
+        with FakeServices(profiles={'open_library': ServiceProfile(error_rate=1.0)}) as services:
+            with pytest.raises(http_client.HTTPError) as excinfo:
+                http_client.get_json(f'{services.url}/openlibrary/search.json?title=x')
+            calls = services.stats()['open_library']['calls']
+            retries = http_client.stats()[host(services)]['retries']
+        assert excinfo.value.status == 500
+        assert (calls, retries) == (3, 2)
+
+    def test_429_is_not_retried(self):
+        with FakeServices(profiles={'google_books': ServiceProfile(rate_limit_rate=1.0)}) as services:
+            with pytest.raises(http_client.HTTPError) as excinfo:
+                http_client.get_json(f'{services.url}/books/v1/volumes?q=x')
+            calls = services.stats()['google_books']['calls']
+        assert excinfo.value.status == 429
+        assert calls == 1
+
+    def test_connection_failure_raises_request_error(self, settings):
+        settings.HTTP_RETRIES = 0
+        with FakeServices() as services:
+            url = services.url
+        with pytest.raises(http_client.RequestError):
+            http_client.get_json(f'{url}/openlibrary/search.json')
+        assert http_client.stats()[url.split('://', 1)[1]]['errors'] == 1
+
+    def test_stream_returns_connection_after_full_read(self):
+        with FakeServices() as services:
+            for _ in range(2):
+                with http_client.stream(f'{services.url}/covers/a.jpg') as response:
+                    assert response.headers['Content-Type'] == 'image/jpeg'
+                    assert response.read(2) == b'\xff\xd8'
+                    response.read()
+            assert http_client.stats()[host(services)]['connections'] == 1
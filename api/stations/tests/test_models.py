@@ -104,3 +104,32 @@ class TestBookModel:
     def test_book_str(self, book):
         """Test book string representation."""
         assert str(book) == 'Test Book Title'
+
+    def test_refresh_latest_aired(self, book, brand):
+        """latest_aired_at tracks the most recent linked episode."""
+        from datetime import datetime, timezone as dt_tz
+
+        older = Episode.objects.create(
+            brand=brand, title='Older', url='https://example.com/older',
+            aired_at=datetime(2024, 1, 1, tzinfo=dt_tz.utc),
+        )
+        newer = Episode.objects.create(
+            brand=brand, title='Newer', url='https://example.com/newer',
+            aired_at=datetime(2025, 6, 1, tzinfo=dt_tz.utc),
+        )
+        book.episodes.add(older, newer)
+
+        Book.refresh_latest_aired([book.pk])
+        book.refresh_from_db()
+        assert book.latest_aired_at == newer.aired_at
+
+        book.episodes.remove(newer)
+        Book.refresh_latest_aired([book.pk])
+        book.refresh_from_db()
+        assert book.latest_aired_at == older.aired_at
+
+    def test_refresh_latest_aired_without_dates(self, book):
+        """Books whose episodes have no aired_at get NULL."""
+        assert Book.refresh_latest_aired() == 1
+        book.refresh_from_db()
+        assert book.latest_aired_at is None
@@ -0,0 +1,137 @@
+"""Tests for the pluggable book-metadata providers."""
+import time
+from unittest.mock import patch
+
+import pytest
+
+from stations import http_client, providers
+from stations.utils import GoogleBooksRateLimited
+
+GB_FOUND = {'exists': True, 'title': 'Wolf Hall', 'author': 'Hilary Mantel',
+            'cover_url': 'https://books.google.com/c.jpg', 'isbn': '9780007230181', 'requests': 1}
+GB_MISSING = {'exists': False, 'title': 'Wolf Hall', 'author': 'Hilary Mantel',
+              'cover_url': None, 'isbn': None, 'requests': 1}
+OL_DOCS = {'docs': [
+    {'title': 'Wolf Hall', 'author_name': ['Hilary Mantel'], 'isbn': ['0007230184', '9780007230181']},
+    {'title': 'Wolf Hall', 'cover_i': 42},
+]}
+
+
+@pytest.fixture
+def both_providers(settings):
+    settings.METADATA_PROVIDERS = ['google_books', 'open_library']
+    settings.METADATA_HEDGE_AFTER_SECONDS = 0
+
+
+@pytest.mark.unit
+class TestOpenLibraryProvider:
+    """Open Library search results map onto the verify_book_exists dict."""
+
+    def test_search_parses_first_doc_and_cover(self):
+        with patch('stations.providers.http_client.get_json', return_value=OL_DOCS):
+            result = providers.get_provider('open_library').search('Wolf Hall', 'Hilary Mantel')
+        assert result['exists'] is True
+        assert (result['title'], result['author']) == ('Wolf Hall', 'Hilary Mantel')
+        assert result['isbn'] == '9780007230181'
+        assert result['cover_url'] == 'https://covers.openlibrary.org/b/id/42-L.jpg'
+
+    def test_429_starts_cooldown(self):
+        error = http_client.HTTPError('https://openlibrary.org/search.json', 429)
+        provider = providers.get_provider('open_library')
+        with patch('stations.providers.http_client.get_json', side_effect=error):
+            with pytest.raises(providers.ProviderUnavailable):
+                provider.search('Wolf Hall')
+        assert provider.cooldown_remaining() > 0
+
+
+@pytest.mark.unit
+class TestProviderFallback:
+    """search() falls through to the next provider when the primary can't answer."""
+
+    def test_primary_answers_when_healthy(self, both_providers):
+        with patch('stations.utils._fetch_google_books', return_value=GB_FOUND), \
+                patch.object(providers.OpenLibraryProvider, 'search') as ol_search:
+            result = providers.search('Wolf Hall', 'Hilary Mantel')
+        assert result['provider'] == 'google_books'
+        ol_search.assert_not_called()
+
+    def test_falls_back_while_primary_cools_down(self, both_providers):
+        providers.get_provider('google_books').limiter().start_cooldown(3600)
+        with patch('stations.utils._fetch_google_books') as gb_search, \
+                patch('stations.providers.http_client.get_json', return_value=OL_DOCS):
+            result = providers.search('Wolf Hall', 'Hilary Mantel')
+        gb_search.assert_not_called()
+        assert result['provider'] == 'open_library'
+        assert result['exists'] is True
+
+    def test_primary_error_marks_it_unhealthy(self, both_providers):
+        broken = dict(GB_MISSING, error='timed out')
+        with patch('stations.utils._fetch_google_books', return_value=broken), \
+                patch('stations.providers.http_client.get_json', return_value=OL_DOCS):
+            result = providers.search('Wolf Hall', 'Hilary Mantel')
+        assert result['provider'] == 'open_library'
+        assert providers.get_provider('google_books').cooldown_remaining() > 0
+
+    def test_fallback_miss_is_not_a_verdict(self, both_providers):
+        providers.get_provider('google_books').limiter().start_cooldown(3600)
+        with patch('stations.providers.http_client.get_json', return_value={'docs': []}):
+            result = providers.search('Wolf Hall', 'Hilary Mantel')
+        assert result['exists'] is False
+        assert 'while google_books unavailable' in result['error']
+
+    def test_raises_when_every_provider_cools_down(self, both_providers):
+        for provider in providers.get_providers():
+            provider.limiter().start_cooldown(3600)
+        with pytest.raises(providers.ProviderUnavailable):
+            providers.search('Wolf Hall')
+        assert providers.cooldown_remaining() > 0
+
+    def test_fresh_429_propagates_as_primary_exception(self):
+        with patch('stations.utils._fetch_google_books', side_effect=GoogleBooksRateLimited('429')):
+            with pytest.raises(GoogleBooksRateLimited):
+                providers.search('Wolf Hall')
+
+    def test_volume_lookup_falls_back_to_isbn_search(self, both_providers):
+        providers.get_provider('google_books').limiter().start_cooldown(3600)
+        with patch('stations.providers.http_client.get_json', return_value=OL_DOCS):
+            result = providers.lookup_volume('vol123', '9780007230181')
+        assert result['provider'] == 'open_library'
+
+
+@pytest.mark.unit
+class TestHedgedSearch:
+    """A slow primary is hedged with a request to the secondary."""
+
+    @pytest.fixture
+    def hedging(self, both_providers, settings):
+        settings.METADATA_HEDGE_AFTER_SECONDS = 0.05
+
+    def test_slow_primary_is_hedged(self, hedging):
+        def slow_search(title, author):
+            time.sleep(0.5)
+            return GB_FOUND
+        with patch('stations.utils._fetch_google_books', side_effect=slow_search), \
+                patch('stations.providers.http_client.get_json', return_value=OL_DOCS):
+            start = time.monotonic()
+            result = providers.search('Wolf Hall', 'Hilary Mantel')
+        assert result['provider'] == 'open_library'
+        assert time.monotonic() - start < 0.4
+
+    def test_fast_primary_is_not_hedged(self, hedging):
+        with patch('stations.utils._fetch_google_books', return_value=GB_FOUND), \
+                patch.object(providers.OpenLibraryProvider, 'search') as ol_search:
+            result = providers.search('Wolf Hall', 'Hilary Mantel')
+        assert result['provider'] == 'google_books'
+        ol_search.assert_not_called()
+
+    def test_hedged_fallback_miss_waits_for_primary(self, hedging):
+        def slow_search(title, author):
+            time.sleep(0.2)
+            return GB_MISSING
+        with patch('stations.utils._fetch_google_books', side_effect=slow_search), \
+                patch('stations.providers.http_client.get_json', return_value={'docs': []}):
+            result = providers.search('Wolf Hall', 'Hilary Mantel')
+        # Only the primary's "not found" is conclusive
+        assert result['provider'] == 'google_books'
+        assert result['exists'] is False
+        assert 'error' not in result
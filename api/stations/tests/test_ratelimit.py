@@ -0,0 +1,130 @@
+"""Tests for the shared Redis rate limiter."""
+import os
+import time
+import uuid
+from unittest.mock import patch
+
+import pytest
+import redis
+
+from stations import http_client
+from stations.ratelimit import RateLimiter
+from stations.utils import GoogleBooksRateLimited, _gb_request
+
+
+@pytest.fixture
+def redis_client():
+    """Real Redis (CI runs a redis service); skipped when none is reachable."""
+    client = redis.Redis.from_url(os.environ.get("TEST_REDIS_URL", "redis://localhost:6379/15"))
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip("Redis not available")
+    return client
+
+
+@pytest.fixture
+def make_limiter(redis_client):
+    """Build limiters on a unique key; instances with the same name share state."""
+    name = f"test-{uuid.uuid4().hex}"
+    created = []
+
+    def make(rate=10, burst=1, client=redis_client):
+        limiter = RateLimiter(name, rate=rate, burst=burst, client=client)
+        created.append(limiter)
+        return limiter
+
+    yield make
+    for limiter in created:
+        limiter.reset()
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Token bucket and cooldown behaviour."""
+
+    def test_burst_then_wait(self, make_limiter):
+        limiter = make_limiter(rate=10, burst=3)
+        assert [limiter.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        wait = limiter.try_acquire()
+        assert 0 < wait <= 0.1
+
+    def test_bucket_shared_between_processes(self, make_limiter):
+        worker_a = make_limiter(rate=1, burst=2)
+        worker_b = make_limiter(rate=1, burst=2)
+        assert worker_a.try_acquire() == 0.0
+        assert worker_a.try_acquire() == 0.0
+        # worker_b has its own client state but sees the same empty bucket
+        assert worker_b.try_acquire() > 0
+
+    def test_acquire_paces_requests(self, make_limiter):
+        limiter = make_limiter(rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        # first token is immediate, the other four refill at 20/s
+        assert time.monotonic() - start >= 0.18
+
+    def test_cooldown_shared_between_processes(self, make_limiter):
+        worker_a = make_limiter()
+        worker_b = make_limiter()
+        assert worker_b.cooldown_remaining() == 0
+        worker_a.start_cooldown(60)
+        assert 58 <= worker_b.cooldown_remaining() <= 60
+
+    def test_falls_back_to_local_bucket_without_redis(self):
+        unreachable = redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.1)
+        limiter = RateLimiter("offline", rate=10, burst=2, client=unreachable)
+        assert limiter.try_acquire() == 0.0
+        assert limiter.try_acquire() == 0.0
+        assert limiter.try_acquire() > 0
+        limiter.start_cooldown(30)
+        assert 28 <= limiter.cooldown_remaining() <= 30
+
+
+@pytest.mark.unit
+class TestGoogleBooksRequest:
+    """_gb_request uses the shared limiter for pacing and cooldown."""
+
+    def test_skips_request_during_shared_cooldown(self, make_limiter):
+        limiter = make_limiter()
+        make_limiter().start_cooldown(60)  # another worker got a 429
+        with patch("stations.utils.google_books_limiter", return_value=limiter), \
+                patch("stations.utils.http_client.get_json") as get_json:
+            with pytest.raises(GoogleBooksRateLimited):
+                _gb_request("https://www.googleapis.com/books/v1/volumes?q=x")
+        get_json.assert_not_called()
+
+    def test_429_starts_shared_cooldown(self, make_limiter):
+        limiter = make_limiter()
+        other_worker = make_limiter()
+        error = http_client.HTTPError("https://www.googleapis.com/books/v1/volumes", 429)
+        with patch("stations.utils.google_books_limiter", return_value=limiter), \
+                patch("stations.utils.http_client.get_json", side_effect=error):
+            with pytest.raises(GoogleBooksRateLimited):
+                _gb_request("https://www.googleapis.com/books/v1/volumes?q=x")
+        assert other_worker.cooldown_remaining() > 0
+
+    def test_each_retry_takes_a_token(self, settings):
+        from unittest.mock import Mock
+        settings.HTTP_RETRIES = 2
+        settings.HTTP_RETRY_BACKOFF = 0
+        limiter = Mock(cooldown_remaining=Mock(return_value=0))
+        error = http_client.HTTPError("https://www.googleapis.com/books/v1/volumes", 503)
+        with patch("stations.utils.google_books_limiter", return_value=limiter), \
+                patch("stations.utils.http_client.get_json", side_effect=[error, {"items": []}]) as get_json:
+            assert _gb_request("https://www.googleapis.com/books/v1/volumes?q=x") == {"items": []}
+        assert limiter.acquire.call_count == 2
+        assert all(call.kwargs["retries"] == 0 for call in get_json.call_args_list)
+
+    def test_gives_up_after_http_retries(self, settings):
+        from unittest.mock import Mock
+        settings.HTTP_RETRIES = 1
+        settings.HTTP_RETRY_BACKOFF = 0
+        limiter = Mock(cooldown_remaining=Mock(return_value=0))
+        error = http_client.HTTPError("https://www.googleapis.com/books/v1/volumes", 500)
+        with patch("stations.utils.google_books_limiter", return_value=limiter), \
+                patch("stations.utils.http_client.get_json", side_effect=error):
+            with pytest.raises(http_client.HTTPError):
+                _gb_request("https://www.googleapis.com/books/v1/volumes?q=x")
+        assert limiter.acquire.call_count == 2
@@ -68,3 +68,167 @@ class TestEpisodePostSaveSignal:
 
         # If we get here without errors, transaction handling works
         assert episode.pk is not None
+
+
+@pytest.mark.unit
+class TestSearchVectorMaintenance:
+    """Book.search_vector follows edits to books and their topics."""
+
+    def _matches(self, book, term):
+        from stations.models import Book
+        from stations.search import search_books
+
+        return search_books(Book.objects.filter(pk=book.pk), term).exists()
+
+    def test_create_and_edit_book(self, book):
+        assert self._matches(book, 'test book')
+        book.title = 'Wolf Hall'
+        book.save()
+        assert self._matches(book, 'wolf')
+        assert not self._matches(book, 'test book')
+
+    def test_bookkeeping_save_leaves_vector(self, book):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        book.cover_fetch_error = 'timeout'
+        with CaptureQueriesContext(connection) as ctx:
+            book.save(update_fields=['cover_fetch_error'])
+        assert not any('search_vector' in q['sql'] for q in ctx.captured_queries)
+
+    def test_topic_add_rename_and_delete(self, book):
+        from stations.models import Topic
+
+        topic = Topic.objects.create(name='Seafaring', slug='seafaring-search')
+        book.topics.add(topic)
+        assert self._matches(book, 'seafaring')
+
+        topic.name = 'Mountaineering'
+        topic.save()
+        assert self._matches(book, 'mountaineering')
+        assert not self._matches(book, 'seafaring')
+
+        topic.delete()
+        assert not self._matches(book, 'mountaineering')
+
+    def test_reverse_topic_clear(self, book):
+        from stations.models import Topic
+
+        topic = Topic.objects.create(name='Seafaring', slug='seafaring-search')
+        topic.book_set.add(book)
+        assert self._matches(book, 'seafaring')
+        topic.book_set.clear()
+        assert not self._matches(book, 'seafaring')
+
+
+@pytest.mark.unit
+class TestStatsMaintenance:
+    """BrandStats/TopicStats follow verification, links and episode edits."""
+
+    def _brand_stats(self, brand):
+        from stations.models import BrandStats
+
+        return BrandStats.objects.get(brand=brand)
+
+    def _topic_count(self, topic):
+        from stations.models import TopicStats
+
+        return TopicStats.objects.get(topic=topic).book_count
+
+    @pytest.fixture
+    def topic(self):
+        from stations.models import Topic
+
+        return Topic.objects.create(name='Stats Topic', slug='stats-topic')
+
+    def test_verification_counts_book(self, book, episode, topic):
+        from stations.models import Book
+
+        book.topics.add(topic)
+        assert self._brand_stats(episode.brand).book_count == 0
+        assert self._topic_count(topic) == 0
+
+        book.verification_status = Book.VERIFICATION_VERIFIED
+        book.save()
+        assert self._brand_stats(episode.brand).book_count == 1
+        assert self._topic_count(topic) == 1
+
+    def test_episode_links(self, brand, topic):
+        from datetime import datetime, timezone as dt_tz
+        from stations.models import Book, Episode
+
+        book = Book.objects.create(title='Linked', verification_status=Book.VERIFICATION_VERIFIED)
+        book.topics.add(topic)
+        aired = datetime(2024, 5, 1, tzinfo=dt_tz.utc)
+        episode = Episode.objects.create(brand=brand, title='Ep', url='https://example.com/s1', aired_at=aired)
+
+        episode.books.add(book)
+        stats = self._brand_stats(brand)
+        assert (stats.book_count, stats.episode_count, stats.last_aired_at) == (1, 1, aired)
+        assert self._topic_count(topic) == 1
+
+        book.episodes.remove(episode)
+        assert self._brand_stats(brand).book_count == 0
+
+    def test_aired_at_change_and_delete(self, book, episode):
+        from datetime import datetime, timezone as dt_tz
+        from stations.models import Book
+
+        Book.objects.filter(pk=book.pk).update(verification_status=Book.VERIFICATION_VERIFIED)
+        episode.aired_at = datetime(2020, 1, 1, tzinfo=dt_tz.utc)
+        episode.save()
+        assert self._brand_stats(episode.brand).first_aired_at == episode.aired_at
+
+        brand = episode.brand
+        book.delete()
+        assert self._brand_stats(brand).book_count == 0
+        episode.delete()
+        assert self._brand_stats(brand).episode_count == 0
+
+    def test_pipeline_saves_skip_refresh(self, book):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        book.cover_fetch_error = 'timeout'
+        with CaptureQueriesContext(connection) as ctx:
+            book.save()
+        assert not any('stations_brandstats' in q['sql'] for q in ctx.captured_queries)
+
+    def test_new_episode_updates_brand_row_in_place(self, brand):
+        from datetime import datetime, timezone as dt_tz
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from stations.models import Episode
+
+        early = datetime(2021, 1, 1, tzinfo=dt_tz.utc)
+        late = datetime(2023, 1, 1, tzinfo=dt_tz.utc)
+        Episode.objects.create(brand=brand, title='Late', url='https://example.com/late', aired_at=late)
+        with CaptureQueriesContext(connection) as ctx:
+            Episode.objects.create(brand=brand, title='Early', url='https://example.com/early', aired_at=early)
+        stats_sql = [q['sql'] for q in ctx.captured_queries if 'stations_brandstats' in q['sql']]
+        assert len(stats_sql) == 1 and stats_sql[0].startswith('UPDATE')
+
+        stats = self._brand_stats(brand)
+        assert (stats.episode_count, stats.first_aired_at, stats.last_aired_at) == (2, early, late)
+
+    def test_update_fields_without_stats_fields_skip_refresh(self, book, episode):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from stations.models import Book
+
+        book.verification_status = Book.VERIFICATION_VERIFIED
+        episode.title = 'Renamed'
+        with CaptureQueriesContext(connection) as ctx:
+            book.save(update_fields=['title'])
+            episode.save(update_fields=['title'])
+        assert not any('stations_brandstats' in q['sql'] for q in ctx.captured_queries)
+
+    def test_loaded_instances_detect_changes(self, book, episode):
+        from stations.models import Book
+
+        Book.objects.filter(pk=book.pk).update(verification_status=Book.VERIFICATION_PENDING)
+        episode.books.add(book)
+        loaded = Book.objects.get(pk=book.pk)
+        loaded.verification_status = Book.VERIFICATION_VERIFIED
+        loaded.save()
+        assert self._brand_stats(episode.brand).book_count == 1
@@ -40,3 +40,249 @@ class TestContainsKeywordsTask:
 
             with pytest.raises(DatabaseError):
                 contains_keywords_task(episode.pk)
+
+
+@pytest.mark.celery
+@pytest.mark.unit
+class TestVerifyPendingBooks:
+    """Tests for sequential and fanned-out Google Books verification."""
+
+    FOUND = {'exists': True, 'title': 'Test Book Title', 'author': '', 'cover_url': ''}
+
+    @pytest.fixture
+    def no_cooldown(self):
+        with patch('stations.providers.cooldown_remaining', return_value=0) as remaining:
+            yield remaining
+
+    def test_fan_out_queues_one_task_per_pending_book(self, book, no_cooldown):
+        from stations.models import Book
+        from stations.tasks import verify_pending_books
+        other = Book.objects.create(title='Another Book')
+        Book.objects.create(title='Done', verification_status=Book.VERIFICATION_VERIFIED)
+
+        with patch('stations.tasks.verify_book_task.delay') as delay:
+            result = verify_pending_books(batch_size=10, fan_out=True)
+
+        assert result['queued'] == 2
+        assert {c.args[0] for c in delay.call_args_list} == {book.pk, other.pk}
+
+    def test_fan_out_skips_books_still_queued(self, book, no_cooldown):
+        from stations.models import Book
+        from stations.providers import ProviderUnavailable
+        from stations.tasks import verify_book_task, verify_pending_books
+        other = Book.objects.create(title='Another Book')
+
+        with patch('stations.tasks.verify_book_task.delay') as delay:
+            assert verify_pending_books(batch_size=1, fan_out=True)['queued'] == 1
+            assert verify_pending_books(batch_size=1, fan_out=True)['queued'] == 1  # the other book
+            assert verify_pending_books(batch_size=10, fan_out=True)['queued'] == 0
+        assert sorted(c.args[0] for c in delay.call_args_list) == sorted([book.pk, other.pk])
+
+        # Once a task has picked the book up, a later run may queue it again
+        with patch('stations.tasks._verify_book', side_effect=ProviderUnavailable('cooling')):
+            assert verify_book_task(book.pk) == 'rate_limited'
+        with patch('stations.tasks.verify_book_task.delay') as delay:
+            assert verify_pending_books(batch_size=10, fan_out=True)['queued'] == 1
+        delay.assert_called_once_with(book.pk)
+
+    def test_fan_out_does_not_queue_during_cooldown(self, book, no_cooldown):
+        from stations.tasks import verify_pending_books
+        no_cooldown.return_value = 3600
+
+        with patch('stations.tasks.verify_book_task.delay') as delay:
+            result = verify_pending_books(fan_out=True)
+
+        assert result['queued'] == 0
+        delay.assert_not_called()
+
+    def test_sequential_mode_counts_outcomes(self, book):
+        from stations.tasks import verify_pending_books
+        with patch('stations.utils.verify_book_exists', return_value=self.FOUND), \
+                patch('stations.utils.generate_bookshop_affiliate_url', return_value=''):
+            result = verify_pending_books()
+
+        assert result == {'verified': 1, 'not_found': 0, 'gb_requests': 0, 'stale_deleted': 0}
+
+    def test_book_task_verifies_book(self, book):
+        from stations.models import Book
+        from stations.tasks import verify_book_task
+        with patch('stations.utils.verify_book_exists', return_value=self.FOUND), \
+                patch('stations.utils.generate_bookshop_affiliate_url', return_value=''):
+            assert verify_book_task(book.pk) == 'verified'
+
+        book.refresh_from_db()
+        assert book.verification_status == Book.VERIFICATION_VERIFIED
+
+    def test_merge_check_runs_under_identity_lock(self, book):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from stations.models import Book
+        from stations.tasks import verify_book_task
+        verified = Book.objects.create(
+            title='Test Book Title', verification_status=Book.VERIFICATION_VERIFIED
+        )
+        with patch('stations.utils.verify_book_exists', return_value=self.FOUND), \
+                CaptureQueriesContext(connection) as queries:
+            assert verify_book_task(book.pk) == 'merged'
+        sql = [q['sql'] for q in queries.captured_queries]
+        lock = next(i for i, q in enumerate(sql) if 'pg_advisory_xact_lock' in q)
+        assert any('stations_book' in q for q in sql[lock + 1:])  # existing-book check after the lock
+        assert not Book.objects.filter(pk=book.pk).exists()
+        assert verified.episodes.count() == 1
+
+    def test_book_task_is_routed_to_verification_queue(self, settings):
+        assert settings.CELERY_TASK_ROUTES['stations.tasks.verify_book_task'] == {'queue': 'verification'}
+
+    def test_book_task_skips_already_verified_book(self, book):
+        from stations.models import Book
+        from stations.tasks import verify_book_task
+        Book.objects.filter(pk=book.pk).update(verification_status=Book.VERIFICATION_VERIFIED)
+        with patch('stations.utils.verify_book_exists') as verify:
+            assert verify_book_task(book.pk) == 'skipped'
+        verify.assert_not_called()
+
+    def test_book_task_skips_book_claimed_by_another_worker(self, book):
+        from django.core.cache import cache
+        from stations.tasks import verify_book_task
+        cache.add(f'verify-book:{book.pk}', 1)
+        with patch('stations.utils.verify_book_exists') as verify:
+            assert verify_book_task(book.pk) == 'locked'
+        verify.assert_not_called()
+
+    def test_book_task_leaves_book_pending_when_rate_limited(self, book):
+        from stations.models import Book
+        from stations.tasks import verify_book_task
+        from stations.utils import GoogleBooksRateLimited
+        with patch('stations.utils.verify_book_exists', side_effect=GoogleBooksRateLimited('cooldown')):
+            assert verify_book_task(book.pk) == 'rate_limited'
+
+        book.refresh_from_db()
+        assert book.verification_status == Book.VERIFICATION_PENDING
+
+
+@pytest.fixture
+def eager_celery(monkeypatch):
+    """
+    Run queued tasks inline so groups complete within the test, with an
+    in-memory result backend so GroupResult.save() needs no Redis.
+    """
+    from celery.backends.cache import CacheBackend
+    from paperwaves.celery import app
+    monkeypatch.setattr(app, '_backend_cache', CacheBackend(app=app, url='memory://'))
+    app.conf.update(task_always_eager=True, task_eager_propagates=True)
+    yield
+    app.conf.update(task_always_eager=False, task_eager_propagates=False)
+
+
+@pytest.mark.celery
+@pytest.mark.unit
+class TestCoverQueue:
+    """Cover downloads run as their own task, fanned out for bulk refetches."""
+
+    def test_verification_queues_cover_instead_of_downloading(self, book):
+        from stations.tasks import verify_book_task
+        found = dict(TestVerifyPendingBooks.FOUND, cover_url='https://example.com/c.jpg')
+        with patch('stations.utils.verify_book_exists', return_value=found), \
+                patch('stations.utils.generate_bookshop_affiliate_url', return_value=''), \
+                patch('stations.ai_utils.download_and_save_cover') as download, \
+                patch('stations.tasks.fetch_cover_task.delay') as delay:
+            assert verify_book_task(book.pk) == 'verified'
+        delay.assert_called_once_with(book.pk, 'https://example.com/c.jpg')
+        download.assert_not_called()
+
+    def test_cover_task_is_routed_to_covers_queue(self, settings):
+        assert settings.CELERY_TASK_ROUTES['stations.tasks.fetch_cover_task'] == {'queue': 'covers'}
+
+    def test_fetch_downloads_given_url(self, book):
+        from stations.tasks import fetch_cover_task
+        with patch('stations.ai_utils.download_and_save_cover', return_value=True) as download, \
+                patch('stations.utils.lookup_book') as lookup:
+            assert fetch_cover_task(book.pk, 'https://example.com/c.jpg') == 'downloaded'
+        lookup.assert_not_called()
+        assert download.call_args.args[1] == 'https://example.com/c.jpg'
+
+    def test_fetch_records_missing_cover(self, book):
+        from stations.tasks import fetch_cover_task
+        with patch('stations.utils.lookup_book', return_value={'exists': True, 'cover_url': ''}):
+            assert fetch_cover_task(book.pk) == 'no_cover'
+        book.refresh_from_db()
+        assert book.cover_fetch_error == 'No cover available on Google Books'
+
+    def test_fetch_gives_up_after_repeated_cooldowns(self, book):
+        from stations.tasks import fetch_cover_task
+        from stations.utils import GoogleBooksRateLimited
+        with patch('stations.utils.lookup_book', side_effect=GoogleBooksRateLimited('cooldown')):
+            result = fetch_cover_task.apply(args=(book.pk,), retries=fetch_cover_task.max_retries)
+        assert result.get() == 'rate_limited'
+
+    def test_bulk_refetch_reports_progress(self, book, eager_celery):
+        from stations.models import Book
+        from stations.tasks import cover_batch_progress, queue_cover_fetches
+        other = Book.objects.create(title='Another Book')
+        lookups = {book.title: 'https://example.com/c.jpg', other.title: ''}
+        with patch('stations.utils.lookup_book',
+                   side_effect=lambda b, refresh: {'exists': True, 'cover_url': lookups[b.title]}), \
+                patch('stations.ai_utils.download_and_save_cover', return_value=True):
+            result = queue_cover_fetches([book.pk, other.pk])
+        assert cover_batch_progress(result) == {'total': 2, 'done': 2, 'downloaded': 1, 'no_cover': 1}
+
+    def test_download_command_waits_for_batch(self, book, eager_celery):
+        import io
+        from django.core.management import call_command
+        out = io.StringIO()
+        with patch('stations.utils.lookup_book',
+                   return_value={'exists': True, 'cover_url': 'https://example.com/c.jpg'}), \
+                patch('stations.ai_utils.download_and_save_cover', return_value=True) as download:
+            call_command('download_book_covers', stdout=out)
+        download.assert_called_once()
+        assert download.call_args.kwargs == {'allow_fallback': True}
+        assert 'Completed: 1 downloaded' in out.getvalue()
+
+    def test_download_command_gives_up_on_stalled_batch(self, book):
+        import io
+        from django.core.management import call_command
+        out, err = io.StringIO(), io.StringIO()
+        stuck = {'total': 1, 'done': 0}
+        with patch('stations.management.commands.download_book_covers.queue_cover_fetches') as queue, \
+                patch('stations.management.commands.download_book_covers.cover_batch_progress',
+                      return_value=stuck):
+            queue.return_value.id = 'batch-1'
+            call_command('download_book_covers', poll_interval=0, stall_polls=3, stdout=out, stderr=err)
+        assert 'No progress in 3 polls' in err.getvalue()
+        assert 'Stopped waiting at 0/1' in out.getvalue()
+
+
+@pytest.mark.celery
+@pytest.mark.unit
+class TestMultiEpisodeSweep:
+    """With EXTRACTION_EPISODES_PER_PROMPT > 1 the sweep packs episodes into shared calls."""
+
+    def test_sweep_extracts_several_episodes_per_call(self, brand, settings, monkeypatch, eager_celery):
+        from stations import ai_utils
+        from stations.fake_services import FakeServices
+        from stations.tasks import extract_books_from_new_episodes
+
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+        monkeypatch.setattr(ai_utils, '_extractor', None)
+        settings.EXTRACTION_EPISODES_PER_PROMPT = 2
+        descriptions = ['Ada Hale discusses the novel The Salt Road.', 'Arts news.', 'Live music.']
+        episodes = [
+            Episode.objects.create(
+                brand=brand, title=f'Episode {i}', url=f'https://example.com/sweep-{i}',
+                scraped_data={'title': f'Episode {i}', 'description': d},
+            )
+            for i, d in enumerate(descriptions)
+        ]
+        with FakeServices() as services:
+            settings.ANTHROPIC_BASE_URL = f'{services.url}/anthropic'
+            result = extract_books_from_new_episodes()
+            calls = services.stats()['anthropic']['calls']
+
+        assert result['episodes_processed'] == 3
+        assert calls == 2  # one call for two episodes; a lone episode goes single
+        stages = [Episode.objects.get(pk=e.pk).stage for e in episodes]
+        assert stages == [
+            Episode.STAGE_VERIFICATION_QUEUED,
+            Episode.STAGE_EXTRACTION_NO_BOOKS,
+            Episode.STAGE_EXTRACTION_NO_BOOKS,
+        ]
@@ -61,3 +61,248 @@ class TestContainsKeywords:
         # This will be False because we check for lowercase 'book'
         # But title has 'BOOK' in caps
         assert result is False
+
+
+@pytest.mark.unit
+class TestGoogleBooksLookupCache:
+    """verify_book_exists reuses BookLookup rows instead of calling the API."""
+
+    FOUND = {
+        'exists': True, 'title': 'Wolf Hall', 'author': 'Hilary Mantel',
+        'cover_url': 'https://books.google.com/cover.jpg', 'isbn': '9780007230181',
+        'description': '', 'search_snippet': 'Tudor England',
+    }
+
+    def test_found_result_is_reused_for_normalized_title(self):
+        from unittest.mock import patch
+        from stations.utils import verify_book_exists
+        with patch('stations.utils._fetch_google_books', return_value=self.FOUND) as fetch:
+            first = verify_book_exists('Wolf Hall', 'Hilary Mantel')
+            second = verify_book_exists('  wolf hall!', 'HILARY  MANTEL')
+        assert fetch.call_count == 1
+        assert second == dict(first, requests=0)
+        assert second['isbn'] == '9780007230181'
+        assert second['search_snippet'] == 'Tudor England'
+
+    def test_outcomes_get_their_own_ttl(self, settings):
+        from unittest.mock import patch
+        from django.utils import timezone
+        from stations.models import BookLookup
+        from stations.utils import verify_book_exists
+        settings.GOOGLE_BOOKS_CACHE_TTL_FOUND = 3000
+        settings.GOOGLE_BOOKS_CACHE_TTL_NOT_FOUND = 2000
+        settings.GOOGLE_BOOKS_CACHE_TTL_ERROR = 1000
+        results = {
+            'Found': self.FOUND,
+            'Missing': {'exists': False, 'title': 'Missing', 'author': '', 'cover_url': None, 'isbn': None},
+            'Broken': {'exists': False, 'title': 'Broken', 'author': '', 'cover_url': None, 'isbn': None,
+                       'error': 'timed out'},
+        }
+        with patch('stations.utils._fetch_google_books', side_effect=lambda t, a: results[t]):
+            for title in results:
+                verify_book_exists(title)
+
+        now = timezone.now()
+        ttls = {
+            lookup.result: (lookup.expires_at - now).total_seconds()
+            for lookup in BookLookup.objects.all()
+        }
+        assert ttls[BookLookup.RESULT_FOUND] == pytest.approx(3000, abs=5)
+        assert ttls[BookLookup.RESULT_NOT_FOUND] == pytest.approx(2000, abs=5)
+        assert ttls[BookLookup.RESULT_ERROR] == pytest.approx(1000, abs=5)
+
+    def test_not_found_echoes_caller_query(self):
+        from unittest.mock import patch
+        from stations.utils import verify_book_exists
+        missing = {'exists': False, 'title': 'No Such Book', 'author': '', 'cover_url': None, 'isbn': None}
+        with patch('stations.utils._fetch_google_books', return_value=missing) as fetch:
+            verify_book_exists('No Such Book')
+            result = verify_book_exists('no such book')
+        assert fetch.call_count == 1
+        assert result['exists'] is False
+        assert result['title'] == 'no such book'
+
+    def test_expired_lookup_is_fetched_again(self):
+        from datetime import timedelta
+        from unittest.mock import patch
+        from django.utils import timezone
+        from stations.models import BookLookup
+        from stations.utils import verify_book_exists
+        with patch('stations.utils._fetch_google_books', return_value=self.FOUND) as fetch:
+            verify_book_exists('Wolf Hall', 'Hilary Mantel')
+            BookLookup.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+            verify_book_exists('Wolf Hall', 'Hilary Mantel')
+        assert fetch.call_count == 2
+        assert BookLookup.objects.count() == 1
+
+    def test_refresh_bypasses_cache(self):
+        from unittest.mock import patch
+        from stations.utils import verify_book_exists
+        with patch('stations.utils._fetch_google_books', return_value=self.FOUND) as fetch:
+            verify_book_exists('Wolf Hall', 'Hilary Mantel')
+            verify_book_exists('Wolf Hall', 'Hilary Mantel', refresh=True)
+        assert fetch.call_count == 2
+
+    def test_rate_limit_is_not_cached(self):
+        from unittest.mock import patch
+        from stations.models import BookLookup
+        from stations.utils import GoogleBooksRateLimited, verify_book_exists
+        with patch('stations.utils._fetch_google_books', side_effect=GoogleBooksRateLimited('429')):
+            with pytest.raises(GoogleBooksRateLimited):
+                verify_book_exists('Wolf Hall', 'Hilary Mantel')
+        assert not BookLookup.objects.exists()
+
+
+@pytest.mark.unit
+class TestGoogleBooksFastPath:
+    """Books with a stored volume id / ISBN are looked up with one request."""
+
+    VOLUME = {
+        'id': 'vol123',
+        'volumeInfo': {
+            'title': 'Wolf Hall',
+            'authors': ['Hilary Mantel'],
+            'industryIdentifiers': [
+                {'type': 'ISBN_10', 'identifier': '0007230184'},
+                {'type': 'ISBN_13', 'identifier': '9780007230181'},
+            ],
+            'imageLinks': {'thumbnail': 'https://books.google.com/t.jpg', 'medium': 'https://books.google.com/m.jpg'},
+        },
+    }
+
+    def test_stored_volume_id_takes_one_partial_request(self):
+        from unittest.mock import patch
+        from stations.models import Book
+        from stations.utils import lookup_book
+        book = Book.objects.create(title='Wolf Hall', author='Hilary Mantel', google_volume_id='vol123')
+        with patch('stations.utils._gb_request', return_value=self.VOLUME) as request:
+            result = lookup_book(book)
+
+        request.assert_called_once()
+        url = request.call_args.args[0]
+        assert '/volumes/vol123?' in url
+        assert 'fields=' in url
+        assert result['cover_url'] == 'https://books.google.com/m.jpg'
+        assert result['isbn'] == '9780007230181'
+        assert result['volume_id'] == 'vol123'
+
+    def test_isbn_only_uses_isbn_query(self):
+        from unittest.mock import patch
+        from stations.models import Book
+        from stations.utils import lookup_book
+        book = Book.objects.create(title='Wolf Hall', author='Hilary Mantel', isbn='9780007230181')
+        with patch('stations.utils._gb_api_key', return_value=''), \
+                patch('stations.utils._gb_request', return_value={'items': [self.VOLUME]}) as request:
+            result = lookup_book(book)
+
+        request.assert_called_once()
+        assert 'isbn%3A9780007230181' in request.call_args.args[0]
+        assert result['volume_id'] == 'vol123'
+
+    def test_falls_back_to_search_when_volume_fetch_fails(self):
+        from unittest.mock import patch
+        from stations.models import Book
+        from stations.utils import lookup_book
+        book = Book.objects.create(title='Wolf Hall', author='Hilary Mantel', google_volume_id='gone')
+        found = {'exists': True, 'title': 'Wolf Hall', 'author': 'Hilary Mantel', 'volume_id': 'vol123'}
+        with patch('stations.utils._gb_request', side_effect=OSError('404')), \
+                patch('stations.utils._fetch_google_books', return_value=found) as search:
+            assert lookup_book(book) == dict(found, provider='google_books')
+        search.assert_called_once_with('Wolf Hall', 'Hilary Mantel')
+
+    def test_book_without_identifiers_searches(self):
+        from unittest.mock import patch
+        from stations.models import Book
+        from stations.utils import lookup_book
+        book = Book.objects.create(title='Wolf Hall', author='Hilary Mantel')
+        with patch('stations.utils._gb_request') as request, \
+                patch('stations.utils._fetch_google_books', return_value={'exists': False}) as search:
+            lookup_book(book)
+        request.assert_not_called()
+        search.assert_called_once()
+
+    def test_verification_stores_identifiers(self, book):
+        from unittest.mock import patch
+        from stations.models import Book
+        from stations.tasks import verify_book_task
+        found = {'exists': True, 'title': 'Test Book Title', 'author': '', 'cover_url': '',
+                 'isbn': '9780007230181', 'volume_id': 'vol123'}
+        with patch('stations.utils._fetch_google_books', return_value=found), \
+                patch('stations.utils.generate_bookshop_affiliate_url', return_value=''):
+            assert verify_book_task(book.pk) == 'verified'
+
+        book.refresh_from_db()
+        assert book.verification_status == Book.VERIFICATION_VERIFIED
+        assert book.google_volume_id == 'vol123'
+        assert book.isbn == '9780007230181'
+
+
+@pytest.mark.unit
+class TestGoogleBooksSearchStrategy:
+    """Search lookups fetch volume detail lazily and report request counts."""
+
+    @staticmethod
+    def item(vol_id, title='Wolf Hall', cover=True):
+        info = {'title': title, 'authors': ['Hilary Mantel']}
+        if cover:
+            info['imageLinks'] = {'thumbnail': f'https://books.google.com/{vol_id}-search.jpg'}
+        return {'id': vol_id, 'volumeInfo': info}
+
+    @staticmethod
+    def fake_api(items, detail_sizes):
+        """_gb_request stand-in: search returns items, detail returns detail_sizes[vol_id]."""
+        def request(url):
+            if '/volumes/' in url:
+                vol_id = url.split('/volumes/')[1].split('?')[0]
+                links = {size: f'https://books.google.com/{vol_id}-{size}.jpg' for size in detail_sizes[vol_id]}
+                return {'id': vol_id, 'volumeInfo': {'imageLinks': links}}
+            return {'items': items}
+        return request
+
+    def lookup(self, items, detail_sizes, title='Wolf Hall', author='Hilary Mantel'):
+        from unittest.mock import patch
+        from stations.utils import _fetch_google_books
+        with patch('stations.utils._gb_api_key', return_value='key'), \
+                patch('stations.utils._gb_request', side_effect=self.fake_api(items, detail_sizes)) as request:
+            result = _fetch_google_books(title, author)
+        return result, [c.args[0] for c in request.call_args_list]
+
+    def test_stops_at_first_large_cover(self):
+        items = [self.item('a'), self.item('b'), self.item('c')]
+        result, urls = self.lookup(items, {'a': ['large', 'thumbnail'], 'b': ['large'], 'c': ['large']})
+        assert result['requests'] == 2 == len(urls)
+        assert result['cover_url'] == 'https://books.google.com/a-large.jpg'
+        assert result['volume_id'] == 'a'
+
+    def test_keeps_best_cover_when_no_large_exists(self):
+        items = [self.item('a'), self.item('b'), self.item('c')]
+        result, _ = self.lookup(items, {'a': ['thumbnail'], 'b': ['medium'], 'c': ['small']})
+        assert result['requests'] == 4
+        assert result['cover_url'] == 'https://books.google.com/b-medium.jpg'
+        # The stored id stays the matched result's, not the cover edition's
+        assert (result['volume_id'], result['cover_volume_id']) == ('a', 'b')
+
+    def test_skips_detail_for_results_without_covers(self):
+        items = [self.item('a', cover=False), self.item('b', cover=False), self.item('c')]
+        result, urls = self.lookup(items, {'c': ['large']})
+        assert result['requests'] == 2
+        assert not any('/volumes/a' in url or '/volumes/b' in url for url in urls)
+
+    def test_skips_detail_when_top_result_fails_sanity_check(self):
+        items = [self.item('a', title='A Study Guide to Something Else'), self.item('b')]
+        result, urls = self.lookup(items, {'a': ['large'], 'b': ['large']})
+        assert result['exists'] is True
+        assert result['cover_url'] is None
+        assert result['requests'] == 1 == len(urls)
+
+    def test_requests_partial_responses(self):
+        _, urls = self.lookup([self.item('a')], {'a': ['large']})
+        assert all('fields=' in url for url in urls)
+
+    def test_cached_lookup_reports_zero_requests(self):
+        from unittest.mock import patch
+        from stations.utils import verify_book_exists
+        with patch('stations.utils._gb_api_key', return_value='key'), \
+                patch('stations.utils._gb_request', side_effect=self.fake_api([self.item('a')], {'a': ['large']})):
+            assert verify_book_exists('Wolf Hall', 'Hilary Mantel')['requests'] == 2
+            assert verify_book_exists('Wolf Hall', 'Hilary Mantel')['requests'] == 0
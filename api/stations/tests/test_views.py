@@ -40,3 +40,400 @@ class TestStationViewSet:
 
     # Note: StationViewSet is ReadOnlyModelViewSet, so create/update/delete operations
     # are not supported and would return 405 Method Not Allowed
+
+
+@pytest.mark.unit
+class TestBookViewSet:
+    """Tests for the BookViewSet API."""
+
+    def _verified_book(self, brand, title, aired_at, url):
+        from stations.models import Book, Episode
+
+        episode = Episode.objects.create(brand=brand, title=title, url=url, aired_at=aired_at)
+        book = Book.objects.create(
+            title=title, author='Author', verification_status=Book.VERIFICATION_VERIFIED,
+        )
+        book.episodes.add(episode)
+        Book.refresh_latest_aired([book.pk])
+        return book
+
+    def test_list_ordered_by_latest_aired(self, api_client, brand):
+        """Books are listed newest-aired first, undated books last."""
+        from datetime import datetime, timezone as dt_tz
+
+        old = self._verified_book(brand, 'Old', datetime(2023, 1, 1, tzinfo=dt_tz.utc), 'https://example.com/o')
+        new = self._verified_book(brand, 'New', datetime(2025, 1, 1, tzinfo=dt_tz.utc), 'https://example.com/n')
+        undated = self._verified_book(brand, 'Undated', None, 'https://example.com/u')
+
+        response = api_client.get('/api/books/')
+        assert response.status_code == status.HTTP_200_OK
+        assert [b['id'] for b in response.data['results']] == [new.pk, old.pk, undated.pk]
+
+    def test_brand_filter_does_not_duplicate(self, api_client, brand):
+        """A book on two episodes of the same brand appears once."""
+        from datetime import datetime, timezone as dt_tz
+        from stations.models import Episode
+
+        book = self._verified_book(brand, 'Twice', datetime(2024, 1, 1, tzinfo=dt_tz.utc), 'https://example.com/t1')
+        book.episodes.add(Episode.objects.create(brand=brand, title='Again', url='https://example.com/t2'))
+
+        response = api_client.get(f'/api/books/?brand_slug={brand.slug}')
+        assert response.data['count'] == 1
+
+
+@pytest.mark.unit
+class TestCompactBookList:
+    """Tests for ?view=compact on book listings."""
+
+    @pytest.fixture
+    def books(self, brand):
+        from datetime import datetime, timezone as dt_tz
+        from stations.models import Book, Episode
+
+        created = []
+        for i in range(3):
+            book = Book.objects.create(
+                title=f'Compact {i}', author='Author', verification_status=Book.VERIFICATION_VERIFIED,
+            )
+            for j in range(i + 1):
+                book.episodes.add(Episode.objects.create(
+                    brand=brand, title=f'Ep {i}.{j}', url=f'https://example.com/c{i}-{j}',
+                    aired_at=datetime(2024, 1, j + 1, tzinfo=dt_tz.utc),
+                ))
+            created.append(book)
+        Book.refresh_latest_aired()
+        return created
+
+    def test_compact_shape(self, api_client, brand, books):
+        """Compact books carry the latest show and an episode count, not episodes."""
+        response = api_client.get('/api/books/?view=compact')
+        assert response.status_code == status.HTTP_200_OK
+        by_id = {b['id']: b for b in response.data['results']}
+        item = by_id[books[2].pk]
+        assert 'episodes' not in item
+        assert item['episode_count'] == 3
+        assert item['show'] == {
+            'slug': brand.slug,
+            'name': brand.name,
+            'brand_color': brand.brand_color,
+            'station_name': brand.station.name,
+        }
+
+    def test_latest_show_is_one_subquery(self, books):
+        """The show's columns share a single latest-episode lookup per row."""
+        from stations.models import Book
+        from stations.views import with_list_summary
+
+        sql = str(with_list_summary(Book.objects.all()).query)
+        assert sql.count('"aired_at" DESC NULLS LAST') == 1
+
+    def test_compact_query_count_is_flat(self, api_client, books, django_assert_max_num_queries):
+        """A compact page is count + books + topics, whatever the page size."""
+        with django_assert_max_num_queries(3):
+            api_client.get('/api/books/?view=compact&page_size=100')
+
+    def test_detail_keeps_nested_form(self, api_client, books):
+        """view=compact does not change the detail endpoint."""
+        response = api_client.get(f'/api/books/{books[0].slug}/?view=compact')
+        assert 'episodes' in response.data
+        assert response.data['episodes'][0]['brand']['book_count'] == 3
+
+    def test_brand_books_compact(self, api_client, brand, books):
+        """The brand books endpoint accepts view=compact, with or without a cursor."""
+        for url in (f'/api/brands/{brand.slug}/books/?view=compact',
+                    f'/api/brands/{brand.slug}/books/?view=compact&cursor='):
+            results = api_client.get(url).data['results']
+            assert len(results) == 3
+            assert all(b['show']['slug'] == brand.slug for b in results)
+
+
+@pytest.mark.unit
+class TestBookSearch:
+    """Tests for ?search full-text search on book listings."""
+
+    def _book(self, episode, title, author='', description=''):
+        from stations.models import Book
+
+        book = Book.objects.create(
+            title=title, author=author, description=description,
+            verification_status=Book.VERIFICATION_VERIFIED,
+        )
+        book.episodes.add(episode)
+        return book
+
+    def _search(self, api_client, term):
+        response = api_client.get('/api/books/', {'search': term})
+        assert response.status_code == status.HTTP_200_OK
+        return [b['id'] for b in response.data['results']]
+
+    def test_title_match_ranks_above_description(self, api_client, episode):
+        in_desc = self._book(episode, 'Atonement', description='A story about whales and the sea')
+        in_title = self._book(episode, 'Whales', author='Someone')
+        assert self._search(api_client, 'whales') == [in_title.pk, in_desc.pk]
+
+    def test_prefix_match(self, api_client, episode):
+        book = self._book(episode, 'The Hobbit', author='J.R.R. Tolkien')
+        assert self._search(api_client, 'tolk') == [book.pk]
+        assert self._search(api_client, 'hobbit tolki') == [book.pk]
+
+    def test_accents_are_ignored(self, api_client, episode):
+        book = self._book(episode, 'One Hundred Years of Solitude', author='Gabriel García Márquez')
+        assert self._search(api_client, 'garcia marquez') == [book.pk]
+        assert self._search(api_client, 'García') == [book.pk]
+
+    def test_search_with_cursor_keeps_rank_order(self, api_client, episode):
+        """Cursor order (aired, id) would put the newer book first; search keeps rank."""
+        in_title = self._book(episode, 'Whales', author='Someone')
+        in_desc = self._book(episode, 'Atonement', description='A story about whales and the sea')
+        response = api_client.get('/api/books/', {'search': 'whales', 'cursor': ''})
+        assert response.status_code == status.HTTP_200_OK
+        assert [b['id'] for b in response.data['results']] == [in_title.pk, in_desc.pk]
+        assert response.data['count'] == 2
+
+    def test_topic_names_are_searchable(self, api_client, episode):
+        from stations.models import Topic
+
+        book = self._book(episode, 'Moby-Dick')
+        book.topics.add(Topic.objects.create(name='Maritime', slug='maritime-search'))
+        assert self._search(api_client, 'maritime') == [book.pk]
+
+    def test_punctuation_only_query_returns_everything(self, api_client, episode):
+        book = self._book(episode, 'Beloved')
+        assert self._search(api_client, '&|!') == [book.pk]
+
+
+@pytest.mark.unit
+class TestFuzzySearch:
+    """Tests for the /api/search/ trigram endpoint."""
+
+    def _book(self, episode, title, author, status_=None):
+        from stations.models import Book
+
+        book = Book.objects.create(
+            title=title, author=author,
+            verification_status=status_ or Book.VERIFICATION_VERIFIED,
+        )
+        book.episodes.add(episode)
+        return book
+
+    def test_misspelled_author(self, api_client, episode):
+        book = self._book(episode, 'The Hobbit', 'J.R.R. Tolkien')
+        self._book(episode, 'Wolf Hall', 'Hilary Mantel')
+        response = api_client.get('/api/search/', {'q': 'tolkein'})
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()['results']
+        assert [r['id'] for r in results] == [book.pk]
+        assert results[0]['author_similarity'] > results[0]['title_similarity']
+        assert results[0]['score'] == results[0]['author_similarity']
+        assert results[0]['show']['slug'] == episode.brand.slug
+
+    def test_ranked_by_similarity(self, api_client, episode):
+        close = self._book(episode, 'Midnight Children', 'Salman Rushdie')
+        closer = self._book(episode, "Midnight's Children", 'Salman Rushdie')
+        ids = [r['id'] for r in api_client.get('/api/search/', {'q': "midnight's children"}).json()['results']]
+        assert ids == [closer.pk, close.pk]
+
+    def test_unverified_books_excluded(self, api_client, episode):
+        from stations.models import Book
+
+        self._book(episode, 'The Hobbit', 'J.R.R. Tolkien', Book.VERIFICATION_PENDING)
+        assert api_client.get('/api/search/', {'q': 'tolkien'}).json()['results'] == []
+
+    def test_list_filters_apply(self, api_client, episode, station):
+        from stations.models import Brand, Episode
+
+        other = Brand.objects.create(station=station, name='Other Show', url='https://example.com/other')
+        mine = self._book(episode, 'The Hobbit', 'J.R.R. Tolkien')
+        self._book(
+            Episode.objects.create(brand=other, title='Other', url='https://example.com/o1'),
+            'The Silmarillion', 'J.R.R. Tolkien',
+        )
+        results = api_client.get('/api/search/', {'q': 'tolkien', 'brand_slug': episode.brand.slug}).json()['results']
+        assert [r['id'] for r in results] == [mine.pk]
+
+    def test_short_query_returns_nothing(self, api_client, episode):
+        self._book(episode, 'It', 'Stephen King')
+        assert api_client.get('/api/search/', {'q': 'it'}).json() == {'query': 'it', 'results': []}
+
+
+@pytest.mark.unit
+class TestBookKeysetPagination:
+    """Tests for ?cursor keyset pagination on book listings."""
+
+    @pytest.fixture
+    def books(self, brand):
+        from datetime import datetime, timezone as dt_tz
+        from stations.models import Book, Episode
+
+        # Two books share an aired date and two are undated, to exercise ties and NULLs
+        dates = [
+            datetime(2025, 1, 1, tzinfo=dt_tz.utc),
+            datetime(2024, 1, 1, tzinfo=dt_tz.utc),
+            datetime(2024, 1, 1, tzinfo=dt_tz.utc),
+            None,
+            None,
+        ]
+        created = []
+        for i, aired_at in enumerate(dates):
+            episode = Episode.objects.create(
+                brand=brand, title=f'Ep {i}', url=f'https://example.com/k{i}', aired_at=aired_at,
+            )
+            book = Book.objects.create(
+                title=f'Keyset {i}', author='Author', verification_status=Book.VERIFICATION_VERIFIED,
+            )
+            book.episodes.add(episode)
+            created.append(book)
+        Book.refresh_latest_aired()
+        return created
+
+    def _walk(self, api_client, url):
+        from urllib.parse import urlsplit
+
+        ids = []
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            ids.extend(b['id'] for b in response.data['results'])
+            next_url = response.data['next']
+            url = None
+            if next_url:
+                parts = urlsplit(next_url)
+                url = f'{parts.path}?{parts.query}'
+        return ids
+
+    def test_walk_matches_page_number_order(self, api_client, books):
+        """Walking the cursor visits every book once, in list order."""
+        expected = [b['id'] for b in api_client.get('/api/books/?page_size=100').data['results']]
+        assert self._walk(api_client, '/api/books/?cursor=&page_size=2') == expected
+        assert len(expected) == len(books)
+
+    def test_count_is_optional(self, api_client, books):
+        """count is omitted unless requested."""
+        assert api_client.get('/api/books/?cursor=').data['count'] is None
+        assert api_client.get('/api/books/?cursor=&count=1').data['count'] == len(books)
+
+    def test_brand_books_cursor(self, api_client, brand, books):
+        """The brand books endpoint supports the same cursor walk."""
+        ids = self._walk(api_client, f'/api/brands/{brand.slug}/books/?cursor=&page_size=2')
+        assert sorted(ids) == sorted(b.pk for b in books)
+
+    def test_invalid_cursor(self, api_client, books):
+        """A garbled cursor is a 404, not a server error."""
+        response = api_client.get('/api/books/?cursor=not-a-cursor')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.unit
+class TestTopicEndpoints:
+    """Topic endpoints read verified counts from TopicStats."""
+
+    def test_counts_only_verified_books(self, api_client, episode):
+        from stations.models import Book, Topic
+
+        topic = Topic.objects.create(name='Counted', slug='counted-topic')
+        for status_ in (Book.VERIFICATION_VERIFIED, Book.VERIFICATION_PENDING):
+            book = Book.objects.create(title=f'Counted {status_}', verification_status=status_)
+            book.episodes.add(episode)
+            book.topics.add(topic)
+
+        listed = {t['slug']: t['book_count'] for t in api_client.get('/api/topics/').json()}
+        assert listed['counted-topic'] == 1
+        assert api_client.get('/api/topics/counted-topic/').json()['book_count'] == 1
+
+    def test_topic_without_stats_row(self, api_client):
+        from stations.models import Topic, TopicStats
+
+        topic = Topic.objects.create(name='Fresh', slug='fresh-topic')
+        TopicStats.objects.filter(topic=topic).delete()
+        assert api_client.get('/api/topics/fresh-topic/').json()['book_count'] == 0
+
+
+@pytest.mark.unit
+class TestApiResponseCache:
+    """Tests for the generation-keyed public API response cache."""
+
+    def test_repeat_request_is_cache_hit(self, api_client, station):
+        from stations.models import Topic
+
+        Topic.objects.create(name='Cache Test', slug='cache-test')
+        first = api_client.get('/api/topics/cache-test/')
+        second = api_client.get('/api/topics/cache-test/')
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert second.content == first.content
+
+    def test_query_string_order_is_normalized(self, api_client):
+        api_client.get('/api/books/?page=1&page_size=5')
+        response = api_client.get('/api/books/?page_size=5&page=1')
+        assert response['X-Cache'] == 'HIT'
+
+    def test_write_invalidates(self, api_client, django_capture_on_commit_callbacks):
+        from stations.models import Topic
+
+        topic = Topic.objects.create(name='Cache Test', slug='cache-test')
+        api_client.get('/api/topics/cache-test/')
+        with django_capture_on_commit_callbacks(execute=True):
+            topic.description = 'Novels'
+            topic.save()
+        response = api_client.get('/api/topics/cache-test/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['description'] == 'Novels'
+
+    def test_pipeline_bookkeeping_does_not_invalidate(self, api_client, episode, django_capture_on_commit_callbacks):
+        from stations.models import Episode
+
+        api_client.get('/api/books/')
+        with django_capture_on_commit_callbacks(execute=True):
+            episode.stage = Episode.STAGE_EXTRACTING
+            episode.save(update_fields=['stage'])
+        assert api_client.get('/api/books/')['X-Cache'] == 'HIT'
+
+    def test_host_and_scheme_are_part_of_key(self, api_client, settings):
+        settings.ALLOWED_HOSTS = ['testserver', 'other.example']
+        api_client.get('/api/books/')
+        assert api_client.get('/api/books/', HTTP_HOST='other.example')['X-Cache'] == 'MISS'
+        assert api_client.get('/api/books/', secure=True)['X-Cache'] == 'MISS'
+        assert api_client.get('/api/books/')['X-Cache'] == 'HIT'
+
+    def test_accept_is_part_of_key(self, api_client):
+        api_client.get('/api/books/', HTTP_ACCEPT='application/json')
+        response = api_client.get('/api/books/', HTTP_ACCEPT='*/*')
+        assert response['X-Cache'] == 'MISS'
+
+
+@pytest.mark.unit
+class TestConditionalRequests:
+    """Tests for ETag / Last-Modified / 304 on the public API."""
+
+    def test_etag_and_last_modified_headers(self, api_client):
+        response = api_client.get('/api/books/')
+        assert response['ETag'].startswith('"')
+        assert 'Last-Modified' in response
+
+    def test_if_none_match_returns_304(self, api_client, django_assert_num_queries):
+        etag = api_client.get('/api/topics/')['ETag']
+        with django_assert_num_queries(0):
+            response = api_client.get('/api/topics/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b''
+
+    def test_etag_changes_after_write(self, api_client, book, django_capture_on_commit_callbacks):
+        etag = api_client.get('/api/books/')['ETag']
+        with django_capture_on_commit_callbacks(execute=True):
+            book.title = 'Renamed'
+            book.save()
+        response = api_client.get('/api/books/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+    def test_etag_varies_with_host_and_accept(self, api_client, settings):
+        settings.ALLOWED_HOSTS = ['testserver', 'other.example']
+        etag = api_client.get('/api/books/')['ETag']
+        assert api_client.get('/api/books/', HTTP_HOST='other.example')['ETag'] != etag
+        assert api_client.get('/api/books/', HTTP_ACCEPT='application/json')['ETag'] != etag
+
+    def test_error_responses_carry_no_validators(self, api_client):
+        response = api_client.get('/api/topics/no-such-topic/')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert 'ETag' not in response
+        assert 'Last-Modified' not in response
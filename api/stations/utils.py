@@ -1,22 +1,23 @@
-import json
 import os
+import re
 import time
-import urllib.request
 import urllib.parse
 from celery.utils.log import get_task_logger
+from django.conf import settings
 from django.db import DatabaseError
-from .models import Episode, Phrase
+from . import http_client
+from .models import BookLookup, Episode, Phrase
+from .providers import ProviderUnavailable
+from .ratelimit import google_books_limiter
 
 logger = get_task_logger(__name__)
 
-# Rate limiting for Google Books API
-_last_gb_request_time = 0.0
-_GB_MIN_INTERVAL = 1.0  # minimum seconds between requests
-_gb_cooldown_until = 0.0  # when set, skip GB calls until this monotonic time
+# Google Books request rate and cooldown are shared across workers,
+# see ratelimit.google_books_limiter()
 _GB_COOLDOWN_SECONDS = 43200  # 12-hour cooldown after a 429
 
 
-class GoogleBooksRateLimited(Exception):
+class GoogleBooksRateLimited(ProviderUnavailable):
     """Raised when Google Books API returns 429 and retries are exhausted."""
     pass
 
@@ -52,47 +53,136 @@ def _gb_api_key():
 
 
 def _gb_request(url):
-    """Make a request to Google Books API with rate limiting and 429 cooldown."""
-    global _last_gb_request_time, _gb_cooldown_until
-
-    # If in cooldown after a recent 429 storm, skip immediately
-    now = time.monotonic()
-    if now < _gb_cooldown_until:
-        remaining = int(_gb_cooldown_until - now)
-        raise GoogleBooksRateLimited(
-            f"Google Books API in cooldown ({remaining}s remaining)"
-        )
-
-    # Enforce minimum interval between requests
-    elapsed = now - _last_gb_request_time
-    if elapsed < _GB_MIN_INTERVAL:
-        time.sleep(_GB_MIN_INTERVAL - elapsed)
-    _last_gb_request_time = time.monotonic()
-
-    req = urllib.request.Request(
-        url, headers={"User-Agent": "RadioReads/1.0 (https://radioreads.fun)"}
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            return json.loads(resp.read().decode())
-    except urllib.error.HTTPError as e:
-        if e.code == 429:
-            # Rate limited — stop immediately, enter 12-hour cooldown
-            _gb_cooldown_until = time.monotonic() + _GB_COOLDOWN_SECONDS
-            logger.warning(
-                f"Google Books 429 rate limited, entering {_GB_COOLDOWN_SECONDS // 3600}h cooldown"
+    """
+    Make a request to Google Books API with rate limiting and 429 cooldown.
+
+    Connection errors and 5xx are retried here rather than inside the HTTP
+    client, so every attempt takes a token from the shared bucket.
+    """
+    limiter = google_books_limiter()
+    retry = 0
+    while True:
+        # If in cooldown after a recent 429 storm (in any worker), skip immediately
+        remaining = limiter.cooldown_remaining()
+        if remaining:
+            raise GoogleBooksRateLimited(
+                f"Google Books API in cooldown ({remaining}s remaining)"
             )
-            raise GoogleBooksRateLimited(str(e)) from e
-        raise
 
+        # Wait for a token from the bucket shared by all workers
+        limiter.acquire()
+
+        try:
+            return http_client.get_json(url, timeout=10, retries=0)
+        except http_client.HTTPError as e:
+            if e.status == 429:
+                # Rate limited — stop immediately, enter 12-hour cooldown
+                limiter.start_cooldown(_GB_COOLDOWN_SECONDS)
+                logger.warning(
+                    f"Google Books 429 rate limited, entering {_GB_COOLDOWN_SECONDS // 3600}h cooldown"
+                )
+                raise GoogleBooksRateLimited(str(e)) from e
+            if retry >= settings.HTTP_RETRIES or not http_client.is_retryable(e):
+                raise
+        except http_client.RequestError:
+            if retry >= settings.HTTP_RETRIES:
+                raise
+        retry += 1
+        time.sleep(http_client.retry_delay(retry))
+
+
+def verify_book_exists(title: str, author: str = "", refresh: bool = False) -> dict:
+    """
+    Look up a book via the metadata providers (Google Books, falling back
+    to Open Library; see providers.search), reusing a cached result when fresh.
+
+    Results (found, not found and API errors, each with its own TTL) are
+    kept in BookLookup keyed on normalized title + author. Pass
+    refresh=True to bypass the cache and overwrite it. Rate limiting is
+    never cached: ProviderUnavailable propagates when every provider is
+    cooling down.
+    """
+    from . import providers
+
+    if not refresh:
+        cached = BookLookup.get_fresh(title, author)
+        if cached is not None:
+            return cached
+    book_info = providers.search(title, author)
+    BookLookup.store(title, author, book_info)
+    return book_info
+
+
+_STOP_WORDS = {"the", "a", "an", "and", "of", "in", "on", "for", "to", "is", "at", "by"}
+
+
+def _titles_match(ai_title, gb_title):
+    """Check if two titles refer to the same book using word overlap."""
+    def significant_words(t):
+        # Strip punctuation, split, keep meaningful words
+        words = re.findall(r"[a-z0-9]+", t.lower())
+        return set(w for w in words if w not in _STOP_WORDS and len(w) > 1)
+    ai_words = significant_words(ai_title)
+    gb_words = significant_words(gb_title)
+    if not ai_words or not gb_words:
+        return False
+    overlap = ai_words & gb_words
+    smaller = min(len(ai_words), len(gb_words))
+    return len(overlap) >= max(1, smaller * 0.5)
+
+
+def gb_result_matches(title, author, book_info):
+    """
+    Sanity check: does a Google Books result resemble what we searched for?
 
-def verify_book_exists(title: str, author: str = "") -> dict:
+    Title uses word-overlap matching; author checks last name against the
+    authors field, description, and search snippet (Google Books sometimes
+    lists publishers instead of human authors).
+    """
+    canonical_title = book_info.get("title") or title
+    canonical_author = book_info.get("author") or author
+    title_ok = _titles_match(title, canonical_title)
+    ai_author_words = [w for w in author.lower().split() if w not in ("and", "by", "&") and len(w) > 2]
+    gb_text = " ".join([
+        canonical_author.lower(),
+        (book_info.get("description") or "").lower(),
+        (book_info.get("search_snippet") or "").lower(),
+    ])
+    author_ok = (
+        not author
+        or any(w in gb_text for w in ai_author_words)
+    )
+    return title_ok and author_ok
+
+
+# Partial responses: just what verification and covers use
+_GB_VOLUME_FIELDS = "id,volumeInfo(title,authors,description,industryIdentifiers,imageLinks)"
+_GB_SEARCH_FIELDS = f"items({_GB_VOLUME_FIELDS},searchInfo/textSnippet)"
+
+# Cover sizes, best first. Cap at large (~800px) — extraLarge is overkill
+# for rendered sizes, so a large cover ends the volume-detail walk.
+_GB_COVER_SIZES = ("large", "medium", "small", "thumbnail")
+
+
+def _best_image_link(image_links):
+    """(rank, url) of the best cover in an imageLinks dict; rank 0 = none."""
+    for i, size in enumerate(_GB_COVER_SIZES):
+        if size in image_links:
+            return len(_GB_COVER_SIZES) - i, image_links[size]
+    return 0, None
+
+
+def _fetch_google_books(title: str, author: str = "") -> dict:
     """
     Look up a book via Google Books API and return metadata.
 
     Used for enrichment (canonical title/author, cover, ISBN), not as a gate.
     With an API key, fetches volume detail to get tokenised cover URLs
-    that work from server IPs.
+    that work from server IPs — lazily: only for results whose search entry
+    has a cover, in relevance order, stopping at the first large cover, and
+    not at all when the top result fails the gb_result_matches sanity check
+    (verification would reject it anyway). Requests ask for partial
+    responses (``fields=``).
 
     Returns:
         dict with keys:
@@ -101,136 +191,209 @@ def verify_book_exists(title: str, author: str = "") -> dict:
             - author: str
             - cover_url: str or None (direct image URL)
             - isbn: str or None
+            - volume_id: str (the top result the metadata came from; stored
+              as Book.google_volume_id for fetch_google_books_volume)
+            - cover_volume_id: str (edition the cover came from, if another)
+            - requests: int (Google Books requests this lookup made)
     """
     not_found = {"exists": False, "title": title, "author": author, "cover_url": None, "isbn": None}
     api_key = _gb_api_key()
-    try:
-        # Step 1: Search using intitle/inauthor for precise matching
-        if author:
-            query = f"intitle:{title} inauthor:{author}"
-        else:
-            query = title
-        # Fetch several results so we can pick the edition with the best cover
-        params = {"q": query, "maxResults": 5}
+    requests_made = 0
+
+    def request(url):
+        nonlocal requests_made
+        requests_made += 1
+        return _gb_request(url)
+
+    def search(query):
+        # Several results so we can pick the edition with the best cover
+        params = {"q": query, "maxResults": 5, "fields": _GB_SEARCH_FIELDS}
         if api_key:
             params["key"] = api_key
-        search_url = f"https://www.googleapis.com/books/v1/volumes?{urllib.parse.urlencode(params)}"
-        data = _gb_request(search_url)
+        return request(
+            f"{settings.GOOGLE_BOOKS_API_BASE}/volumes?{urllib.parse.urlencode(params)}"
+        ).get("items")
 
-        items = data.get("items")
+    try:
+        # Step 1: Search using intitle/inauthor for precise matching
+        items = search(f"intitle:{title} inauthor:{author}" if author else title)
         if not items and author:
             # Fallback: plain text search without intitle/inauthor operators
-            fallback_params = {"q": f"{title} {author}", "maxResults": 5}
-            if api_key:
-                fallback_params["key"] = api_key
-            fallback_url = f"https://www.googleapis.com/books/v1/volumes?{urllib.parse.urlencode(fallback_params)}"
-            data = _gb_request(fallback_url)
-            items = data.get("items")
+            items = search(f"{title} {author}")
         if not items:
+            not_found["requests"] = requests_made
             return not_found
 
-        # Step 2: Among the results, find the one with the best cover.
-        # Cap at large (~800px) — extraLarge is overkill for rendered sizes.
-        _SIZE_RANK = {"large": 4, "medium": 3, "small": 2, "thumbnail": 1, "smallThumbnail": 0}
-
         # Use first result for metadata (most relevant match)
         info = items[0].get("volumeInfo", {})
+        gb_authors = info.get("authors", [])
+        result = {
+            "exists": True,
+            "title": info.get("title", ""),
+            "author": gb_authors[0] if gb_authors else "",
+            "cover_url": None,
+            "isbn": _isbn_from(info),
+            # Description and search snippet for author-in-content fallback
+            "description": info.get("description", ""),
+            "search_snippet": items[0].get("searchInfo", {}).get("textSnippet", ""),
+            # The volume matched on title/author, for fetch_google_books_volume
+            # next time; a cover from another edition doesn't change it
+            "volume_id": items[0].get("id", ""),
+        }
 
-        best_cover_url = None
-        best_cover_score = -1
-
-        if api_key:
+        # Step 2: Among the results, find the one with the best cover.
+        if not api_key:
+            # Search thumbnails are untokenised and 403 from server/datacenter
+            # IPs, but without a key they're all there is.
+            result["cover_url"] = info.get("imageLinks", {}).get("thumbnail")
+        elif gb_result_matches(title, author, result):
+            best_rank = 0
             for item in items:
                 vol_id = item.get("id")
-                if not vol_id:
-                    continue
+                if not vol_id or not item.get("volumeInfo", {}).get("imageLinks"):
+                    continue  # no cover in search results → none in detail either
                 try:
-                    vol_url = f"https://www.googleapis.com/books/v1/volumes/{vol_id}?key={api_key}"
-                    vol_data = _gb_request(vol_url)
-                    vol_links = vol_data.get("volumeInfo", {}).get("imageLinks", {})
-                    # Score this volume by its best available size
-                    for size_name in ("large", "medium", "small", "thumbnail"):
-                        if size_name in vol_links:
-                            score = _SIZE_RANK[size_name]
-                            if score > best_cover_score:
-                                best_cover_score = score
-                                best_cover_url = vol_links[size_name]
-                            break  # only care about the best size this volume offers
+                    vol_data = _gb_volume_detail(vol_id, api_key, request)
+                except GoogleBooksRateLimited:
+                    raise
                 except Exception as e:
                     logger.debug(f"Volume detail fetch failed for {vol_id}: {e}")
-        gb_title = info.get("title", "")
-        gb_authors = info.get("authors", [])
-        gb_author = gb_authors[0] if gb_authors else ""
-
-        # ISBN: prefer ISBN-13
-        isbn = None
-        isbn_10 = None
-        for ident in info.get("industryIdentifiers", []):
-            if ident.get("type") == "ISBN_13":
-                isbn = ident.get("identifier")
-            elif ident.get("type") == "ISBN_10":
-                isbn_10 = ident.get("identifier")
-        isbn = isbn or isbn_10
-
-        # Fallback: use search thumbnail only without API key.
-        # With an API key, volume detail returns tokenised URLs; search
-        # thumbnails are untokenised and 403 from server/datacenter IPs.
-        if not best_cover_url and not api_key:
-            image_links = info.get("imageLinks", {})
-            best_cover_url = image_links.get("thumbnail")
-
-        # Description and search snippet for author-in-content fallback
-        gb_description = info.get("description", "")
-        search_snippet = items[0].get("searchInfo", {}).get("textSnippet", "")
-
-        return {
-            "exists": True,
-            "title": gb_title,
-            "author": gb_author,
-            "cover_url": best_cover_url,
-            "isbn": isbn,
-            "description": gb_description,
-            "search_snippet": search_snippet,
-        }
+                    continue
+                # Score this volume by its best available size
+                rank, url = _best_image_link(vol_data.get("volumeInfo", {}).get("imageLinks", {}))
+                if rank > best_rank:
+                    best_rank = rank
+                    result["cover_url"] = url
+                    result["cover_volume_id"] = vol_id
+                if best_rank == len(_GB_COVER_SIZES):
+                    break  # already at the target size
+        else:
+            logger.info(
+                f"Top Google Books result for '{title}' fails sanity check, "
+                f"skipping volume detail"
+            )
+
+        result["requests"] = requests_made
+        logger.info(f"Google Books lookup for '{title}': {requests_made} request(s)")
+        return result
     except GoogleBooksRateLimited:
         raise  # let caller handle rate limiting differently from other errors
     except Exception as e:
         logger.warning(f"Google Books lookup failed for '{title}': {e}")
         not_found["error"] = str(e)[:200]
+        not_found["requests"] = requests_made
         return not_found
 
 
-def _open_library_cover_url(title: str, author: str = "") -> str:
+def _isbn_from(volume_info):
+    """ISBN from a volumeInfo dict, preferring ISBN-13."""
+    isbn = None
+    isbn_10 = None
+    for ident in volume_info.get("industryIdentifiers", []):
+        if ident.get("type") == "ISBN_13":
+            isbn = ident.get("identifier")
+        elif ident.get("type") == "ISBN_10":
+            isbn_10 = ident.get("identifier")
+    return isbn or isbn_10
+
+
+def _gb_volume_detail(volume_id, api_key, request=None):
+    params = {"fields": _GB_VOLUME_FIELDS}
+    if api_key:
+        params["key"] = api_key
+    return (request or _gb_request)(
+        f"{settings.GOOGLE_BOOKS_API_BASE}/volumes/"
+        f"{urllib.parse.quote(volume_id)}?{urllib.parse.urlencode(params)}"
+    )
+
+
+def fetch_google_books_volume(volume_id: str = "", isbn: str = ""):
     """
-    Look up a cover image via Open Library as a fallback.
-    Returns a direct image URL (L size) or empty string.
+    Fast path for books already matched to Google Books.
+
+    Fetches the known volume directly (one request, partial response), or
+    runs an ``isbn:`` search when only the ISBN is known. Returns the same
+    dict as verify_book_exists, or None if the volume can't be fetched so
+    the caller can fall back to a title/author search.
     """
+    api_key = _gb_api_key()
+    requests_made = 0
+
+    def request(url):
+        nonlocal requests_made
+        requests_made += 1
+        return _gb_request(url)
+
     try:
-        params = {"title": title, "limit": 1}
-        if author:
-            params["author"] = author
-        url = f"https://openlibrary.org/search.json?{urllib.parse.urlencode(params)}"
-        req = urllib.request.Request(
-            url, headers={"User-Agent": "RadioReads/1.0 (https://radioreads.fun)"}
-        )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
-        docs = data.get("docs", [])
-        if docs and docs[0].get("cover_i"):
-            cover_id = docs[0]["cover_i"]
-            return f"https://covers.openlibrary.org/b/id/{cover_id}-L.jpg"
+        if volume_id:
+            volume = _gb_volume_detail(volume_id, api_key, request)
+        elif isbn:
+            params = {"q": f"isbn:{isbn}", "maxResults": 1, "fields": f"items({_GB_VOLUME_FIELDS})"}
+            if api_key:
+                params["key"] = api_key
+            items = request(
+                f"{settings.GOOGLE_BOOKS_API_BASE}/volumes?{urllib.parse.urlencode(params)}"
+            ).get("items")
+            if not items:
+                return None
+            volume = items[0]
+            if api_key and volume.get("id"):
+                # Search results carry untokenised cover URLs that 403 from
+                # server IPs; volume detail returns usable ones
+                volume = _gb_volume_detail(volume["id"], api_key, request)
+        else:
+            return None
+    except GoogleBooksRateLimited:
+        raise
     except Exception as e:
-        logger.debug(f"Open Library cover lookup failed for '{title}': {e}")
-    return ""
+        logger.warning(f"Google Books volume fetch failed for {volume_id or isbn}: {e}")
+        return None
+
+    info = volume.get("volumeInfo", {})
+    _, cover_url = _best_image_link(info.get("imageLinks", {}))
+    authors = info.get("authors", [])
+    return {
+        "exists": True,
+        "title": info.get("title", ""),
+        "author": authors[0] if authors else "",
+        "cover_url": cover_url,
+        "isbn": _isbn_from(info),
+        "description": info.get("description", ""),
+        "search_snippet": "",
+        "volume_id": volume.get("id", ""),
+        "requests": requests_made,
+    }
+
+
+def lookup_book(book, refresh: bool = False) -> dict:
+    """
+    Book metadata for an existing Book.
+
+    Uses a fresh cached lookup if there is one, then the stored volume id /
+    ISBN fast path (providers.lookup_volume), and only falls back to the
+    title/author search (verify_book_exists) for books never matched before.
+    """
+    from . import providers
+
+    if not refresh:
+        cached = BookLookup.get_fresh(book.title, book.author)
+        if cached is not None:
+            return cached
+    if book.google_volume_id or book.isbn:
+        book_info = providers.lookup_volume(book.google_volume_id, book.isbn)
+        if book_info is not None:
+            BookLookup.store(book.title, book.author, book_info)
+            return book_info
+    return verify_book_exists(book.title, book.author, refresh=True)
 
 
-def fetch_book_cover(title: str, author: str = "") -> str:
+def fetch_book_cover(title: str, author: str = "", refresh: bool = False) -> str:
     """
-    Fetch book cover image URL via Google Books API.
+    Fetch book cover image URL via the metadata providers (cached lookup).
     Returns empty string if no cover found.
     """
     try:
-        book_info = verify_book_exists(title, author)
+        book_info = verify_book_exists(title, author, refresh=refresh)
         return book_info.get("cover_url") or ""
     except Exception as e:
         logger.warning(f"Failed to fetch cover for '{title}': {e}")
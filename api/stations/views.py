@@ -1,13 +1,115 @@
 from django.http import Http404, JsonResponse
+from django.utils.decorators import method_decorator
 from django.core.paginator import Paginator
-from django.db.models import Count, F, Max, Prefetch, Q
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce, JSONObject
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .serializers import StationSerializer, BookSerializer, BrandShowSerializer
+from .cache import cache_public_response, conditional_public_response
+from .pagination import BookKeysetPagination
+from .search import (
+    FUZZY_MIN_LENGTH,
+    fuzzy_search_books,
+    fuzzy_threshold,
+    search_books,
+)
+from .serializers import StationSerializer, BookSerializer, BookListSerializer, BrandShowSerializer
 from .models import Station, Book, Brand, Episode, Topic
 
+# ETag/Last-Modified come from the cache generation, so a matching
+# If-None-Match is answered with 304 before any query or serialization.
+conditional = conditional_public_response
+
+
+def brands_with_book_count():
+    """Brands annotated with the verified book count BrandShowSerializer reads."""
+    return Brand.objects.select_related("station").annotate(
+        annotated_book_count=Coalesce("stats__book_count", 0)
+    )
+
+
+def book_detail_prefetches():
+    """
+    Prefetches for the full BookSerializer: episodes newest first, their
+    brands with book counts in one annotated query (instead of one
+    Brand.book_count query per episode), and topics.
+    """
+    return (
+        Prefetch("episodes", queryset=Episode.objects.order_by("-aired_at")),
+        Prefetch("episodes__brand", queryset=brands_with_book_count()),
+        "topics",
+    )
+
+
+def filter_public_books(queryset, params):
+    """
+    Restrict books to the public (verified) set, narrowed by the list
+    filters: brand, brand_slug, station_id and topic (or category).
+    """
+    queryset = queryset.filter(verification_status=Book.VERIFICATION_VERIFIED)
+    joined = False
+    brand_id = params.get("brand", None)
+    if brand_id:
+        queryset = queryset.filter(episodes__brand__id=brand_id)
+        joined = True
+    brand_slug = params.get("brand_slug", None)
+    if brand_slug:
+        queryset = queryset.filter(episodes__brand__slug=brand_slug)
+        joined = True
+    station_id = params.get("station_id", None)
+    if station_id:
+        queryset = queryset.filter(episodes__brand__station__station_id=station_id)
+        joined = True
+    topic = params.get("topic") or params.get("category")
+    if topic:
+        queryset = queryset.filter(topics__slug=topic)
+        joined = True
+    # M2M joins can produce duplicates; the unfiltered list is a plain
+    # index scan on (verification_status, latest_aired_at, id)
+    if joined:
+        queryset = queryset.distinct()
+    return queryset
+
+
+def wants_compact(request):
+    """True when a list request asked for the lean representation."""
+    return request.query_params.get("view") == "compact"
+
+
+def with_list_summary(queryset):
+    """
+    Annotate books with what BookListSerializer needs: the latest episode's
+    show and the episode count. Correlated subqueries are evaluated only for
+    the rows of the page, unlike prefetching every episode, brand and station.
+    The show's columns come back together as one JSON object, so the latest
+    episode is looked up once per row rather than once per column.
+    """
+    latest = Episode.objects.filter(books=OuterRef("pk")).order_by(
+        F("aired_at").desc(nulls_last=True), "-id"
+    )
+    episode_count = (
+        Book.episodes.through.objects.filter(book_id=OuterRef("pk"))
+        .order_by()
+        .values("book_id")
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    return queryset.prefetch_related(None).prefetch_related("topics").annotate(
+        latest_show=Subquery(
+            latest.values(
+                show=JSONObject(
+                    slug="brand__slug",
+                    name="brand__name",
+                    brand_color="brand__brand_color",
+                    station_name="brand__station__name",
+                )
+            )[:1]
+        ),
+        episode_count=Coalesce(Subquery(episode_count, output_field=IntegerField()), 0),
+    )
+
 
 class StationViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = StationSerializer
@@ -22,6 +124,7 @@ class StationViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
+@method_decorator([conditional, cache_public_response("brands")], name="dispatch")
 class BrandViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = BrandShowSerializer
     queryset = Brand.objects.select_related("station").all()
@@ -31,38 +134,45 @@ class BrandViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ["name", "created"]
 
     def get_queryset(self):
-        queryset = Brand.objects.select_related("station").annotate(
-            annotated_book_count=Count(
-                "episode__books",
-                filter=Q(episode__books__verification_status=Book.VERIFICATION_VERIFIED),
-                distinct=True,
-            )
-        )
+        queryset = brands_with_book_count()
         station_id = self.request.query_params.get("station_id", None)
         if station_id:
             queryset = queryset.filter(station__station_id=station_id)
         return queryset
 
     @action(detail=True, methods=["get"])
-    def books(self, request, pk=None):
+    def books(self, request, slug=None):
         brand = self.get_object()
+        # EXISTS rather than a join, so no DISTINCT: the paginator COUNT and
+        # the compact annotations then only touch each book once
+        on_brand = Book.episodes.through.objects.filter(
+            book_id=OuterRef("pk"), episode__brand=brand
+        )
         books = (
             Book.objects.filter(
-                episodes__brand=brand,
+                Exists(on_brand),
                 verification_status=Book.VERIFICATION_VERIFIED,
             )
-            .prefetch_related("episodes", "episodes__brand", "episodes__brand__station")
-            .annotate(latest_aired=Max("episodes__aired_at"))
-            .order_by(F("latest_aired").desc(nulls_last=True), "-id")
-            .distinct()
+            .prefetch_related(*book_detail_prefetches())
+            .order_by(F("latest_aired_at").desc(nulls_last=True), "-id")
         )
+        serializer_class = BookSerializer
+        if wants_compact(request):
+            books = with_list_summary(books)
+            serializer_class = BookListSerializer
+
+        if BookKeysetPagination.is_requested(request):
+            paginator = BookKeysetPagination()
+            page = paginator.paginate_queryset(books, request, view=self)
+            serializer = serializer_class(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
 
         page = int(request.query_params.get("page", 1))
         page_size = int(request.query_params.get("page_size", 10))
         paginator = Paginator(books, page_size)
         page_obj = paginator.get_page(page)
 
-        serializer = BookSerializer(page_obj, many=True)
+        serializer = serializer_class(page_obj, many=True)
         return Response(
             {
                 "count": paginator.count,
@@ -75,54 +185,55 @@ class BrandViewSet(viewsets.ReadOnlyModelViewSet):
         )
 
 
+@method_decorator([conditional, cache_public_response("books")], name="dispatch")
 class BookViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = BookSerializer
-    queryset = Book.objects.prefetch_related(
-        Prefetch(
-            "episodes",
-            queryset=Episode.objects.select_related("brand", "brand__station").order_by("-aired_at"),
-        ),
-        "topics",
-    ).all()
+    queryset = Book.objects.prefetch_related(*book_detail_prefetches()).all()
     lookup_field = "slug"
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["title", "author", "topics__name"]
+
+    def get_serializer_class(self):
+        # The detail endpoint always returns the full nested form
+        if self.action == "list" and wants_compact(self.request):
+            return BookListSerializer
+        return super().get_serializer_class()
+
+    @property
+    def paginator(self):
+        """
+        Page-number pagination by default; keyset when ?cursor is passed.
+        Searches always page by number: they are ordered by rank, which the
+        (latest_aired_at, id) cursor can't encode.
+        """
+        if not hasattr(self, "_paginator"):
+            searching = bool(self.request.query_params.get("search", "").strip())
+            if BookKeysetPagination.is_requested(self.request) and not searching:
+                self._paginator = BookKeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_queryset(self):
-        queryset = super().get_queryset().filter(
-            verification_status=Book.VERIFICATION_VERIFIED,
-        ).annotate(
-            latest_aired=Max("episodes__aired_at"),
+        queryset = filter_public_books(
+            super().get_queryset(), self.request.query_params
         ).order_by(
-            F("latest_aired").desc(nulls_last=True),
+            F("latest_aired_at").desc(nulls_last=True),
             "-id",
         )
-        brand_id = self.request.query_params.get("brand", None)
-        if brand_id:
-            queryset = queryset.filter(episodes__brand__id=brand_id)
-        brand_slug = self.request.query_params.get("brand_slug", None)
-        if brand_slug:
-            queryset = queryset.filter(episodes__brand__slug=brand_slug)
-        station_id = self.request.query_params.get("station_id", None)
-        if station_id:
-            queryset = queryset.filter(episodes__brand__station__station_id=station_id)
-        topic = self.request.query_params.get("topic") or self.request.query_params.get("category")
-        if topic:
-            queryset = queryset.filter(topics__slug=topic)
-        # M2M joins can produce duplicates
-        queryset = queryset.distinct()
+        # Full-text search over the GIN-indexed search_vector, best match first
+        search = self.request.query_params.get("search", "").strip()
+        if search:
+            queryset = search_books(queryset, search)
+        if self.action == "list" and wants_compact(self.request):
+            queryset = with_list_summary(queryset)
         return queryset
 
 
+@conditional
+@cache_public_response("topics")
 def topics_list(request):
     """Return topics with book counts and descriptions."""
     topics = (
-        Topic.objects.annotate(
-            book_count=Count(
-                "book",
-                filter=Q(book__verification_status=Book.VERIFICATION_VERIFIED),
-            )
-        )
+        Topic.objects.annotate(book_count=F("stats__book_count"))
         .filter(book_count__gt=0)
         .order_by("-book_count")
     )
@@ -138,14 +249,13 @@ def topics_list(request):
     return JsonResponse(result, safe=False)
 
 
+@conditional
+@cache_public_response("topics")
 def topic_detail(request, slug):
     """Return a single topic by slug."""
     try:
         topic = Topic.objects.annotate(
-            book_count=Count(
-                "book",
-                filter=Q(book__verification_status=Book.VERIFICATION_VERIFIED),
-            )
+            book_count=Coalesce("stats__book_count", 0)
         ).get(slug=slug)
     except Topic.DoesNotExist:
         raise Http404
@@ -159,6 +269,35 @@ def topic_detail(request, slug):
     )
 
 
+@conditional
+@cache_public_response("search")
+def search(request):
+    """
+    Typo-tolerant title/author search: ranked fuzzy matches with similarity
+    scores. Takes the same filters as /api/books/; ``limit`` caps results.
+    """
+    term = request.GET.get("q", "").strip()
+    try:
+        limit = min(max(int(request.GET.get("limit", 10)), 1), 50)
+    except ValueError:
+        limit = 10
+
+    results = []
+    if len(term) >= FUZZY_MIN_LENGTH:
+        books = fuzzy_search_books(
+            filter_public_books(Book.objects.all(), request.GET), term
+        )
+        with fuzzy_threshold():
+            books = list(with_list_summary(books)[:limit])
+        results = BookListSerializer(books, many=True).data
+        for item, book in zip(results, books):
+            item["score"] = round(book.score, 3)
+            item["title_similarity"] = round(book.title_similarity, 3)
+            item["author_similarity"] = round(book.author_similarity, 3)
+
+    return JsonResponse({"query": term, "results": results})
+
+
 def health_check(request):
     """Health check endpoint — returns 200 if healthy, 503 if not."""
     from .health import get_system_health
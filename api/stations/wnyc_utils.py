@@ -7,19 +7,17 @@ Works for any brand with spider_name="wnyc_api" — set brand.url to the WNYC sh
 Uses the public WNYC JSON API: no auth, no Scrapy, no headless browser.
 """
 
-import json
 import logging
 import time
-import urllib.error
-import urllib.request
 from datetime import datetime
 
+from django.conf import settings
+
+from . import http_client
 from .models import Episode
 
 logger = logging.getLogger(__name__)
 
-API_BASE = "https://api.wnyc.org/api/v3/story/"
-USER_AGENT = "RadioReads/1.0 (https://radioreads.fun)"
 PAGE_SIZE = 10
 REQUEST_DELAY = 1  # seconds between paginated requests
 
@@ -33,21 +31,19 @@ def _get_show_slug(brand):
 def _fetch_page(show_slug, page):
     """Fetch a single page from the WNYC API. Returns parsed JSON or None."""
     url = (
-        f"{API_BASE}?show={show_slug}"
+        f"{settings.WNYC_API_BASE}?show={show_slug}"
         f"&limit={PAGE_SIZE}&ordering=-newsdate&page={page}"
     )
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode())
-    except urllib.error.HTTPError as e:
-        if e.code in (429, 403):
+        return http_client.get_json(url)
+    except http_client.HTTPError as e:
+        if e.status in (429, 403):
             logger.warning(
-                f"WNYC API returned {e.code} on page {page} for {show_slug} — stopping"
+                f"WNYC API returned {e.status} on page {page} for {show_slug} — stopping"
             )
             return None
         raise
-    except urllib.error.URLError as e:
+    except http_client.RequestError as e:
         logger.error(f"WNYC API request failed for {show_slug} page {page}: {e}")
         return None
 
@@ -113,12 +109,12 @@ def scrape_wnyc_brand(brand, max_episodes=50, since_date=None):
 
             if Episode.objects.filter(url=story_url).exists():
                 continue
+            title = attrs.get("title", "")
             # Also dedup by title — WNYC API can return both slug and GUID URLs
             # for the same story
             if title and Episode.objects.filter(brand=brand, title=title[:255]).exists():
                 continue
 
-            title = attrs.get("title", "")
             # Prefer body (full HTML), fall back to tease (short text)
             description = attrs.get("body", "") or attrs.get("tease", "")
 
@@ -26,6 +26,29 @@ const API_BASE = getApiBase()
 // Base URL without /api suffix, for endpoints mounted at project level
 const API_ROOT = API_BASE.replace(/\/api\/?$/, '')
 
+// Conditional GET: remember each URL's ETag and body, send If-None-Match,
+// and reuse the body on 304 so unchanged data costs no JSON transfer.
+const etagCache = new Map<string, { etag: string; data: any }>()
+const ETAG_CACHE_MAX = 500
+
+async function fetchJson(url: string, errorMessage: string) {
+  const cached = etagCache.get(url)
+  const headers: Record<string, string> = { Accept: 'application/json' }
+  if (cached) headers['If-None-Match'] = cached.etag
+  const response = await fetch(url, { headers })
+  if (response.status === 304 && cached) return cached.data
+  if (!response.ok) throw new Error(errorMessage)
+  const data = await response.json()
+  const etag = response.headers.get('ETag')
+  if (etag) {
+    if (etagCache.size >= ETAG_CACHE_MAX) {
+      etagCache.delete(etagCache.keys().next().value as string)
+    }
+    etagCache.set(url, { etag, data })
+  }
+  return data
+}
+
 export async function fetchBooks(
   page: number = 1,
   pageSize: number = 10,
@@ -37,6 +60,7 @@ export async function fetchBooks(
   const params = new URLSearchParams({
     page: page.toString(),
     page_size: pageSize.toString(),
+    view: 'compact',
   })
 
   if (search) {
@@ -52,9 +76,7 @@ export async function fetchBooks(
     params.append('topic', topic)
   }
   
-  const response = await fetch(`${API_BASE}/books/?${params.toString()}`)
-  if (!response.ok) throw new Error('Failed to fetch books')
-  const data = await response.json()
+  const data = await fetchJson(`${API_BASE}/books/?${params.toString()}`, 'Failed to fetch books')
   // Handle both paginated and non-paginated responses
   if (data.results) {
     return data
@@ -62,16 +84,27 @@ export async function fetchBooks(
   return { count: data.length, results: data, next: null, previous: null }
 }
 
+// Keyset pagination: pass '' for the first page, then the cursor from `next`.
+// Every page costs the same, so this is the way to walk the whole archive.
+export async function fetchBooksByCursor(cursor: string = '', pageSize: number = 100) {
+  const params = new URLSearchParams({
+    cursor,
+    page_size: pageSize.toString(),
+    view: 'compact',
+  })
+  const response = await fetch(`${API_BASE}/books/?${params.toString()}`)
+  if (!response.ok) throw new Error('Failed to fetch books')
+  const data = await response.json()
+  const next = data.next ? new URL(data.next).searchParams.get('cursor') : null
+  return { results: data.results, nextCursor: next }
+}
+
 export async function fetchBook(slug: string) {
-  const response = await fetch(`${API_BASE}/books/${slug}/`);
-  if (!response.ok) throw new Error('Failed to fetch book');
-  return response.json();
+  return fetchJson(`${API_BASE}/books/${slug}/`, 'Failed to fetch book');
 }
 
 export async function fetchShows() {
-  const response = await fetch(`${API_BASE}/brands/`);
-  if (!response.ok) throw new Error('Failed to fetch shows');
-  const data = await response.json();
+  const data = await fetchJson(`${API_BASE}/brands/`, 'Failed to fetch shows');
   // Handle both paginated and non-paginated responses
   if (data.results) {
     return data;
@@ -115,15 +148,11 @@ export async function fetchStation(stationId: string) {
 }
 
 export async function fetchTopics() {
-  const response = await fetch(`${API_ROOT}/api/topics/`);
-  if (!response.ok) throw new Error('Failed to fetch topics');
-  return response.json();
+  return fetchJson(`${API_ROOT}/api/topics/`, 'Failed to fetch topics');
 }
 
 export async function fetchTopic(slug: string) {
-  const response = await fetch(`${API_ROOT}/api/topics/${slug}/`);
-  if (!response.ok) throw new Error('Failed to fetch topic');
-  return response.json();
+  return fetchJson(`${API_ROOT}/api/topics/${slug}/`, 'Failed to fetch topic');
 }
 
 export async function fetchTopicBooks(topicSlug: string, page: number = 1, pageSize: number = 10) {
@@ -9,7 +9,10 @@ type BookCardProps = {
 
 export function BookCard({ book, featured = false }: BookCardProps) {
   const ep = book.episodes?.[0]
-  const brand = ep?.brand
+  const brand = book.show
+    ? { ...book.show, station: { name: book.show.station_name } }
+    : ep?.brand
+  const airedAt = book.latest_aired_at ?? ep?.aired_at
 
   if (featured) {
     return (
@@ -22,6 +25,8 @@ export function BookCard({ book, featured = false }: BookCardProps) {
               <div className="flex-shrink-0 w-32" style={{ containerType: 'inline-size' }}>
                 <ImageWithFallback
                   src={book.cover_image}
+                  sources={book.cover_sources}
+                  sizes="128px"
                   alt={`Cover of ${book.title}`}
                   className="w-full h-auto shadow-lg"
                   title={book.title}
@@ -47,8 +52,8 @@ export function BookCard({ book, featured = false }: BookCardProps) {
           )}
           <div className="text-sm text-gray-600 dark:text-gray-400">
             {brand?.station?.name}
-            {ep?.aired_at && (
-              <> · {formatDateLong(ep.aired_at)}</>
+            {airedAt && (
+              <> · {formatDateLong(airedAt)}</>
             )}
           </div>
         </article>
@@ -65,6 +70,8 @@ export function BookCard({ book, featured = false }: BookCardProps) {
           <div className="flex-shrink-0 w-16" style={{ containerType: 'inline-size' }}>
             <ImageWithFallback
               src={book.cover_image}
+              sources={book.cover_sources}
+              sizes="64px"
               alt={`Cover of ${book.title}`}
               className="w-full h-auto shadow"
               title={book.title}
@@ -86,8 +93,8 @@ export function BookCard({ book, featured = false }: BookCardProps) {
             {brand?.name && (
               <> · {brand.name}</>
             )}
-            {ep?.aired_at && (
-              <> · {formatDateShort(ep.aired_at)}</>
+            {airedAt && (
+              <> · {formatDateShort(airedAt)}</>
             )}
           </div>
         </div>
@@ -67,6 +67,8 @@ export function BookDetailPageContent({ book, showSlug }: BookDetailPageContentP
               <div className="flex-shrink-0 w-48" style={{ containerType: 'inline-size' }}>
                 <ImageWithFallback
                   src={book.cover_image}
+                  sources={book.cover_sources}
+                  sizes="192px"
                   alt={`Cover of ${book.title}`}
                   className="w-full h-auto shadow-xl"
                   title={book.title}
@@ -52,6 +52,7 @@ export function BooksPageContent({
         const params = new URLSearchParams({
           page: currentPage.toString(),
           page_size: booksPerPage.toString(),
+          view: "compact",
         });
         
         if (debouncedSearch) {
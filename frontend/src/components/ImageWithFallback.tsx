@@ -1,8 +1,12 @@
 import { useState } from 'react'
 import { PlaceholderCover } from './PlaceholderCover'
+import type { CoverSource } from '@/types'
 
 interface ImageWithFallbackProps {
   src?: string
+  // Resized variants (AVIF/WebP) offered ahead of src, chosen using sizes
+  sources?: CoverSource[]
+  sizes?: string
   alt: string
   className?: string
   title?: string
@@ -10,7 +14,7 @@ interface ImageWithFallbackProps {
   brandColor?: string
 }
 
-export function ImageWithFallback({ src, alt, className, title, author, brandColor }: ImageWithFallbackProps) {
+export function ImageWithFallback({ src, sources, sizes, alt, className, title, author, brandColor }: ImageWithFallbackProps) {
   const [hasError, setHasError] = useState(false)
 
   if (!src || hasError) {
@@ -24,13 +28,28 @@ export function ImageWithFallback({ src, alt, className, title, author, brandCol
     )
   }
 
-  return (
+  const img = (
     <img
       src={src}
       alt={alt}
       className={className}
       onError={() => setHasError(true)}
       loading="lazy"
+      width={sources?.[0]?.width}
+      height={sources?.[0]?.height}
     />
   )
+
+  if (!sources?.length) {
+    return img
+  }
+
+  return (
+    <picture>
+      {sources.map((source) => (
+        <source key={source.type} type={source.type} srcSet={source.srcset} sizes={sizes} />
+      ))}
+      {img}
+    </picture>
+  )
 }
@@ -25,7 +25,7 @@ export function ShowPageContent({
     const fetchBooks = async () => {
       setIsLoading(true)
       try {
-        const response = await fetch(`/api/books/?brand_slug=${initialShow.slug}&page=${currentPage}&page_size=${booksPerPage}`)
+        const response = await fetch(`/api/books/?brand_slug=${initialShow.slug}&page=${currentPage}&page_size=${booksPerPage}&view=compact`)
         if (!response.ok) throw new Error('Failed to fetch show books')
         const data = await response.json()
         const booksData = data.results
@@ -31,7 +31,7 @@ export function TopicPageContent({
       setIsLoading(true)
       try {
         const response = await fetch(
-          `/api/books/?topic=${initialTopic.slug}&page=${currentPage}&page_size=${booksPerPage}`
+          `/api/books/?topic=${initialTopic.slug}&page=${currentPage}&page_size=${booksPerPage}&view=compact`
         )
         if (!response.ok) throw new Error('Failed to fetch topic books')
         const data = await response.json()
@@ -61,3 +61,28 @@ describe('BookCard', () => {
   })
 })
 
+
+describe('BookCard cover sources', () => {
+  it('offers resized variants in a picture element', () => {
+    const book: Book = {
+      ...mockBook,
+      cover_sources: [{
+        type: 'image/webp',
+        srcset: '/media/c-160w.webp 160w, /media/c-320w.webp 320w',
+        width: 320,
+        height: 480,
+      }],
+    }
+    const { container } = render(<BookCard book={book} />)
+    const source = container.querySelector('picture source')
+    expect(source).toHaveAttribute('type', 'image/webp')
+    expect(source).toHaveAttribute('srcset', '/media/c-160w.webp 160w, /media/c-320w.webp 320w')
+    expect(container.querySelector('picture img')).toHaveAttribute('src', 'https://example.com/cover.jpg')
+  })
+
+  it('renders a plain img without variants', () => {
+    const { container } = render(<BookCard book={mockBook} />)
+    expect(container.querySelector('picture')).toBeNull()
+    expect(container.querySelector('img')).toHaveAttribute('src', 'https://example.com/cover.jpg')
+  })
+})
@@ -1,5 +1,5 @@
 import type { APIRoute } from 'astro';
-import { fetchBooks, fetchShows, fetchTopics } from '../api/client';
+import { fetchBooksByCursor, fetchShows, fetchTopics } from '../api/client';
 
 const SITE_URL = 'https://radioreads.fun';
 
@@ -35,7 +35,7 @@ export const GET: APIRoute = async () => {
 
   // Book detail pages
   for (const book of allBooks) {
-    const showSlug = book.episodes?.[0]?.brand?.slug;
+    const showSlug = book.show?.slug ?? book.episodes?.[0]?.brand?.slug;
     if (showSlug) {
       urls.push({ loc: `/${showSlug}/${book.slug}`, priority: '0.7', changefreq: 'monthly' });
     }
@@ -57,15 +57,13 @@ ${urls.map(u => `  <url>
 
 async function fetchAllBooks() {
   const allBooks: any[] = [];
-  let page = 1;
-  const pageSize = 100;
+  let cursor: string | null = '';
 
-  while (true) {
+  while (cursor !== null) {
     try {
-      const data = await fetchBooks(page, pageSize);
+      const data = await fetchBooksByCursor(cursor, 100);
       allBooks.push(...data.results);
-      if (!data.next) break;
-      page++;
+      cursor = data.nextCursor;
     } catch {
       break;
     }
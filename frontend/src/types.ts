@@ -18,6 +18,22 @@ export type BookEpisode = {
   };
 };
 
+// Latest show of a book, as returned by list endpoints with view=compact
+export type BookShow = {
+  slug: string;
+  name: string;
+  brand_color?: string;
+  station_name?: string;
+};
+
+// A <picture> <source>: resized cover variants of one format
+export type CoverSource = {
+  type: string;
+  srcset: string;
+  width: number;
+  height: number;
+};
+
 export type Book = {
   id: number;
   title: string;
@@ -26,8 +42,13 @@ export type Book = {
   topics?: { slug: string; name: string }[];
   description?: string;
   cover_image?: string;
+  cover_sources?: CoverSource[];
   purchase_link?: string;
-  episodes: BookEpisode[];
+  // Full form (detail endpoint) carries episodes; compact lists carry show + episode_count
+  episodes?: BookEpisode[];
+  show?: BookShow | null;
+  episode_count?: number;
+  latest_aired_at?: string | null;
 };
 
 export type Show = {